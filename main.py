@@ -53,6 +53,7 @@ from telemffb.telem.SimTelemListener import SimListenerManager
 from telemffb.ConfiguratorDialog import ConfiguratorDialog
 #from telemffb.LogTailWindow import LogTailWindow
 from telemffb.telem.TelemManager import TelemManager
+from telemffb.telem.TelemRecorder import start_replay
 from telemffb.utils import (AnsiColors, LoggingFilter, exit_application,
                             set_vpconf_profile)
 from telemffb.namedmutex import NamedMutex
@@ -371,7 +372,10 @@ def main():
     logging.info("-------")
 
     try:
-        dev = HapticEffect.open(vid_pid[0], vid_pid[1])  # try to open RHINO
+        if G.args.simdevice:
+            dev = HapticEffect.open_simulated(vid_pid[0], vid_pid[1])
+        else:
+            dev = HapticEffect.open(vid_pid[0], vid_pid[1])  # try to open RHINO
         if G.args.reset:
             dev.reset_effects()
         dev_firmware_version = dev.get_firmware_version()
@@ -406,8 +410,13 @@ def main():
     
     
 
+    if G.args.latency or G.args.latency_log:
+        utils.latency.enable(G.args.latency_log)
+
     G.telem_manager = TelemManager()
     G.telem_manager.start()
+    if G.args.record:
+        G.telem_manager.start_recording(G.args.record)
     G.sim_listeners = SimListenerManager()
     G.main_window = MainWindow()
 
@@ -479,7 +488,10 @@ def main():
 
     init_async()
 
-    G.sim_listeners.start_all()
+    if G.args.replay:
+        start_replay(G.args.replay, G.telem_manager, G.args.replay_speed, device=HapticEffect.device)
+    else:
+        G.sim_listeners.start_all()
 
     app.exec_()
 
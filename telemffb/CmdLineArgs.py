@@ -15,7 +15,15 @@ class CmdLineArgs:
         headless: Optional[bool] = False,
         child: Optional[bool] = False,
         masterport: Optional[str] = None,
-        minimize: Optional[bool] = False
+        minimize: Optional[bool] = False,
+        record: Optional[str] = None,
+        replay: Optional[str] = None,
+        replay_speed: float = 1.0,
+        simdevice: Optional[bool] = False,
+        latency: Optional[bool] = False,
+        latency_log: float = 0,
+        listener_hub: Optional[bool] = False,
+        msfs_changed_only: Optional[bool] = False
     ) -> None:
         self.teleplot = teleplot
         self.plot = plot
@@ -29,6 +37,14 @@ class CmdLineArgs:
         self.child = child
         self.masterport = masterport
         self.minimize = minimize
+        self.record = record
+        self.replay = replay
+        self.replay_speed = replay_speed
+        self.simdevice = simdevice
+        self.latency = latency
+        self.latency_log = latency_log
+        self.listener_hub = listener_hub
+        self.msfs_changed_only = msfs_changed_only
 
     @classmethod
     def parse(cls):
@@ -55,6 +71,23 @@ class CmdLineArgs:
 
         parser.add_argument('--minimize', action='store_true', help='Minimize on startup')
 
+        parser.add_argument('--record', type=str, metavar="FILE", default=None,
+                            help='Record all received telemetry to a capture file')
+        parser.add_argument('--replay', type=str, metavar="FILE", default=None,
+                            help='Replay a telemetry capture file instead of listening to simulators')
+        parser.add_argument('--replay-speed', type=float, default=1.0,
+                            help='Replay speed multiplier, 0 replays as fast as possible (default 1.0)')
+        parser.add_argument('--simdevice', action='store_true',
+                            help='Use a simulated Rhino device instead of USB hardware')
+        parser.add_argument('--latency', action='store_true',
+                            help='Collect per stage telemetry latency statistics')
+        parser.add_argument('--latency-log', type=float, metavar="SECONDS", default=0,
+                            help='Log latency statistics every SECONDS (implies --latency)')
+        parser.add_argument('--listener-hub', action='store_true',
+                            help='Service all UDP telemetry listeners from a single thread')
+        parser.add_argument('--msfs-changed-only', action='store_true',
+                            help='Request only changed simvars from MSFS each frame')
+
         args = parser.parse_args()
 
         return cls(**vars(args))
@@ -358,8 +358,8 @@ class MainWindow(QMainWindow):
             self.label_icons[sim.name].enabled = sim.started
             self.refresh_telem_status()
 
-        def on_event(event):
-            if event[0] == "Stop":
+        def on_events(events):
+            if any(ev.name == "Stop" for ev in events):
                 src = G.telem_manager.getTelemValue("src")
                 if src in self.label_icons:
                     lb = self.label_icons[src]
@@ -367,7 +367,7 @@ class MainWindow(QMainWindow):
                     lb.paused = False
                 self.refresh_telem_status()
 
-        G.telem_manager.eventReceived.connect(on_event)
+        G.telem_manager.eventsReceived.connect(on_events)
 
         G.sim_listeners.simStarted.connect(on_sims_changed)
         G.sim_listeners.simStopped.connect(on_sims_changed)
@@ -1,9 +1,11 @@
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QAbstractItemView, QDialog, QTableWidgetItem
+from PyQt5.QtCore import QStringListModel, Qt
+from PyQt5.QtWidgets import (QAbstractItemView, QCompleter, QDialog,
+                             QTableWidgetItem)
 
 from . import globals as G
 from . import xmlutils
 from .telem.SimConnectManager import SimConnectManager
+from .telem.SimVarCatalog import get_catalog
 from .ui.Ui_SCOverridesDialog import Ui_SCOverridesDialog
 
 
@@ -20,6 +22,36 @@ class SCOverridesEditor(QDialog, Ui_SCOverridesDialog):
         self.pb_add.clicked.connect(self.add_button_clicked)
         self.pb_delete.clicked.connect(self.delete_button_clicked)
 
+        # simvar autocomplete, the catalog is only opened once the user starts typing
+        self.var_completer = QCompleter(QStringListModel(), self)
+        self.var_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.var_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.tb_var.setCompleter(self.var_completer)
+        self.tb_var.textEdited.connect(self.on_var_edited)
+        self.var_completer.activated.connect(self.on_var_completed)
+        self.units_loaded = False
+
+    def on_var_edited(self, text):
+        text = text.strip()
+        if len(text) < 2 or text.upper().startswith("L:"):
+            return  # L:vars are defined by the aircraft and are not in the catalog
+        catalog = get_catalog()
+        names = catalog.variables(text)
+        if len(names) < 10:
+            # few or no names start with the text, also offer matches in names and descriptions
+            names += [n for n in catalog.search(text) if n not in names]
+        self.var_completer.model().setStringList(names)
+        self.var_completer.complete()
+        if not self.units_loaded:
+            self.units_loaded = True
+            self.cb_sc_unit.setCompleter(QCompleter(catalog.units(), self))
+            self.cb_sc_unit.completer().setCaseSensitivity(Qt.CaseInsensitive)
+
+    def on_var_completed(self, name):
+        info = get_catalog().get_variable(name)
+        if info is not None and info['units'] and self.cb_sc_unit.currentText() == '':
+            self.cb_sc_unit.setCurrentText(info['units'])
+
     def fill_fields(self):
         is_msfs = G.settings_mgr.current_sim == 'MSFS'
         self.pb_add.setEnabled(is_msfs)
@@ -33,7 +33,7 @@ from typing import List, Self
 import usb1
 from PyQt5.QtCore import QObject, QTimer, QTimerEvent, pyqtSignal
 
-from telemffb.utils import Destroyable, DirectionModulator, clamp, overrides, millis
+from telemffb.utils import Destroyable, DirectionModulator, clamp, overrides, millis, latency
 
 paths = ["hidapi.dll", "dll/hidapi.dll", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dll', 'hidapi.dll')]
 for p in paths:
@@ -43,7 +43,18 @@ for p in paths:
     except:
         pass 
 
-import telemffb.hw.hid as hid
+try:
+    import telemffb.hw.hid as hid
+except ImportError as e:
+    # without hidapi only the simulated device (ffb_sim.py) can be opened
+    logging.warning(f"HID access unavailable: {e}")
+    hid = None
+
+
+def _hidapi():
+    if hid is None:
+        raise IOError("hidapi library not found, only the simulated device can be used")
+    return hid
 
 USB_REQTYPE_DEVICE_TO_HOST = 0x80
 USB_REQTYPE_VENDOR = 0x40
@@ -656,7 +667,7 @@ class FFBRhino(QObject):
             if path:
                 devs = list(filter(lambda x: x.path == path, devs))
             if not devs:
-                raise hid.HIDException('unable to open device')
+                raise _hidapi().HIDException('unable to open device')
             self.info = devs[0]
 
         self._in_reports = {}
@@ -673,7 +684,7 @@ class FFBRhino(QObject):
             self._dev.close()
             self._dev = None
         
-        self._dev = hid.Device(path=self.info.path)
+        self._dev = _hidapi().Device(path=self.info.path)
         self._dev.nonblocking = True
 
     @property
@@ -688,7 +699,7 @@ class FFBRhino(QObject):
     
     @staticmethod
     def enumerate(pid=0) -> List[DeviceInfo]:
-        devs = hid.enumerate(vid=0xffff, pid=pid)
+        devs = _hidapi().enumerate(vid=0xffff, pid=pid)
         devs = [DeviceInfo(**dev) for dev in devs]
         # returns a list of valid VPforce devices
         #[{'interface_number': 0,
@@ -761,7 +772,7 @@ class FFBRhino(QObject):
         if report_id == HID_REPORT_ID_INPUT:
             report: FFBReport_Input = self.get_input()
 
-            btns: int = report.Button | (report.ButtonAux << 32)
+            btns: int = report.buttons
 
             prev = self._button_state
             self._button_state = btns
@@ -841,7 +852,13 @@ class FFBRhino(QObject):
         return handle
     
     def write(self, data):
-        if self._dev.write(data) < 0:
+        if latency.enabled:
+            t = time.perf_counter()
+            res = self._dev.write(data)
+            latency.add("hid_write", time.perf_counter() - t)
+        else:
+            res = self._dev.write(data)
+        if res < 0:
             raise IOError("HID Write")
         
     def read_reports(self):
@@ -901,6 +918,13 @@ class HapticEffect(Destroyable):
 
         return cls.device
 
+    # Open a simulated Rhino device for running without hardware, see ffb_sim.py
+    @classmethod
+    def open_simulated(cls, vid = 0xFFFF, pid=0x2055, **kwargs) -> FFBRhino:
+        from telemffb.hw.ffb_sim import FFBRhinoSim
+        cls.device = FFBRhinoSim(vid, pid, **kwargs)
+        return cls.device
+
     def setCondition(self, cond : FFBReport_SetCondition) -> Self:
         assert self.effect_type in [
             EFFECT_SPRING,
@@ -0,0 +1,227 @@
+#
+# This file is part of the TelemFFB distribution (https://github.com/walmis/TelemFFB).
+# Copyright (c) 2023 Valmantas Palikša.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Simulated Rhino device for running the effect pipeline without hardware.
+
+SimulatedHIDDevice stands in for hid.Device underneath FFBRhino and emulates the
+parts of the firmware TelemFFB talks to: effect creation and the effect pool,
+block free, effect operations, device control, gain feature reports and PID state
+input reports. Every report written is recorded with a timestamp so HID write rates
+and effect churn can be measured under replayed telemetry.
+"""
+
+import collections
+import logging
+import threading
+import time
+
+from telemffb.hw.ffb_rhino import (CONTROL_RESET, CONTROL_STOP_ALL_EFFECTS,
+                                   HID_REPORT_FEATURE_ID_GET_GAINS,
+                                   HID_REPORT_FEATURE_ID_SET_GAIN,
+                                   HID_REPORT_ID_BLOCK_FREE,
+                                   HID_REPORT_ID_CREATE_EFFECT,
+                                   HID_REPORT_ID_DEVICE_CONTROL,
+                                   HID_REPORT_ID_EFFECT_OPERATION,
+                                   HID_REPORT_ID_INPUT,
+                                   HID_REPORT_ID_PID_BLOCK_LOAD,
+                                   HID_REPORT_ID_PID_STATE_REPORT, LOAD_FULL,
+                                   LOAD_SUCCESS, OP_STOP, DeviceInfo, FFBRhino,
+                                   FFBReport_Get_Gains_Feature_Data,
+                                   FFBReport_Input, FFBReport_PIDStatus_Input,
+                                   effect_names)
+from telemffb.utils import overrides
+
+GAIN_NAMES = ["master_gain", "periodic_gain", "spring_gain", "damper_gain",
+              "inertia_gain", "friction_gain", "constant_gain"]
+
+
+class SimulatedHIDDevice:
+    """Drop-in replacement for hid.Device emulating the Rhino FFB firmware"""
+
+    def __init__(self, serial="SIMULATED", product="Rhino FFB Simulated", pool_size=40, history=100000):
+        self.serial = serial
+        self.product = product
+        self.manufacturer = "VPforce"
+        self.nonblocking = True
+        self.pool_size = pool_size
+
+        self._lock = threading.Lock()
+        self._open = False
+        self._effects = {}  # effect block index -> effect type
+        self._playing = set()
+        self._block_load = bytes([HID_REPORT_ID_PID_BLOCK_LOAD, 0, LOAD_FULL, 0, 0])
+        self._in_queue = collections.deque()
+        self._gains = {name: 100 for name in GAIN_NAMES}
+
+        # write log of (timestamp, report bytes)
+        self.reports = collections.deque(maxlen=history)
+        self.reset_stats()
+        self.set_input()
+
+    def open(self):
+        self._open = True
+
+    def close(self):
+        self._open = False
+
+    def _check_open(self):
+        if not self._open:
+            raise IOError("device closed")
+
+    def reset_stats(self):
+        with self._lock:
+            self.reports.clear()
+            self.tstart = time.perf_counter()
+            self.num_writes = 0
+            self.writes_by_report = collections.Counter()
+            self.effects_created = collections.Counter()
+            self.effects_freed = 0
+            self.create_failures = 0
+            self.max_effects = len(self._effects)
+
+    def set_input(self, **kwargs):
+        """Queue an input report, e.g. set_input(X=1024, Y=-512)"""
+        report = FFBReport_Input(reportId=HID_REPORT_ID_INPUT, hats=0xFFFF, **kwargs)
+        self._in_queue.append(bytes(report))
+
+    def _pid_state(self, effect_id, playing, reset=False):
+        report = FFBReport_PIDStatus_Input(reportId=HID_REPORT_ID_PID_STATE_REPORT, actuatorsEnabled=1,
+                                           actuatorPower=1, deviceResetEvent=int(reset),
+                                           effectPlaying=int(playing), effectBlockIndex=effect_id)
+        self._in_queue.append(bytes(report))
+
+    def _free_all(self):
+        self._effects.clear()
+        self._playing.clear()
+
+    def write(self, data):
+        self._check_open()
+        data = bytes(data)
+        with self._lock:
+            self.reports.append((time.perf_counter(), data))
+            self.num_writes += 1
+            report_id = data[0]
+            self.writes_by_report[report_id] += 1
+
+            if report_id == HID_REPORT_ID_BLOCK_FREE:
+                if self._effects.pop(data[1], None) is not None:
+                    self.effects_freed += 1
+                self._playing.discard(data[1])
+
+            elif report_id == HID_REPORT_ID_EFFECT_OPERATION:
+                effect_id, op = data[1], data[2]
+                if op == OP_STOP:
+                    if effect_id in self._playing:
+                        self._playing.discard(effect_id)
+                        self._pid_state(effect_id, playing=False)
+                elif effect_id in self._effects:
+                    self._playing.add(effect_id)
+
+            elif report_id == HID_REPORT_ID_DEVICE_CONTROL:
+                if data[1] == CONTROL_RESET:
+                    self._free_all()
+                    self._pid_state(0, playing=False, reset=True)
+                elif data[1] == CONTROL_STOP_ALL_EFFECTS:
+                    self._playing.clear()
+
+        return len(data)
+
+    def read(self, size, timeout=None):
+        self._check_open()
+        if self._in_queue:
+            return self._in_queue.popleft()[:size]
+        return b""
+
+    def send_feature_report(self, data):
+        self._check_open()
+        data = bytes(data)
+        with self._lock:
+            if data[0] == HID_REPORT_ID_CREATE_EFFECT:
+                effect_type = data[1]
+                free = [i for i in range(1, self.pool_size + 1) if i not in self._effects]
+                if free:
+                    self._effects[free[0]] = effect_type
+                    self._block_load = bytes([HID_REPORT_ID_PID_BLOCK_LOAD, free[0], LOAD_SUCCESS, 0, 0])
+                    self.effects_created[effect_names.get(effect_type, effect_type)] += 1
+                    self.max_effects = max(self.max_effects, len(self._effects))
+                else:
+                    self._block_load = bytes([HID_REPORT_ID_PID_BLOCK_LOAD, 0, LOAD_FULL, 0, 0])
+                    self.create_failures += 1
+
+            elif data[0] == HID_REPORT_FEATURE_ID_SET_GAIN:
+                gain_id, value = data[1], data[2]
+                if 1 <= gain_id <= len(GAIN_NAMES):
+                    self._gains[GAIN_NAMES[gain_id - 1]] = value
+        return len(data)
+
+    def get_feature_report(self, report_id, size):
+        self._check_open()
+        if report_id == HID_REPORT_ID_PID_BLOCK_LOAD:
+            return self._block_load[:size]
+        if report_id == HID_REPORT_FEATURE_ID_GET_GAINS:
+            report = FFBReport_Get_Gains_Feature_Data(reportId=HID_REPORT_FEATURE_ID_GET_GAINS, **self._gains)
+            return bytes(report)[:size]
+        return bytes(size)
+
+    @property
+    def active_effects(self) -> dict:
+        return dict(self._effects)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            elapsed = time.perf_counter() - self.tstart
+            return {
+                "writes": self.num_writes,
+                "writes_per_s": round(self.num_writes / elapsed, 1) if elapsed else 0,
+                "writes_by_report": dict(self.writes_by_report),
+                "effects_created": dict(self.effects_created),
+                "effects_freed": self.effects_freed,
+                "create_failures": self.create_failures,
+                "active_effects": len(self._effects),
+                "max_effects": self.max_effects,
+                "pool_size": self.pool_size,
+            }
+
+
+class FFBRhinoSim(FFBRhino):
+    """FFBRhino backed by SimulatedHIDDevice, no hardware or hidapi access"""
+
+    def __init__(self, vid=0xFFFF, pid=0x2055, serial="SIMULATED", path=b"simulated", pool_size=40) -> None:
+        # the simulated device must exist before FFBRhino.__init__ calls reconnect()
+        self.sim = SimulatedHIDDevice(serial=serial, pool_size=pool_size)
+        super().__init__(vid, pid, serial, path)
+        self.info = DeviceInfo(interface_number=0, manufacturer_string=self.sim.manufacturer, path=path,
+                               product_id=pid, product_string=self.sim.product, release_number=0,
+                               serial_number=serial, usage=4, usage_page=1, vendor_id=vid)
+        self.firmware_version = "v1.0.99-sim"
+        logging.info(f"Using simulated Rhino device {vid:04X}:{pid:04X}, effect pool size {pool_size}")
+
+    @overrides(FFBRhino)
+    def reconnect(self):
+        self.sim.open()
+        self._dev = self.sim
+
+    @overrides(FFBRhino)
+    def get_firmware_version(self, cached=True):
+        return self.firmware_version
+
+    def get_stats(self) -> dict:
+        return self.sim.get_stats()
+
+    def reset_stats(self):
+        self.sim.reset_stats()
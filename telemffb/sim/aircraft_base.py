@@ -256,6 +256,10 @@ class AircraftBase(object):
         self.spring_x = FFBReport_SetCondition(parameterBlockOffset=0)
         self.spring_y = FFBReport_SetCondition(parameterBlockOffset=1)
 
+        if utils.latency.enabled:
+            # time each effect update routine individually
+            utils.latency.instrument(self, "_update_", "effect:")
+
     def step_value_over_time(self, key, value, timeframe_ms, dst_val, floatpoint=False):
         '''
         This function creates an entry in the  stepper dictionary which can be used to track the progress of driving a
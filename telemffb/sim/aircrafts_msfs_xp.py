@@ -116,10 +116,22 @@ class Aircraft(AircraftBase):
 
     vne_override: int = 0
 
+    _simconnect = None
+
     @classmethod
     def set_simconnect(cls, sc):
         cls._simconnect = sc
 
+    def send_event_to_msfs(self, event, data=0, coalesce=False):
+        """Send a SimConnect event, dropped without a SimConnect session (e.g. telemetry replay)"""
+        if self._simconnect is not None:
+            self._simconnect.send_event_to_msfs(event, data, coalesce=coalesce)
+
+    def set_simdatum_to_msfs(self, simvar, value, units=None):
+        """Set a simvar, dropped without a SimConnect session (e.g. telemetry replay)"""
+        if self._simconnect is not None:
+            self._simconnect.set_simdatum_to_msfs(simvar, value, units=units)
+
     def __init__(self, name, **kwargs) -> None:
         super().__init__(name)
 
@@ -344,8 +356,8 @@ class Aircraft(AircraftBase):
                     else:
                         pos_y_pos = round(pos_y_pos, 5)
 
-                    self._simconnect.send_event_to_msfs(x_var, pos_x_pos)
-                    self._simconnect.send_event_to_msfs(y_var, pos_y_pos)
+                    self.send_event_to_msfs(x_var, pos_x_pos, coalesce=True)
+                    self.send_event_to_msfs(y_var, pos_y_pos, coalesce=True)
             # update spring data
             if self.ap_following and ap_active:
                 y_coeff = 4096
@@ -432,7 +444,7 @@ class Aircraft(AircraftBase):
                     else:
                         pos_x_pos = round(pos_x_pos, 5)
 
-                    self._simconnect.send_event_to_msfs(x_var, pos_x_pos)
+                    self.send_event_to_msfs(x_var, pos_x_pos, coalesce=True)
 
                 # update spring data
 
@@ -707,8 +719,8 @@ class Aircraft(AircraftBase):
                     else:
                         pos_y_pos = round(pos_y_pos, 5)
 
-                    self._simconnect.send_event_to_msfs(x_var, pos_x_pos)
-                    self._simconnect.send_event_to_msfs(y_var, pos_y_pos)
+                    self.send_event_to_msfs(x_var, pos_x_pos, coalesce=True)
+                    self.send_event_to_msfs(y_var, pos_y_pos, coalesce=True)
 
                 #give option to disable if desired by user
             if self.aoa_effect_enabled and telem_data.get("ElevDeflPct", 0) != 0 and not max(telem_data.get("WeightOnWheels")):
@@ -845,7 +857,7 @@ class Aircraft(AircraftBase):
                     else:
                         pos_x_pos = round(pos_x_pos, 5)
 
-                    self._simconnect.send_event_to_msfs(x_var, pos_x_pos)
+                    self.send_event_to_msfs(x_var, pos_x_pos, coalesce=True)
 
             self.const_force.constant(rud_force, 270).start()
             self._spring_handle.start()
@@ -1396,8 +1408,8 @@ class Helicopter(Aircraft):
                             else:
                                 y_var = 'AXIS_CYCLIC_LONGITUDINAL_SET'
 
-                            self._simconnect.send_event_to_msfs(x_var, self.last_pos_x_pos)
-                            self._simconnect.send_event_to_msfs(y_var, self.last_pos_y_pos)
+                            self.send_event_to_msfs(x_var, self.last_pos_x_pos, coalesce=True)
+                            self.send_event_to_msfs(y_var, self.last_pos_y_pos, coalesce=True)
                         return
                 elif force_trim_pressed:
                     gain = int(self.trim_release_spring_gain * 4096)
@@ -1420,7 +1432,7 @@ class Helicopter(Aircraft):
 
                     self.cyclic_trim_release_active = 1
                     if self._sim_is_msfs():
-                        self._simconnect.send_event_to_msfs("ROTOR_TRIM_RESET", 1)
+                        self.send_event_to_msfs("ROTOR_TRIM_RESET", 1)
 
                 elif not force_trim_pressed and self.cyclic_trim_release_active:
                     self.spring_x.positiveCoefficient = clamp(int(4096 * self.cyclic_spring_gain), 0, 4096)
@@ -1442,7 +1454,7 @@ class Helicopter(Aircraft):
                         logging.info(f"Force Trim Engaged :{self.cpO_x}:{self.cpO_y}")
 
                     if self._sim_is_msfs():
-                        self._simconnect.send_event_to_msfs("ROTOR_TRIM_RESET", 0)
+                        self.send_event_to_msfs("ROTOR_TRIM_RESET", 0)
 
 
                     self.cyclic_trim_release_active = 0
@@ -1470,7 +1482,7 @@ class Helicopter(Aircraft):
                     self.spring_x.cpOffset = self.cpO_x
                     self.spring_y.cpOffset = self.cpO_y
                     if self._sim_is_msfs():
-                        self._simconnect.send_event_to_msfs("ROTOR_TRIM_RESET", 0)
+                        self.send_event_to_msfs("ROTOR_TRIM_RESET", 0)
 
                     logging.info("Trim Reset Pressed")
 
@@ -1526,8 +1538,8 @@ class Helicopter(Aircraft):
                         else:
                             pos_y_pos = round(pos_y_pos, 5)
 
-                        self._simconnect.send_event_to_msfs(x_var, pos_x_pos)
-                        self._simconnect.send_event_to_msfs(y_var, pos_y_pos)
+                        self.send_event_to_msfs(x_var, pos_x_pos, coalesce=True)
+                        self.send_event_to_msfs(y_var, pos_y_pos, coalesce=True)
                         self.last_pos_x_pos = pos_x_pos
                         self.last_pos_y_pos = pos_y_pos
 
@@ -1618,7 +1630,7 @@ class Helicopter(Aircraft):
                         else:
                             x_var = 'ROTOR_AXIS_TAIL_ROTOR_SET'
 
-                        self._simconnect.send_event_to_msfs(x_var, self.last_pos_x_pos)
+                        self.send_event_to_msfs(x_var, self.last_pos_x_pos, coalesce=True)
                     return
 
             if self.pedal_force_trim_enabled:
@@ -1655,7 +1667,7 @@ class Helicopter(Aircraft):
                 else:
                     pos_x_pos = round(pos_x_pos, 5)
 
-                self._simconnect.send_event_to_msfs(x_var, pos_x_pos)
+                self.send_event_to_msfs(x_var, pos_x_pos, coalesce=True)
                 self.last_pos_x_pos = pos_x_pos
 
     def _update_collective(self, telem_data):
@@ -1712,7 +1724,7 @@ class Helicopter(Aircraft):
                 logging.info("Collective Initialized")
             else:
                 if self._sim_is_msfs():
-                    self._simconnect.send_event_to_msfs(y_var, self.last_pos_y_pos)
+                    self.send_event_to_msfs(y_var, self.last_pos_y_pos, coalesce=True)
 
                 return
         self.last_collective_y = phys_y
@@ -1748,7 +1760,7 @@ class Helicopter(Aircraft):
                 pos_y_pos = round(pos_y_pos, 5)
 
             if self.collective_init:
-                self._simconnect.send_event_to_msfs(y_var, pos_y_pos)
+                self.send_event_to_msfs(y_var, pos_y_pos, coalesce=True)
                 self.last_pos_y_pos = pos_y_pos
 
 
@@ -1943,25 +1955,25 @@ class HPGHelicopter(Helicopter):
             dev_y = hands_on_dict["y_deviation"]
             if self.send_individual_hands_on:
                 if hands_on_x:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICX", 1, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICX", 1, units="number")
                     self.hands_on_x_active = True
 
                 else:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICX", 0, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICX", 0, units="number")
                     self.hands_on_x_active = False
 
                 if hands_on_y:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICY", 1, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICY", 1, units="number")
                     self.hands_on_y_active = True
                 else:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICY", 0, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICY", 0, units="number")
                     self.hands_on_y_active = False
             else:
                 if hands_on_either:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLIC", 1, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLIC", 1, units="number")
                     self.hands_on_active = True
                 else:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLIC", 0, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLIC", 0, units="number")
                     self.hands_on_active = False
 
             telem_data["hands_on"] = int(hands_on_either)
@@ -1995,11 +2007,11 @@ class HPGHelicopter(Helicopter):
             dev_x = feet_on_dict['deviation']
 
             if feet_on_pedals:
-                self._simconnect.set_simdatum_to_msfs("L:FFB_FEET_ON_PEDALS", 1, units="number")
+                self.set_simdatum_to_msfs("L:FFB_FEET_ON_PEDALS", 1, units="number")
                 self.feet_on_active = True
 
             else:
-                self._simconnect.set_simdatum_to_msfs("L:FFB_FEET_ON_PEDALS", 0, units="number")
+                self.set_simdatum_to_msfs("L:FFB_FEET_ON_PEDALS", 0, units="number")
                 self.feet_on_active = False
 
             x_scale = clamp(self.rudder_x_axis_scale, 0, 1)
@@ -2085,7 +2097,7 @@ class HPGHelicopter(Helicopter):
 
             self.last_pedal_x = phys_x
 
-            self._simconnect.send_event_to_msfs(x_var, pos_x_pos)
+            self.send_event_to_msfs(x_var, pos_x_pos, coalesce=True)
 
     def _update_collective(self, telem_data):
         if telem_data.get("FFBType") != 'collective':
@@ -2100,7 +2112,7 @@ class HPGHelicopter(Helicopter):
             input_data = HapticEffect.device.get_input()
             force_trim_pressed = input_data.isButtonPressed(self.force_trim_button)
             if self._sim_is_msfs() and force_trim_pressed:
-                self._simconnect.send_event_to_msfs("AUTO_THROTTLE_DISCONNECT", 1)
+                self.send_event_to_msfs("AUTO_THROTTLE_DISCONNECT", 1)
 
         collective_tr = telem_data.get("hpgCollectiveRelease", 0)
         afcs_mode = telem_data.get("hpgCollectiveAfcsMode", 0)
@@ -2162,7 +2174,7 @@ class HPGHelicopter(Helicopter):
                     pos_y_pos = round(pos_y_pos, 5)
 
                 if self.collective_init:
-                    self._simconnect.send_event_to_msfs(y_var, pos_y_pos)
+                    self.send_event_to_msfs(y_var, pos_y_pos, coalesce=True)
 
 
             else:
@@ -2202,7 +2214,7 @@ class HPGHelicopter(Helicopter):
                     pos_y_pos = round(pos_y_pos, 5)
 
                 if self.collective_init:
-                    self._simconnect.send_event_to_msfs(y_var, pos_y_pos)
+                    self.send_event_to_msfs(y_var, pos_y_pos, coalesce=True)
 
             else:
                 collective_pos = telem_data.get("CollectivePos", 0)
@@ -2383,25 +2395,25 @@ class SASHelicopter(Helicopter):
             dev_y = hands_on_dict["y_deviation"]
             if self.send_individual_hands_on:
                 if hands_on_x:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICX", 1, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICX", 1, units="number")
                     self.hands_on_x_active = True
 
                 else:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICX", 0, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICX", 0, units="number")
                     self.hands_on_x_active = False
 
                 if hands_on_y:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICY", 1, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICY", 1, units="number")
                     self.hands_on_y_active = True
                 else:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICY", 0, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLICY", 0, units="number")
                     self.hands_on_y_active = False
             else:
                 if hands_on_either:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLIC", 1, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLIC", 1, units="number")
                     self.hands_on_active = True
                 else:
-                    self._simconnect.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLIC", 0, units="number")
+                    self.set_simdatum_to_msfs("L:FFB_HANDS_ON_CYCLIC", 0, units="number")
                     self.hands_on_active = False
 
             telem_data["hands_on"] = int(hands_on_either)
@@ -14,12 +14,10 @@ import threading
 import time
 import traceback
 from typing import Dict, List, Tuple
-from typing import List, Iterable
 import struct
 from enum import IntEnum
 from dataclasses import dataclass
 import telemffb.utils as utils
-import pygetwindow as get_focus_window
 
 
 knots = 0.514444
@@ -57,71 +55,6 @@ def hexdump(src, length=16, sep='.'):
 
     return ("\n".join(lines))
 
-class BinaryDataReader:
-    def __init__(self, data, endian='little'):
-        self.buffer = data
-        self.pointer = 0
-        self.endian = endian
-
-    def advance(self, offset):
-        self.pointer += offset
-   
-    def remaining(self):
-        return len(self.buffer) - self.pointer
-
-    def _read(self, format_str, size, peek=False):
-        if self.pointer + size > len(self.buffer):
-            raise ValueError("Not enough data to read")
-        endian = "<" if self.endian == "little" else ">"
-        value = struct.unpack_from(endian + format_str, self.buffer, self.pointer)[0]
-        if peek:
-            # don't advance pointer, just return data for analysis
-            return value
-        else:
-            self.pointer += size
-            return value
-    
-    # return slice of remaining data
-    def get_data(self, length, peek=False):
-        data = self.buffer[self.pointer:self.pointer+length]
-        if peek:
-            # don't advance pointer, just return data for analysis
-            return data
-        else:
-            self.pointer += length
-            return data
-
-
-    def get_uint32(self):
-        return self._read('I', 4)
-
-    def get_uint16(self):
-        return self._read('H', 2)
-
-    def get_float(self):
-        return self._read('f', 4)
-
-    def get_double(self):
-        return self._read('d', 8)
-
-    def get_int32(self):
-        return self._read('i', 4)
-
-    def get_int16(self):
-        return self._read('h', 2)
-    
-    def get_uint8(self):
-        return self._read('B', 1)
-    
-    def get_int8(self):
-        return self._read('b', 1)
-    
-    def get_char(self):
-        return self._read('c', 1)
-    
-    def get_vector3f(self):
-        return [self.get_float(), self.get_float(), self.get_float()]
-
 
 class StateType(IntEnum):
     RPM = 0
@@ -155,6 +88,92 @@ class EventType(IntEnum):
     Event14 = 14
 
 
+FOCUS_POLL_INTERVAL = 0.25 # seconds
+
+TELEM_PACKET = 0x54000101
+MOTION_PACKET = 0x494C0100
+
+# precompiled layouts of the packet, state and event records, all little endian
+PACKET_HEADER_STRUCT = struct.Struct("<I")
+TELEM_HEADER_STRUCT = struct.Struct("<HIB")     # packet size, tick, state count
+MOTION_STRUCT = struct.Struct("<I9f")           # tick, acceleration, rotational velocity, rotational acceleration
+RECORD_HEADER_STRUCT = struct.Struct("<HB")     # state/event type, length
+FLOAT_STRUCT = struct.Struct("<f")
+FLOAT2_STRUCT = struct.Struct("<2f")
+VECTOR2_STRUCT = struct.Struct("<6f")
+ENGINE_DATA_STRUCT = struct.Struct("<HH3ff")    # index, index2, vector, max rpm
+GUN_DATA_STRUCT = struct.Struct("<H3fff")       # index, offset, mass, velocity
+WHEEL_DATA_STRUCT = struct.Struct("<HH3f")      # index, index2, offset
+RELEASE_STRUCT = struct.Struct("<3ffH")         # offset, mass, type
+DAMAGE_STRUCT = struct.Struct("<3ff")
+SEAT_STRUCT = struct.Struct("<IH")
+EVENT14_STRUCT = struct.Struct("<ih")
+
+_floats_structs: Dict[int, struct.Struct] = {}
+
+def floats_struct(n: int) -> struct.Struct:
+    """Struct unpacking `n` floats, cached per count"""
+    st = _floats_structs.get(n)
+    if st is None:
+        st = _floats_structs[n] = struct.Struct(f"<{n}f")
+    return st
+
+
+def active_window_title() -> str:
+    """Default focus provider, title of the foreground window"""
+    import pygetwindow
+    return pygetwindow.getActiveWindow().title
+
+
+class FocusPoller:
+    """Tracks whether the IL-2 window has focus
+
+    The foreground window is polled from a background thread every `interval`
+    seconds and the result cached in `focused`, so the packet decoder only reads a
+    flag. `provider` is any callable returning the foreground window title, it can
+    be replaced with set_provider() (eg. a stub where pygetwindow is unavailable).
+    """
+    def __init__(self, provider=active_window_title, match="Il-2", interval=FOCUS_POLL_INTERVAL):
+        self.provider = provider
+        self.match = match
+        self.interval = interval
+        self.focused = False
+        self._thread : threading.Thread = None
+        self._stop : threading.Event = None
+
+    def set_provider(self, provider):
+        self.provider = provider
+        self.poll()
+
+    def poll(self) -> bool:
+        try:
+            title = self.provider() or ""
+        except Exception:
+            title = "unknown"
+        self.focused = self.match in title
+        return self.focused
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self.poll()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True, name="IL2FocusPoller")
+        self._thread.start()
+
+    def stop(self):
+        if self._stop:
+            self._stop.set()
+        self._thread = None
+
+    def _run(self, stop: threading.Event):
+        while not stop.wait(self.interval):
+            self.poll()
+
+
+focus_poller = FocusPoller()
+
+
 class StateDataStructure:
     tick: int = 0
     paused: int = 0
@@ -177,8 +196,29 @@ class StateDataStructure:
     air_brake_position: float = 0.0
 
 
+# dirty tags, each groups the telemetry keys derived from one decoded record
+ALL_TAGS = ("name", "rpm", "maxrpm", "gear_pos", "gear_pressure", "ias", "agl", "acc", "buffet", "flaps",
+            "airbrake", "gun_data", "gun", "bombs", "rockets", "hits", "damage", "seat", "motion", "focus", "unknown")
+
+
 class IL2Manager():
-    def __init__(self):
+    """Incremental IL-2 telemetry decoder
+
+    Decoders record which values changed in a set of dirty tags and process_packet
+    returns only the telemetry keys derived from those, meant to be submitted with
+    TelemManager.submit_telem(..., delta=True). The first frame after a reset
+    (start, aircraft change) contains all keys. `telem_data` holds the full state.
+    """
+    # also emit the undecoded unknown_data_*/unknown_evt_* fields, for protocol debugging
+    emit_unknown_fields: bool = False
+
+    def __init__(self, emit_unknown_fields=None):
+        if emit_unknown_fields is not None:
+            self.emit_unknown_fields = emit_unknown_fields
+        self.reset()
+        focus_poller.start()
+
+    def reset(self):
         self.ac_name: str = ""
         self.engine_info: list = []
         self.engine_rpm: list = [0.0]
@@ -199,6 +239,7 @@ class IL2Manager():
         self.ev_damage_data: list = []
         self.damage_events: int = 0
         self.seat_data: list = []
+        self.focus: int = 0
 
         self.acceleration_Gs: list = []
         self.acc_vectors: list = []
@@ -207,338 +248,401 @@ class IL2Manager():
         self.guns_dict = {}
         self._changes = {}
         self._change_counter = {}
-        self.last_paused_data: list = []
+        self._last_ticks = {} # packet type -> tick of the last packet
+        self._dirty = set(ALL_TAGS)
         self.telem_data = {"src": "IL2", "N": "", "AircraftClass": "unknown"}
 
         self.state = StateDataStructure()
 
-    def process_packet(self, packet: bytes) -> bytes:
-        data = BinaryDataReader(packet)
-        packet_header = data.get_uint32()
-        lenpack = len(packet)
-        hex_pack = packet.hex().upper()
+    def process_packet(self, packet: bytes) -> dict:
+        """Decode a packet and return the telemetry keys which changed"""
+        packet_header, = PACKET_HEADER_STRUCT.unpack_from(packet)
         ##
         ## Run Decoders
         ##
 
-        if packet_header == 0x54000101:
+        if packet_header == TELEM_PACKET:
             ## Telemetry/Event Packet
-            self.decode_telem(data)
+            self.decode_telem(packet, PACKET_HEADER_STRUCT.size)
 
-        elif packet_header == 0x494C0100:
+        elif packet_header == MOTION_PACKET:
             ## Motion telemetry (aircraft orientation, rotational vectors, etc) have a different header signature
-            self.decode_motion(data)
+            self.decode_motion(packet, PACKET_HEADER_STRUCT.size)
 
         else:
             logging.error(f'Unknown packet type:  Header=0x{packet_header:X}')
-
-        self.telem_data["src"] = "IL2"
-        if self.ac_name != "":
-            self.telem_data["N"] = self.ac_name
-        self.telem_data['TAS'] = self.state.indicated_air_speed_metres_second
-        self.telem_data['IAS'] = self.state.indicated_air_speed_metres_second
-        self.telem_data['AGL'] = self.state.above_ground_level_metres
-        self.telem_data['RPM'] = self.state.rpm
-        self.telem_data["MaxRPM"] = self.engine_maxrpm
-        try:
-            self.rpm_pcts = [(a / b) * 100 for a, b in zip(self.state.rpm, self.engine_maxrpm)]
-        except: pass
-        self.telem_data["EngRPM"] = self.rpm_pcts
-
-        # self.telem_data['Manifold'] = list(self.state.intake_manifold_pressure_pa)
-        self.telem_data['GearPos'] = list(self.state.landing_gear_position)
-
-        try:
-            ## Reorder gear to match DCS for function re-use
-            update_gear_indices = [0, 2, 1]
-            self.state.landing_gear_pressure = [self.state.landing_gear_pressure[i] for i in update_gear_indices]
-        except: pass
-
-        self.telem_data['T'] = self.state.tick
-        self.telem_data['WeightOnWheels'] = list(self.state.landing_gear_pressure)
-        self.telem_data['ACCs'] = self.state.acceleration_Gs
-        self.telem_data['BuffetFrequency'] = self.state.stall_buffet_frequency
-        self.telem_data['BuffetAmplitude'] = self.state.stall_buffet_amplitude * 10  # multiply by factor of 10 to make usable in 0-1.0 range
-        self.telem_data['Flaps'] = self.state.flaps_position
-        self.telem_data['Speedbrakes'] = self.state.air_brake_position
-        self.telem_data["GunData"] = self.gun_data
-        self.telem_data["Gun"] = self.guns_fired
-        self.telem_data["Bombs"] = self.bombs_released
-        self.telem_data["Rockets"] = self.rockets_fired
-        self.telem_data["Hits"] = self.hit_events
-        self.telem_data["Damage"] = self.damage_events
-        self.telem_data["SeatData"] = self.seat_data
-        self.telem_data['unknown_data_2'] = list(self.state.val2)
-        self.telem_data['unknown_data_3'] = self.state.val3
-        self.telem_data['unknown_evt_6'] = self.ev6_data
-        self.telem_data['unknown_data_7'] = self.state.val7
-        self.telem_data['unknown_evt_13'] = self.ev13_data
-        self.telem_data['unknown_evt_14'] = self.ev14_data
-        self.telem_data['acc_vectors'] = self.acc_vectors
-        self.telem_data['rot_velocity'] = self.rot_velocity
-        self.telem_data['rot_accel'] = self.rot_accel
-
-        # create structure of the most real-time data to determine if updated telemetry is flowing.  If not, consider
-        # the sim paused.  This avoids effects continuing to play when in multiplayer map or after crash since IL-2 never stops sending
-        # stale frames.
-        paused_data = [self.state.acceleration_Gs, self.state.above_ground_level_metres,self.state.rpm, self.rot_accel, self.rot_velocity]
-        if paused_data == self.last_paused_data:
-            self.telem_data['SimPaused'] = True
-        else:
-            self.telem_data['SimPaused'] = False
-        self.last_paused_data = paused_data
-
-        packet = bytes(";".join([f"{k}={self.fmt(v)}" for k, v in self.telem_data.items()]), "utf-8")
-        return packet
-
-    def decode_motion(self, data : BinaryDataReader):
-        tick = data.get_uint32()
+            return {}
+
+        telem_data = self.telem_data
+        state = self.state
+        out = {}
+
+        # IL-2 keeps sending stale frames when paused, in multiplayer maps or after a crash.
+        # A packet repeating the tick of the previous one of the same type means the sim is not running
+        paused = self._last_ticks.get(packet_header) == state.tick
+        self._last_ticks[packet_header] = state.tick
+        if telem_data.get("SimPaused") != paused:
+            out["SimPaused"] = paused
+        if telem_data.get("T") != state.tick:
+            out["T"] = state.tick
+
+        dirty = self._dirty
+        if dirty:
+            if "name" in dirty:
+                out["src"] = "IL2"
+                out["AircraftClass"] = telem_data["AircraftClass"]
+                out["N"] = self.ac_name
+            if "rpm" in dirty or "maxrpm" in dirty:
+                try:
+                    self.rpm_pcts = [(a / b) * 100 for a, b in zip(state.rpm, self.engine_maxrpm)]
+                except: pass
+                out["RPM"] = state.rpm
+                out["MaxRPM"] = self.engine_maxrpm
+                out["EngRPM"] = self.rpm_pcts
+            if "ias" in dirty:
+                out["TAS"] = out["IAS"] = state.indicated_air_speed_metres_second
+            if "agl" in dirty:
+                out["AGL"] = state.above_ground_level_metres
+            if "gear_pos" in dirty:
+                out["GearPos"] = state.landing_gear_position
+            if "gear_pressure" in dirty:
+                out["WeightOnWheels"] = state.landing_gear_pressure
+            if "acc" in dirty:
+                out["ACCs"] = state.acceleration_Gs
+            if "buffet" in dirty:
+                out["BuffetFrequency"] = state.stall_buffet_frequency
+                out["BuffetAmplitude"] = state.stall_buffet_amplitude * 10  # multiply by factor of 10 to make usable in 0-1.0 range
+            if "flaps" in dirty:
+                out["Flaps"] = state.flaps_position
+            if "airbrake" in dirty:
+                out["Speedbrakes"] = state.air_brake_position
+            if "gun_data" in dirty:
+                out["GunData"] = self.gun_data
+            if "gun" in dirty:
+                out["Gun"] = self.guns_fired
+            if "bombs" in dirty:
+                out["Bombs"] = self.bombs_released
+            if "rockets" in dirty:
+                out["Rockets"] = self.rockets_fired
+            if "hits" in dirty:
+                out["Hits"] = self.hit_events
+            if "damage" in dirty:
+                out["Damage"] = self.damage_events
+            if "seat" in dirty:
+                out["SeatData"] = self.seat_data
+            if "motion" in dirty:
+                out["acc_vectors"] = self.acc_vectors
+                out["rot_velocity"] = self.rot_velocity
+                out["rot_accel"] = self.rot_accel
+            if "focus" in dirty:
+                out["Focus"] = self.focus
+            if "unknown" in dirty and self.emit_unknown_fields:
+                out["unknown_data_2"] = state.val2
+                out["unknown_data_3"] = state.val3
+                out["unknown_evt_6"] = self.ev6_data
+                out["unknown_data_7"] = state.val7
+                out["unknown_evt_13"] = self.ev13_data
+                out["unknown_evt_14"] = self.ev14_data
+            dirty.clear()
+
+        telem_data.update(out)
+        return out
+
+    def decode_motion(self, buf, offset: int):
+        tick, *v = MOTION_STRUCT.unpack_from(buf, offset)
         self.state.tick = tick
 
-        self.acc_vectors = data.get_vector3f()
-        self.rot_velocity = data.get_vector3f()
-        self.rot_accel = data.get_vector3f()
+        self.acc_vectors = v[0:3]
+        self.rot_velocity = v[3:6]
+        self.rot_accel = v[6:9]
+        self._dirty.add("motion")
 
         dbg(1,"acc", self.acc_vectors)
 
-    def decode_telem(self, data: BinaryDataReader):
-        packet_size = data.get_uint16()
-        tick = data.get_uint32()
+    def decode_telem(self, buf, offset: int):
+        packet_size, tick, length = TELEM_HEADER_STRUCT.unpack_from(buf, offset)
+        offset += TELEM_HEADER_STRUCT.size
 
-        # print(f"ACTIVE WINDOW: {get_focus_window.getActiveWindow().title}")
-
-
-        if packet_size == 12:
-            self.telem_data["SimPaused"] = 1
-        else:
-            self.telem_data["SimPaused"] = 0
-
-        try:
-            focus_window = get_focus_window.getActiveWindow().title
-        except:
-            focus_window = "unknown"
-        if "Il-2" in focus_window:
-            self.telem_data["Focus"] = 1
-            self.telem_data["SimPaused"] = 0
-        else:
-            self.telem_data["Focus"] = 0
-            self.telem_data["SimPaused"] = 1
+        focus = int(focus_poller.focused)
+        if focus != self.focus:
+            self.focus = focus
+            self._dirty.add("focus")
 
         dbg(1,f"telem tick {tick} size {packet_size}")
 
         self.state.tick = tick
 
-        length = data.get_uint8()
-        dbg(1,"len", length)
-
         ##
         ## Decode fixed structure telemetry data
         ##
+        handlers = self._state_handlers
         for _ in range(length):
-            
-            state_type = data.get_uint16()
-            state_length = data.get_uint8()
-
-            dbg(1,StateType(state_type), "len",  state_length)
-            
-            get_state_floats = lambda: [data.get_float() for i in range(0, state_length)]
-
-            if state_type == StateType.RPM:
-                self.state.engine_count = state_length
-                self.state.rpm = get_state_floats()
-
-            elif state_type == StateType.ManifoldPressure:
-                self.state.intake_manifold_pressure_pa = get_state_floats()
-
-            elif state_type == StateType.Val2:
-                self.state.val2 = get_state_floats()
-
-            elif state_type == StateType.Val3:
-                self.state.val3 = get_state_floats()
-
-            elif state_type == StateType.LandingGearPosition:
-                self.state.landing_gear_count = state_length
-                self.state.landing_gear_position = get_state_floats()
-
-            elif state_type == StateType.LandingGearPressure:
-                self.state.landing_gear_count = state_length
-                self.state.landing_gear_pressure = get_state_floats()
-
-            elif state_type == StateType.IndicatedAirspeed:
-                self.state.indicated_air_speed_metres_second = data.get_float()
-
-            elif state_type == StateType.Val7:
-                self.state.val7 = data.get_float()
-
-            elif state_type == StateType.Acceleration:
-                self.state.acceleration = get_state_floats()
-                self.state.acceleration_Gs = [x * mpss2gs for x in self.state.acceleration]
-
-            elif state_type == StateType.StallBuffet:
-                self.state.stall_buffet_frequency = data.get_float()
-                self.state.stall_buffet_amplitude = data.get_float()
-
-            elif state_type == StateType.AGL:
-                self.state.above_ground_level_metres = data.get_float()
+            state_type, state_length = RECORD_HEADER_STRUCT.unpack_from(buf, offset)
+            offset += RECORD_HEADER_STRUCT.size
 
-            elif state_type == StateType.FlapsPosition:
-                self.state.flaps_position = data.get_float()
-
-            elif state_type == StateType.AirBrakePosition:
-                self.state.air_brake_position = data.get_float()
-
-            else:
+            handler = handlers.get(state_type)
+            if handler is None:
                 logging.error(f"Unknown state type: {state_type}")
-
-        b = data.get_uint8()
-        dbg(1,"last byte", b)
-
-        self.decode_events(data)
-
-    def decode_events(self, data : BinaryDataReader) -> int:
-        dbg(1,"decode_events remaining_data:", data.remaining())
-        if data.remaining() < 2: return
-        # self.engine_maxrpm = []
+                offset += 4 * state_length # state payloads are arrays of floats
+                continue
+            offset = handler(self, buf, offset, state_length)
+
+        offset += 1 # trailing byte
+        self.decode_events(buf, offset)
+
+    # state decoders, called with the offset of the state payload, return the offset past it
+    def _state_rpm(self, buf, offset, n):
+        rpm = floats_struct(n).unpack_from(buf, offset)
+        if rpm != self.state.rpm:
+            self.state.engine_count = n
+            self.state.rpm = rpm
+            self._dirty.add("rpm")
+        return offset + 4 * n
+
+    def _state_manifold_pressure(self, buf, offset, n):
+        self.state.intake_manifold_pressure_pa = floats_struct(n).unpack_from(buf, offset)
+        return offset + 4 * n
+
+    def _state_val2(self, buf, offset, n):
+        self.state.val2 = floats_struct(n).unpack_from(buf, offset)
+        self._dirty.add("unknown")
+        return offset + 4 * n
+
+    def _state_val3(self, buf, offset, n):
+        self.state.val3 = floats_struct(n).unpack_from(buf, offset)
+        self._dirty.add("unknown")
+        return offset + 4 * n
+
+    def _state_gear_position(self, buf, offset, n):
+        pos = floats_struct(n).unpack_from(buf, offset)
+        if pos != self.state.landing_gear_position:
+            self.state.landing_gear_count = n
+            self.state.landing_gear_position = pos
+            self._dirty.add("gear_pos")
+        return offset + 4 * n
+
+    def _state_gear_pressure(self, buf, offset, n):
+        pressure = floats_struct(n).unpack_from(buf, offset)
+        if n >= 3:
+            ## Reorder gear to match DCS for function re-use
+            pressure = (pressure[0], pressure[2], pressure[1])
+        if pressure != self.state.landing_gear_pressure:
+            self.state.landing_gear_count = n
+            self.state.landing_gear_pressure = pressure
+            self._dirty.add("gear_pressure")
+        return offset + 4 * n
+
+    def _state_ias(self, buf, offset, n):
+        ias, = FLOAT_STRUCT.unpack_from(buf, offset)
+        if ias != self.state.indicated_air_speed_metres_second:
+            self.state.indicated_air_speed_metres_second = ias
+            self._dirty.add("ias")
+        return offset + 4
+
+    def _state_val7(self, buf, offset, n):
+        self.state.val7, = FLOAT_STRUCT.unpack_from(buf, offset)
+        self._dirty.add("unknown")
+        return offset + 4
+
+    def _state_acceleration(self, buf, offset, n):
+        acc = floats_struct(n).unpack_from(buf, offset)
+        if acc != self.state.acceleration:
+            self.state.acceleration = acc
+            self.state.acceleration_Gs = [x * mpss2gs for x in acc]
+            self._dirty.add("acc")
+        return offset + 4 * n
+
+    def _state_stall_buffet(self, buf, offset, n):
+        freq, amp = FLOAT2_STRUCT.unpack_from(buf, offset)
+        if freq != self.state.stall_buffet_frequency or amp != self.state.stall_buffet_amplitude:
+            self.state.stall_buffet_frequency, self.state.stall_buffet_amplitude = freq, amp
+            self._dirty.add("buffet")
+        return offset + 8
+
+    def _state_agl(self, buf, offset, n):
+        agl, = FLOAT_STRUCT.unpack_from(buf, offset)
+        if agl != self.state.above_ground_level_metres:
+            self.state.above_ground_level_metres = agl
+            self._dirty.add("agl")
+        return offset + 4
+
+    def _state_flaps(self, buf, offset, n):
+        flaps, = FLOAT_STRUCT.unpack_from(buf, offset)
+        if flaps != self.state.flaps_position:
+            self.state.flaps_position = flaps
+            self._dirty.add("flaps")
+        return offset + 4
+
+    def _state_air_brake(self, buf, offset, n):
+        air_brake, = FLOAT_STRUCT.unpack_from(buf, offset)
+        if air_brake != self.state.air_brake_position:
+            self.state.air_brake_position = air_brake
+            self._dirty.add("airbrake")
+        return offset + 4
+
+    _state_handlers = {
+        StateType.RPM: _state_rpm,
+        StateType.ManifoldPressure: _state_manifold_pressure,
+        StateType.Val2: _state_val2,
+        StateType.Val3: _state_val3,
+        StateType.LandingGearPosition: _state_gear_position,
+        StateType.LandingGearPressure: _state_gear_pressure,
+        StateType.IndicatedAirspeed: _state_ias,
+        StateType.Val7: _state_val7,
+        StateType.Acceleration: _state_acceleration,
+        StateType.StallBuffet: _state_stall_buffet,
+        StateType.AGL: _state_agl,
+        StateType.FlapsPosition: _state_flaps,
+        StateType.AirBrakePosition: _state_air_brake,
+    }
+
+    def decode_events(self, buf, offset: int):
+        end = len(buf)
+        dbg(1,"decode_events remaining_data:", end - offset)
+        if end - offset < 2: return
         dbg(1, "event packet")
-        while data.remaining():
-            eventType = data.get_uint16()
-            eventBytes = data.get_uint8()
-            try:
-                event = EventType(eventType)
-            except:
-                logging.warning(f"Unknown Event Type: {eventType}")
-                event = 'Unknown'
-            dbg(0,"-- event, type", event, "eventBytes", eventBytes)
-            dbg(0,hexdump(data.buffer[data.pointer:data.pointer+eventBytes]))
-            if eventType == EventType.MPServerInfo:
+        handlers = self._event_handlers
+        while offset < end:
+            event_type, event_bytes = RECORD_HEADER_STRUCT.unpack_from(buf, offset)
+            offset += RECORD_HEADER_STRUCT.size
+            dbg(0,"-- event, type", event_type, "eventBytes", event_bytes)
+
+            if event_type == EventType.MPServerInfo:
                 logging.debug("MP Server info received")
                 return
-            if eventType == EventType.VehicleName:
-                name_length = data.get_uint8()
-                name_data = data.get_data(name_length)
-                # print(f"NAMEDATA={name_data}")
-                name_hex = name_data.hex().upper()
-                aircraft_name = name_data.decode('ascii').rstrip('\x00')
-                # print(f"ACNAME={aircraft_name}")
-                # aircraft_name = ''.join(c for c in aircraft_name if ord(c) <= 127)
-                if aircraft_name != self.ac_name:
-                    logging.info(f"aircraft_name={aircraft_name} | self.ac_name={self.ac_name}")
-                    self.__init__()
-                    
-                self.ac_name = aircraft_name
-
-            elif eventType == EventType.EngineData:
-                index = data.get_uint16()
-                index2 = data.get_uint16()
-                engine_data = data.get_vector3f()
-                max_rpm = data.get_float()
-                if len(self.engine_maxrpm) <= index:
-                    self.engine_maxrpm.append(max_rpm)
-                else:
-                    self.engine_maxrpm[index] = max_rpm
-                dbg(1,"EngineData", f"{index=} {index2=} {engine_data=} {max_rpm=}")
-
-
-            elif eventType == EventType.GunData:
-                index = data.get_uint16()
-                offset = data.get_vector3f()
-                mass = data.get_float()
-                velocity = data.get_float()
-                dbg(1,"GunData", f"{index=} {offset=} {mass=} {velocity=}")
-
-                if len(self.gun_data) <= index:
-                    self.gun_data.append([round(mass,4), velocity])
-                else:
-                    self.gun_data[index] = ([round(mass, 4), velocity])
-
-
-            elif eventType == EventType.GunFired:
-                gun_index = data.get_uint8()
-                dbg(1,"GunFired", gun_index)
-                if len(self.guns_fired) < gun_index + 1:
-                    self.guns_fired.append(0)
-                else:
-                    self.guns_fired[gun_index] += 1
-
-            elif eventType == EventType.WheelData:
-                index = data.get_uint16()
-                index2 = data.get_uint16()
-                offset = data.get_vector3f() # wheel positions in 3d space
-                dbg(1,f"{index=} {index2=} {offset=}")
-
-
-            elif eventType == EventType.BombRelease:
-                index = data.get_vector3f()
-                print(f"BOMB-{index}")
-                mass = data.get_float()
-                type = data.get_uint16()
-
-                dbg(1,f"{index=} {mass=} {type=}")
-
-                # self.bombs_data = []
-                self.bombs_released[0] = mass
-                self.bombs_released[1] += 1
-
-            elif eventType == EventType.RocketLaunch:
-                offset = data.get_vector3f()
-                mass = data.get_float()
-                type = data.get_uint16()
-                dbg(1,f"{offset=} {mass=} {type=}")
-
-                self.rockets_fired[0] = mass
-                self.rockets_fired[1] += 1
-
-            elif eventType == EventType.Event6:
-                vec0 = data.get_vector3f()
-                vec1 = data.get_vector3f()
-                self.ev6_data = (vec0, vec1)
-
-            elif eventType == EventType.Hit:
-                offset = data.get_vector3f()
-                force = data.get_vector3f()
-                dbg(1, "HIT EVENT", f"{offset=} {force=}")
-
-                self.hit_data = (offset, force)
-                self.hit_events += 1
-
-            elif eventType == EventType.Damage:
-                offset = data.get_vector3f()
-                float0 = data.get_float()
-                dbg(1, "DAMAGE", f"{offset=} {float0=}")
-
-                self.ev_damage_data = (offset, float0)
-                self.damage_events += 1
-
-            elif eventType == EventType.CurrentSeat:
-                # Triggers on seat change     
-                # Seems to be all 1s (4294967295) if pilot or co-pilot, and 1023 if any gunner
-                # Not sure what the ushort value represents, but seems to be 1 or 2
-                seat = data.get_uint32()
-                ushort0 = data.get_uint16()
-
-                self.seat_data = [seat, ushort0]
-                dbg(1, "SEAT", f"{seat=} {ushort0=}")
-
-            elif eventType == EventType.Event13:
-                # ev13_length = data.get_uint8()
-                ev13_data = data.get_data(eventBytes)
-                ev13_hex = ev13_data.hex().upper()
-                # ev13_name = ev13_data.decode('ascii').strip()
-                # self.ev13_data = data.get_vector3f()
-                # b = data.get_uint8() #get last byte
-            elif eventType == EventType.Event14:
-                data1 = data.get_int32()
-                data2 = data.get_int16()
-                dbg(1,"EVENT-14", f"{data1=} {data2=}")
-                self.ev14_data = [data1, data2]
-            else:
-                logging.error(f"Unknown event type: {eventType}")
-
-
-    def fmt(self, val):
-        if isinstance(val, list):
-            return "~".join([str(x) for x in val])
-        return val
+
+            handler = handlers.get(event_type)
+            if handler is None:
+                logging.error(f"Unknown event type: {event_type}")
+                offset += event_bytes
+                continue
+            offset = handler(self, buf, offset, event_bytes)
+
+    # event decoders, called with the offset of the event payload, return the offset past it
+    def _event_vehicle_name(self, buf, offset, n):
+        name_length = buf[offset]
+        name_data = bytes(buf[offset + 1:offset + 1 + name_length])
+        aircraft_name = name_data.decode('ascii').rstrip('\x00')
+        if aircraft_name != self.ac_name:
+            logging.info(f"aircraft_name={aircraft_name} | self.ac_name={self.ac_name}")
+            self.reset()
+
+        self.ac_name = aircraft_name
+        self._dirty.add("name")
+        return offset + 1 + name_length
+
+    def _event_engine_data(self, buf, offset, n):
+        index, index2, x, y, z, max_rpm = ENGINE_DATA_STRUCT.unpack_from(buf, offset)
+        if len(self.engine_maxrpm) <= index:
+            self.engine_maxrpm.append(max_rpm)
+        else:
+            self.engine_maxrpm[index] = max_rpm
+        self._dirty.add("maxrpm")
+        dbg(1,"EngineData", f"{index=} {index2=} {max_rpm=}")
+        return offset + ENGINE_DATA_STRUCT.size
+
+    def _event_gun_data(self, buf, offset, n):
+        index, x, y, z, mass, velocity = GUN_DATA_STRUCT.unpack_from(buf, offset)
+        dbg(1,"GunData", f"{index=} {mass=} {velocity=}")
+
+        if len(self.gun_data) <= index:
+            self.gun_data.append([round(mass,4), velocity])
+        else:
+            self.gun_data[index] = ([round(mass, 4), velocity])
+        self._dirty.add("gun_data")
+        return offset + GUN_DATA_STRUCT.size
+
+    def _event_gun_fired(self, buf, offset, n):
+        gun_index = buf[offset]
+        dbg(1,"GunFired", gun_index)
+        if len(self.guns_fired) < gun_index + 1:
+            self.guns_fired.append(0)
+        else:
+            self.guns_fired[gun_index] += 1
+        self._dirty.add("gun")
+        return offset + 1
+
+    def _event_wheel_data(self, buf, offset, n):
+        # wheel positions in 3d space, unused
+        return offset + WHEEL_DATA_STRUCT.size
+
+    def _event_bomb_release(self, buf, offset, n):
+        x, y, z, mass, type = RELEASE_STRUCT.unpack_from(buf, offset)
+        dbg(1,f"BOMB {mass=} {type=}")
+
+        self.bombs_released[0] = mass
+        self.bombs_released[1] += 1
+        self._dirty.add("bombs")
+        return offset + RELEASE_STRUCT.size
+
+    def _event_rocket_launch(self, buf, offset, n):
+        x, y, z, mass, type = RELEASE_STRUCT.unpack_from(buf, offset)
+        dbg(1,f"ROCKET {mass=} {type=}")
+
+        self.rockets_fired[0] = mass
+        self.rockets_fired[1] += 1
+        self._dirty.add("rockets")
+        return offset + RELEASE_STRUCT.size
+
+    def _event_6(self, buf, offset, n):
+        v = VECTOR2_STRUCT.unpack_from(buf, offset)
+        self.ev6_data = (list(v[0:3]), list(v[3:6]))
+        self._dirty.add("unknown")
+        return offset + VECTOR2_STRUCT.size
+
+    def _event_hit(self, buf, offset, n):
+        v = VECTOR2_STRUCT.unpack_from(buf, offset)
+        dbg(1, "HIT EVENT", v)
+
+        self.hit_data = (list(v[0:3]), list(v[3:6]))
+        self.hit_events += 1
+        self._dirty.add("hits")
+        return offset + VECTOR2_STRUCT.size
+
+    def _event_damage(self, buf, offset, n):
+        x, y, z, float0 = DAMAGE_STRUCT.unpack_from(buf, offset)
+        dbg(1, "DAMAGE", f"{float0=}")
+
+        self.ev_damage_data = ([x, y, z], float0)
+        self.damage_events += 1
+        self._dirty.add("damage")
+        return offset + DAMAGE_STRUCT.size
+
+    def _event_current_seat(self, buf, offset, n):
+        # Triggers on seat change
+        # Seems to be all 1s (4294967295) if pilot or co-pilot, and 1023 if any gunner
+        # Not sure what the ushort value represents, but seems to be 1 or 2
+        seat, ushort0 = SEAT_STRUCT.unpack_from(buf, offset)
+        self.seat_data = [seat, ushort0]
+        self._dirty.add("seat")
+        dbg(1, "SEAT", f"{seat=} {ushort0=}")
+        return offset + SEAT_STRUCT.size
+
+    def _event_13(self, buf, offset, n):
+        return offset + n
+
+    def _event_14(self, buf, offset, n):
+        data1, data2 = EVENT14_STRUCT.unpack_from(buf, offset)
+        dbg(1,"EVENT-14", f"{data1=} {data2=}")
+        self.ev14_data = [data1, data2]
+        self._dirty.add("unknown")
+        return offset + EVENT14_STRUCT.size
+
+    _event_handlers = {
+        EventType.VehicleName: _event_vehicle_name,
+        EventType.EngineData: _event_engine_data,
+        EventType.GunData: _event_gun_data,
+        EventType.WheelData: _event_wheel_data,
+        EventType.BombRelease: _event_bomb_release,
+        EventType.RocketLaunch: _event_rocket_launch,
+        EventType.Event6: _event_6,
+        EventType.Hit: _event_hit,
+        EventType.Damage: _event_damage,
+        EventType.GunFired: _event_gun_fired,
+        EventType.CurrentSeat: _event_current_seat,
+        EventType.Event13: _event_13,
+        EventType.Event14: _event_14,
+    }
 
 
 def log_il2_trace():
@@ -573,23 +677,24 @@ def log_il2_trace():
             print("Exit")
             break
 
-def test_il2_trace():
+def read_il2_trace(path='il2_test_data.gz') -> List[bytes]:
+    """Read the packets of a trace written by log_il2_trace"""
     import gzip
     import base64
 
-    il2 = IL2Manager()
-
-    f = gzip.open('il2_test_data.gz', 'r')
-    while True:
-        line = f.readline()
-        if not line: break
-        if line.startswith(b"t"):
-            t = float(line.split(b"=")[1])
-            data = base64.b64decode(f.readline())
+    packets = []
+    with gzip.open(path, 'r') as f:
+        while True:
+            line = f.readline()
+            if not line: break
+            if line.startswith(b"t"):
+                packets.append(base64.b64decode(f.readline()))
+    return packets
 
-            il2.process_packet(data)
+def test_il2_trace():
+    il2 = IL2Manager()
+    for data in read_il2_trace():
+        il2.process_packet(data)
 
 if __name__ == "__main__":
     test_il2_trace()
-            
-        
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import socket
+import threading
+
+from telemffb.telem.NetworkThread import DEFAULT_RCVBUF, TelemReceiver, open_udp_socket
+from telemffb.telem.TelemManager import TelemManager
+
+
+class HubListener:
+    """UDP telemetry listener serviced by a ListenerHub, interface compatible with NetworkThread"""
+    def __init__(self, hub: "ListenerHub", telemetry: TelemManager, host, port, telem_parser=None, rcvbuf=DEFAULT_RCVBUF):
+        self._hub = hub
+        self._host = host
+        self._port = port
+        self._rcvbuf = rcvbuf
+        self._receiver = TelemReceiver(telemetry, telem_parser)
+        self._sock : socket.socket = None
+
+    def start(self):
+        self._sock = open_udp_socket(self._host, self._port, self._rcvbuf)
+        logging.info(f"Listening on UDP {self._host}:{self._port} (listener hub)")
+        self._hub.call(self._hub.loop.add_reader, self._sock, self._receiver.drain, self._sock)
+
+    def quit(self):
+        sock = self._sock
+        if sock:
+            self._sock = None
+            logging.info(f"Listener on UDP port {self._port} stopping")
+
+            def remove():
+                self._hub.loop.remove_reader(sock)
+                sock.close()
+            self._hub.call(remove)
+
+    def is_alive(self) -> bool:
+        return self._sock is not None
+
+
+class ListenerHub(threading.Thread):
+    """Services all UDP telemetry sockets from a single selector event loop thread
+
+    Used instead of one NetworkThread per simulator when enabled with --listener-hub.
+    Receiving and dispatching into TelemManager is identical to NetworkThread.
+    """
+    def __init__(self):
+        super().__init__(daemon=True, name="ListenerHub")
+        self.loop = asyncio.SelectorEventLoop()
+
+    def listener(self, telemetry: TelemManager, host="", port=34380, telem_parser=None, rcvbuf=DEFAULT_RCVBUF) -> HubListener:
+        """Create a listener for `port`, started with its start() method"""
+        return HubListener(self, telemetry, host, port, telem_parser, rcvbuf)
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the hub thread"""
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def quit(self):
+        if self.is_alive():
+            self.call(self.loop.stop)
+            self.join()
@@ -1,41 +1,112 @@
 import logging
+import select
 import socket
 import threading
+import time
 
 from telemffb.telem.TelemManager import TelemManager
 
+MAX_DATAGRAM = 65536
+DEFAULT_RCVBUF = 256 * 1024
+
+
+def open_udp_socket(host: str, port: int, rcvbuf=DEFAULT_RCVBUF) -> socket.socket:
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    s.setblocking(False)
+    s.bind((host, port))
+    return s
+
+
+class TelemReceiver:
+    """Receive side of a telemetry UDP socket, shared by NetworkThread and ListenerHub
+
+    Datagrams are received into a preallocated buffer with recvfrom_into. drain()
+    reads all queued datagrams and only the newest telemetry frame is submitted,
+    events are always delivered.
+
+    A `telem_parser` (IL2Manager) returns the telemetry keys changed by each packet,
+    these are merged over the drain and submitted as a delta frame.
+    """
+    def __init__(self, telemetry: TelemManager, telem_parser=None):
+        self._telem : TelemManager = telemetry
+        self._telem_parser = telem_parser
+        self._buf = bytearray(MAX_DATAGRAM)
+        self._view = memoryview(self._buf)
+
+    def drain(self, s: socket.socket):
+        view = self._view
+        parser = self._telem_parser
+        frame = None
+        t_recv = None
+
+        while True:
+            try:
+                n, sender = s.recvfrom_into(self._buf)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue
+            t_recv = time.perf_counter()
+
+            if parser is not None:
+                # the parser is stateful (motion and telemetry packets, events), every packet
+                # updates its state and the changes are submitted once per drain
+                changes = parser.process_packet(view[:n])
+                if frame is None:
+                    frame = changes
+                else:
+                    frame.update(changes)
+            elif n >= 3 and self._buf.startswith(b"Ev="):
+                self._telem.submit_frame(bytes(view[:n]), t_recv)
+            else:
+                # only the newest frame is kept, copy it out of the receive buffer
+                frame = bytes(view[:n])
+
+        if frame is not None:
+            if parser is not None:
+                # parsers produce typed frames, hand them over without text serialization
+                self._telem.submit_telem(frame, t_recv, delta=True)
+            else:
+                self._telem.submit_frame(frame, t_recv)
+
+
 class NetworkThread(threading.Thread):
-    def __init__(self, telemetry: TelemManager, host="", port=34380, telem_parser=None):
+    """UDP telemetry listener thread
+
+    quit() wakes the thread through a socket pair so there is no timeout polling.
+    """
+    def __init__(self, telemetry: TelemManager, host="", port=34380, telem_parser=None, rcvbuf=DEFAULT_RCVBUF):
         super().__init__()
         self._run = False
         self._port = port
         self._host = host
-        self._telem : TelemManager = telemetry
-        self._telem_parser = telem_parser
+        self._rcvbuf = rcvbuf
+        self._receiver = TelemReceiver(telemetry, telem_parser)
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
 
     def run(self):
         self._run = True
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
-
-        s.settimeout(0.1)
-        s.bind((self._host, self._port))
+        s = open_udp_socket(self._host, self._port, self._rcvbuf)
         logging.info(f"Listening on UDP {self._host}:{self._port}")
 
-        while self._run:
-            try:
-                data, sender = s.recvfrom(4096)
-                if self._telem_parser is not None:
-                    data = self._telem_parser.process_packet(data)
-
-                self._telem.submit_frame(data)
-            except ConnectionResetError:
-                continue
-            except socket.timeout:
-                continue
+        try:
+            while self._run:
+                readable, _, _ = select.select([s, self._wakeup_r], [], [])
+                if self._wakeup_r in readable:
+                    break
+                self._receiver.drain(s)
+        finally:
+            s.close()
+            self._wakeup_r.close()
+            self._wakeup_w.close()
 
     def quit(self):
         if self._run:
             logging.info(f"NetworkThread stopping")
-            self._run = False
\ No newline at end of file
+            self._run = False
+            try:
+                self._wakeup_w.send(b"\0")
+            except OSError:
+                pass  # thread already exited
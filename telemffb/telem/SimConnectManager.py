@@ -1,12 +1,36 @@
 from simconnect import *
 from ctypes import byref, cast, sizeof
-from telemffb.utils import dbprint
+from telemffb.utils import dbprint, latency
+import ctypes
+import struct
+import sys
 import time
 import threading
 import logging
 import os
 import telemffb.globals as G
 
+# longest wait for a SimConnect message before queued outgoing events/simdatums are checked again
+DISPATCH_WAIT_TIMEOUT = 0.05
+# sleep between GetNextDispatch calls when no event handle is available
+DISPATCH_POLL_INTERVAL = 0.001
+
+# SimVar update rate tiers, every tier is requested with its own data definition
+RATE_FRAME = "frame"    # every sim frame
+RATE_SLOW = "slow"      # every SLOW_RATE_FRAMES sim frames
+RATE_SECOND = "second"  # once per second
+RATE_ONCE = "once"      # once per aircraft load
+SLOW_RATE_FRAMES = 6
+# (period, number of periods between records) of each tier, in subscription order
+_RATE_PERIODS = {
+    RATE_FRAME: (PERIOD_SIM_FRAME, 1),
+    RATE_SLOW: (PERIOD_SIM_FRAME, SLOW_RATE_FRAMES - 1),
+    RATE_SECOND: (PERIOD_SECOND, 0),
+    RATE_ONCE: (PERIOD_ONCE, 0),
+}
+# longest time telemetry frames are held back after subscribing until every tier has been received
+RATE_PRIME_TIMEOUT = 2.0
+
 surface_types = {
     0: "Concrete",
     1: "Grass",
@@ -36,9 +60,10 @@ surface_types = {
 }
 
 class SimVar:
-    def __init__(self, name, var, sc_unit, unit=None, datatype=DATATYPE_FLOAT64, scale=None, mutator=None):
+    def __init__(self, name, var, sc_unit, unit=None, datatype=DATATYPE_FLOAT64, scale=None, mutator=None, rate=RATE_FRAME):
         self.name = name
         self.var = var
+        self.rate = rate
         self.scale = scale
         self.mutator = mutator
         self.sc_unit = sc_unit
@@ -59,21 +84,12 @@ class SimVar:
     def __repr__(self) -> str:
         return f"SimVar({self.name} '{self.var}')"
 
-    @property
-    def c_type(self):
-        types = {
-            DATATYPE_FLOAT64: c_double,
-            DATATYPE_FLOAT32: c_float,
-            DATATYPE_INT32: c_long,
-            DATATYPE_STRING32: c_char*32,
-            DATATYPE_STRING128: c_char*128
-        }
-        return types[self.datatype]
 
 class SimVarArray:
-    def __init__(self, name, var, unit, type=DATATYPE_FLOAT64, scale=None, min=0, max=1, keywords=None):
+    def __init__(self, name, var, unit, type=DATATYPE_FLOAT64, scale=None, min=0, max=1, keywords=None, rate=RATE_FRAME):
         self.name = name
         self.var = var
+        self.rate = rate
         self.unit = unit
         self.type = type
         self.scale = scale
@@ -86,7 +102,7 @@ class SimVarArray:
             for key in keywords:
                 index = keywords.index(key)
                 simvar = var.replace("<>", key)
-                v = SimVar(name, simvar, unit, None, type, scale)
+                v = SimVar(name, simvar, unit, None, type, scale, rate=rate)
                 v.index = index
                 v.parent = self
                 self.vars.append(v)
@@ -96,7 +112,7 @@ class SimVarArray:
                 if index < min:
                     self.values.append(0)
                 else:
-                    v = SimVar(name, f"{var}:{index}", unit, None, type, scale)
+                    v = SimVar(name, f"{var}:{index}", unit, None, type, scale, rate=rate)
                     v.index = index
                     v.parent = self
                     self.vars.append(v)
@@ -105,26 +121,227 @@ class SimVarArray:
         """Return new SimVarArray object with copied values from called instance.
         This method is used to create a separate copy of existing SimVarArrays for editing during dynamic
         subscriptions without modifying the original array"""
-        cloned_sv_array = SimVarArray(self.name, self.var, self.unit, type=self.type, scale=self.scale, min=self.min, max=self.max, keywords=self.keywords)
+        cloned_sv_array = SimVarArray(self.name, self.var, self.unit, type=self.type, scale=self.scale, min=self.min, max=self.max, keywords=self.keywords, rate=self.rate)
         return cloned_sv_array
 
 
 
+# struct formats of the SimConnect data types, as laid out in RECV_SIMOBJECT_DATA
+_DATATYPE_FORMATS = {
+    DATATYPE_FLOAT64: "d",
+    DATATYPE_FLOAT32: "f",
+    DATATYPE_INT32: "i",
+    DATATYPE_STRING32: "32s",
+    DATATYPE_STRING128: "128s",
+}
+_DWORD = struct.Struct("<I")
+
+
+def _decode_string(val: bytes) -> str:
+    return str(val.split(b"\0", 1)[0], "utf-8")
+
+
+class SimVarDecoder:
+    """Decoder for the RECV_SIMOBJECT_DATA payload of a data definition
+
+    Compiled once per subscription from the subscribed SimVars (index = datum id) into a
+    table of (struct, key, array values, array slot, conversion). Tagged data is decoded
+    field by field from the table, untagged data with a single struct covering the whole record.
+    """
+    def __init__(self, subscribed_vars):
+        self.entries = []
+        # what the SimConnect data definition holds, compared to find subscription changes
+        self.signature = tuple((var.var, var.sc_unit, var.datatype) for var in subscribed_vars)
+        for var in subscribed_vars:
+            fmt = _DATATYPE_FORMATS[var.datatype]
+            convert = self._converter(var, fmt)
+            if var.parent: # var is part of array, values are written to the array list
+                parent = var.parent
+                entry = (struct.Struct("<" + fmt), parent.name, parent.values, var.index - parent.min, convert)
+            else:
+                entry = (struct.Struct("<" + fmt), var.name, None, 0, convert)
+            self.entries.append(entry)
+        self.record = struct.Struct("<" + "".join(_DATATYPE_FORMATS[var.datatype] for var in subscribed_vars))
+
+    @staticmethod
+    def _converter(var, fmt):
+        if fmt.endswith("s"):
+            if var.mutator or var.scale:
+                return lambda val: var._calculate(_decode_string(val))
+            return _decode_string
+        if var.mutator or var.scale:
+            return var._calculate
+        return None
+
+    @staticmethod
+    def _store(data, entry, val):
+        _, key, values, slot, convert = entry
+        if convert:
+            val = convert(val)
+        if values is not None:
+            values[slot] = val
+            data[key] = values
+        else:
+            data[key] = val
+
+    def decode_tagged(self, buf, offset: int, count: int, data: dict):
+        entries = self.entries
+        for _ in range(count):
+            idx, = _DWORD.unpack_from(buf, offset)
+            offset += 4
+            if idx >= len(entries):
+                logging.warning(f"SimConnect data for unknown datum id {idx}")
+                break
+            entry = entries[idx]
+            st = entry[0]
+            val, = st.unpack_from(buf, offset)
+            offset += st.size
+            self._store(data, entry, val)
+
+    def decode_untagged(self, buf, offset: int, data: dict):
+        for entry, val in zip(self.entries, self.record.unpack_from(buf, offset)):
+            self._store(data, entry, val)
+
+
+class OutboundQueue:
+    """Keyed queue of writes to the sim, coalescing to the latest value per key
+
+    A key queued again before it was sent keeps its place and first queued time, only the
+    value is replaced, so the queue never grows beyond the number of distinct keys.
+    Items are taken as one batch per dispatch loop iteration.
+    """
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._items = {}  # key -> (key, value, perf_counter() time first queued)
+        self._seq = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.queued = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.max_latency = 0
+
+    def put(self, key, value, coalesce=True):
+        with self._lock:
+            self.queued += 1
+            slot = key
+            if not coalesce:
+                self._seq += 1
+                slot = (self, self._seq) # unique slot, never matches a queued key
+            item = self._items.get(slot)
+            if item is not None:
+                self.coalesced += 1
+                self._items[slot] = (key, value, item[2])
+            else:
+                self._items[slot] = (key, value, time.perf_counter())
+                self.max_depth = max(self.max_depth, len(self._items))
+
+    def take(self) -> list:
+        """Remove and return all queued (key, value, time queued) items"""
+        if not self._items:
+            return []
+        with self._lock:
+            items, self._items = self._items, {}
+        return list(items.values())
+
+    def done(self, t_queued, ok=True):
+        """Account for a sent item queued at `t_queued`"""
+        dt = time.perf_counter() - t_queued
+        self.sent += 1
+        if not ok:
+            self.errors += 1
+        self.max_latency = max(self.max_latency, dt)
+        if latency.enabled:
+            latency.add(f"{self.name}_tx", dt)
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_stats(self) -> dict:
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "errors": self.errors,
+            "max_latency_ms": round(self.max_latency * 1000, 3),
+        }
+
+
 EV_PAUSED = 65499 # id for paused event
 EV_STARTED = 65498 # id for started event
 EV_STOPPED = 65497  # id for stopped event
 EV_SIMSTATE = 65496
+class PollingWaiter:
+    """Fallback dispatch waiter, sleeps for a fixed interval"""
+    handle = None
+
+    def __init__(self, interval=DISPATCH_POLL_INTERVAL):
+        self.interval = interval
+
+    def wait(self, timeout):
+        time.sleep(min(self.interval, timeout))
+
+    def wake(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Win32EventWaiter:
+    """Waits on a Win32 auto-reset event which SimConnect signals when messages are queued"""
+    def __init__(self):
+        from ctypes import wintypes
+        self._k32 = ctypes.windll.kernel32
+        self._k32.CreateEventW.restype = wintypes.HANDLE
+        self._k32.CreateEventW.argtypes = [ctypes.c_void_p, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+        self._k32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        self._k32.SetEvent.argtypes = [wintypes.HANDLE]
+        self._k32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self.handle = self._k32.CreateEventW(None, False, False, None)
+        if not self.handle:
+            raise ctypes.WinError()
+
+    def wait(self, timeout):
+        self._k32.WaitForSingleObject(self.handle, int(timeout * 1000))
+
+    def wake(self):
+        self._k32.SetEvent(self.handle)
+
+    def close(self):
+        if self.handle:
+            self._k32.CloseHandle(self.handle)
+            self.handle = None
+
+
+class EventSimConnect(SimConnect):
+    """SimConnect session opened with a Win32 event handle, which SimConnect signals whenever
+    messages are queued. The wrapper's constructor always opens the session without one, so
+    the session it opens is closed and reopened with the handle."""
+    def __init__(self, name, event_handle, **kwargs):
+        super().__init__(name, **kwargs)
+        self.Close()
+        # SimConnect_Open(phSimConnect, szName, hWnd, UserEventWin32, hEventHandle, ConfigIndex)
+        self._decls['Open'](byref(self.hsc), name.encode('utf-8'), None, 0, event_handle, 0)
+
+
 class SimConnectManager(threading.Thread):
 
     sim_vars = [
         SimVar("T", "ABSOLUTE TIME","Seconds" ),
-        SimVar("N", "TITLE", "", datatype=DATATYPE_STRING128),
+        SimVar("N", "TITLE", "", datatype=DATATYPE_STRING128, rate=RATE_SECOND),
         SimVar("G", "G FORCE", "Number"),
         SimVarArray("AccBody", "ACCELERATION BODY <>", "feet per second squared", scale=0.031081, keywords=("X", "Y", "Z")), #scale fps/s to g
         SimVar("TAS", "AIRSPEED TRUE", "meter/second"),
         SimVar("IAS", "AIRSPEED INDICATED", "meter/second"),
         SimVar("GroundSpeed", "GROUND VELOCITY", "meter/second"),
-        SimVar("AirDensity", "AMBIENT DENSITY", "kilograms per cubic meter"),
+        SimVar("AirDensity", "AMBIENT DENSITY", "kilograms per cubic meter", rate=RATE_SECOND),
         SimVar("AoA", "INCIDENCE ALPHA", "degrees"),
         SimVar("StallAoA", "STALL ALPHA", "degrees"),
         SimVar("SideSlip", "INCIDENCE BETA", "degrees"),
@@ -141,7 +358,7 @@ class SimConnectManager(threading.Thread):
         SimVarArray("PropRPM", "PROP RPM", "RPM", min=1, max=4),
         SimVar("RotorRPM", "ROTOR RPM:1", "RPM"),
         SimVar("DynPressure", "DYNAMIC PRESSURE", "pascal"),
-        SimVar("APMaster", "AUTOPILOT MASTER", "Bool"),
+        SimVar("APMaster", "AUTOPILOT MASTER", "Bool", rate=RATE_SLOW),
         SimVar("RudderDefl", "RUDDER DEFLECTION", "degrees"),
         SimVar("RudderDeflPct", "RUDDER DEFLECTION PCT", "Percent Over 100"),
         SimVar("RudderTrimPct", "RUDDER TRIM PCT", "Percent Over 100"),
@@ -156,26 +373,26 @@ class SimConnectManager(threading.Thread):
         SimVar("PitchAccel", "ROTATION ACCELERATION BODY X", "degrees per second squared"), # todo replace usage with AccRotBody array
         SimVar("RollAccel", "ROTATION ACCELERATION BODY Z", "degrees per second squared"), # todo replace usage with AccRotBody array
         SimVarArray("AccRotBody", "ROTATION ACCELERATION BODY <>", "degrees per second squared", keywords=("X", "Y", "Z")),
-        SimVarArray("DesignSpeed", "DESIGN SPEED <>", "meter/second", keywords=("VC", "VS0", "VS1")),
+        SimVarArray("DesignSpeed", "DESIGN SPEED <>", "meter/second", keywords=("VC", "VS0", "VS1"), rate=RATE_ONCE),
         SimVar("VerticalSpeed", "VERTICAL SPEED", "meter/second"),
         SimVarArray("Brakes", "BRAKE <> POSITION", "Position", keywords=("LEFT", "RIGHT")),
         #SimVar("LinearCLAlpha", "LINEAR CL ALPHA", "Per Radian"),
         #SimVar("SigmaSqrt", "SIGMA SQRT", "Per Radian"),
-        SimVar("SimDisabled", "SIM DISABLED", "Bool"),
+        SimVar("SimDisabled", "SIM DISABLED", "Bool", rate=RATE_SLOW),
         SimVar("SimOnGround", "SIM ON GROUND", "Bool"),
-        SimVar("Parked", "PLANE IN PARKING STATE", "Bool"),
-        SimVar("Slew", "IS SLEW ACTIVE", "Bool"),
-        SimVar("SurfaceType", "SURFACE TYPE", "Enum", mutator=lambda x: surface_types.get(x, "unknown")),
-        SimVar("SimconnectCategory", "CATEGORY", "", datatype=DATATYPE_STRING128),
-        SimVar("EngineType", "ENGINE TYPE", "Enum"),
+        SimVar("Parked", "PLANE IN PARKING STATE", "Bool", rate=RATE_SLOW),
+        SimVar("Slew", "IS SLEW ACTIVE", "Bool", rate=RATE_SLOW),
+        SimVar("SurfaceType", "SURFACE TYPE", "Enum", mutator=lambda x: surface_types.get(x, "unknown"), rate=RATE_SLOW),
+        SimVar("SimconnectCategory", "CATEGORY", "", datatype=DATATYPE_STRING128, rate=RATE_ONCE),
+        SimVar("EngineType", "ENGINE TYPE", "Enum", rate=RATE_ONCE),
         SimVarArray("EngRPM", "GENERAL ENG PCT MAX RPM", "percent", min=1, max=4),
-        SimVar("NumEngines", "NUMBER OF ENGINES", "Number", datatype=DATATYPE_INT32),
+        SimVar("NumEngines", "NUMBER OF ENGINES", "Number", datatype=DATATYPE_INT32, rate=RATE_ONCE),
         SimVarArray("AmbWind", "AMBIENT WIND <>", "meter/second", keywords= ("X", "Y", "Z")),
         SimVarArray("VelWorld", "VELOCITY WORLD <>", "meter/second", keywords= ("X", "Y", "Z")),
         SimVarArray("WeightOnWheels", "CONTACT POINT COMPRESSION", "Number", min=0, max=2),
         SimVarArray("Flaps", "TRAILING EDGE FLAPS <> PERCENT", "Percent Over 100", keywords=("LEFT", "RIGHT")),
         SimVarArray("Gear", "GEAR <> POSITION", "Percent Over 100", keywords=("LEFT", "RIGHT")),
-        SimVarArray("RetractableGear", "IS GEAR RETRACTABLE", "bool"),
+        SimVarArray("RetractableGear", "IS GEAR RETRACTABLE", "bool", rate=RATE_ONCE),
         SimVarArray("Spoilers", "SPOILERS <> POSITION", "Percent Over 100", keywords=("LEFT", "RIGHT")),
         SimVarArray("Afterburner", "TURB ENG AFTERBURNER", "Number", min=1, max=2),
         SimVar("AfterburnerPct", "TURB ENG AFTERBURNER PCT ACTIVE", "Percent Over 100"),
@@ -190,18 +407,29 @@ class SimConnectManager(threading.Thread):
 
     ]
 
-    def __init__(self):
+    def __init__(self, changed_only=False):
         threading.Thread.__init__(self, daemon=True)
         self.sc = None
         self._quit = False
+        # request only changed simvars (DATA_REQUEST_FLAG_CHANGED)
+        self.changed_only = changed_only
+        # records of all rate tiers are merged into this state, a copy is emitted with every frame tier record
+        self._state = {}
+        self._definitions = {}  # def_id (= request id) -> (rate tier, SimVarDecoder)
+        self._pending_defs = set()  # definitions not yet received since subscribing
+        self._prime_deadline = 0
+        self._t_dispatch = None  # perf_counter() time of the last received dispatch, for latency statistics
+        self._session_quit = False
+        self._waiter = PollingWaiter()
         self.initial_subscribe_done = False
         self._sim_paused = False
         self._sim_started = 0
         self._sim_state = 0
         self._stop_state = 0
         self._final_frame_sent = 0
-        self._events_to_send = []
-        self._simdatums_to_send = []
+        # outgoing writes, coalesced to the latest value per event / simvar
+        self._events_to_send = OutboundQueue("msfs_event")
+        self._simdatums_to_send = OutboundQueue("msfs_simdatum")
         self.subscribed_vars = []
         self.temp_sim_vars = []
         self.temp_sv_array_element = []
@@ -209,9 +437,10 @@ class SimConnectManager(threading.Thread):
         self.current_simvars = []
         self.current_var_tracker = []
         self.new_var_tracker = []
-        self.req_id = os.getpid()
         self.def_id = os.getpid()
         self.sv_dict = {}
+        self._overrides_key = None  # overrides the resolved simvar list was built from
+        self._resolved_sim_vars = []
 
 
 
@@ -225,7 +454,23 @@ class SimConnectManager(threading.Thread):
         else:
             self.temp_sim_vars.append(SimVar(name, var, sc_unit, unit=unit, datatype=datatype, scale=scale, mutator=mutator))
         
+    @staticmethod
+    def _overrides_signature(simvars):
+        return tuple((sv.name, sv.index, sv.var, sv.sc_unit, sv.unit, sv.datatype, sv.scale, sv.mutator, sv.rate)
+                     for sv in simvars)
+
     def substitute_simvars(self):
+        # the same overrides are set again on every aircraft load and config change, reuse the last result
+        key = (self._overrides_signature(self.temp_sim_vars), self._overrides_signature(self.temp_sv_array_element))
+        if key == self._overrides_key:
+            self.temp_sim_vars.clear()
+            self.temp_sv_array_element.clear()
+            return self._resolved_sim_vars
+        self._overrides_key = key
+        self._resolved_sim_vars = self._resolve_simvars()
+        return self._resolved_sim_vars
+
+    def _resolve_simvars(self):
         # build a combined list of the pre-defined simvars from __init__ and any new/updated simvars that have been set by a model
         master_list = list(self.sim_vars)
         override_list = list(self.temp_sim_vars)
@@ -265,6 +510,11 @@ class SimConnectManager(threading.Thread):
 
             override_dict[sv_array.name] = sv_array
 
+        for name, sv in override_dict.items():
+            # an override is read at the rate of the simvar it replaces
+            if isinstance(sv, SimVar) and name in master_dict:
+                sv.rate = master_dict[name].rate
+
         # Update the master dict with the override dict
         # This replaces any existing entries with the override ones and adds new ones
         master_dict.update(override_dict)
@@ -295,187 +545,277 @@ class SimConnectManager(threading.Thread):
         if self.current_var_tracker == self.new_var_tracker:
             # the current subscription matches the needed vars.. no need to resubscribe
             return
-        else:
-            logging.info("Simvar list has changed, creating new SC subscription")
-            if self.initial_subscribe_done:
-                self.sc.ClearDataDefinition(self.def_id)
-                self.def_id += 1
-                # self.REQ_ID += 1
-            self.initial_subscribe_done = True
+        logging.info("Simvar list has changed, updating SC subscription")
+        self.initial_subscribe_done = True
 
         self.subscribed_vars.clear()
-        self.current_var_tracker.clear()
-        self.sv_dict.clear()
+        self.current_var_tracker = list(self.new_var_tracker)
 
-        i = 0
+        # group the simvars by rate tier, array elements follow the tier of their array
+        tiers = {rate: [] for rate in _RATE_PERIODS}
         for sv in (sim_vars):
+            rate = sv.rate
+            if rate not in tiers:
+                logging.error(f"Unknown rate '{rate}' for {sv}, subscribing every frame")
+                rate = RATE_FRAME
             if isinstance(sv, SimVarArray):
-                for sv in sv.vars:
-                    res = self.sc.AddToDataDefinition(self.def_id, sv.var, sv.sc_unit, sv.datatype, 0, i)
-                    logging.debug(f"Result: {res} Subscribe SimVar {i} {sv}")
-
-                    self.subscribed_vars.append(sv)
-                    self.current_var_tracker.append(sv.var)
-                    self.sv_dict[sv.name] = sv.var
-                    i+=1
+                tiers[rate].extend(sv.vars)
             else:
-                res = self.sc.AddToDataDefinition(self.def_id, sv.var, sv.sc_unit, sv.datatype, 0, i)
-                logging.debug(f"Result: {res} Subscribe SimVar {i} {sv}")
-
+                tiers[rate].append(sv)
+
+        # SimConnect can only append to a data definition, so each tier is diffed against its current
+        # definition: unchanged tiers are left alone, appended simvars are added to the existing
+        # definition and any other change replaces the tier's definition
+        old_definitions = self._definitions
+        old_ids = {rate: def_id for def_id, (rate, _) in old_definitions.items()}
+        self._definitions = {}
+        requests = []
+        for rate, tier_vars in tiers.items():
+            def_id = old_ids.get(rate)
+            decoder = SimVarDecoder(tier_vars)
+            old = old_definitions[def_id][1].signature if def_id is not None else ()
+            new = decoder.signature
+
+            if new == old:
+                start = len(new)
+            elif old and new[:len(old)] == old:
+                start = len(old)
+                requests.append(def_id)
+            else:
+                if def_id is not None:
+                    self._stop_request(def_id)
+                    self.sc.ClearDataDefinition(def_id)
+                if not tier_vars:
+                    continue
+                # a new id, records of the previous definition still queued are ignored
+                self.def_id += 1
+                def_id = self.def_id
+                start = 0
+                requests.append(def_id)
+
+            for i, sv in enumerate(tier_vars):
+                if i >= start:
+                    res = self.sc.AddToDataDefinition(def_id, sv.var, sv.sc_unit, sv.datatype, 0, i)
+                    logging.debug(f"Result: {res} Subscribe SimVar {i} {sv} ({rate})")
                 self.subscribed_vars.append(sv)
-                self.current_var_tracker.append(sv.var)
-                self.sv_dict[sv.name] = sv.var
-                i+=1
+            if tier_vars:
+                self._definitions[def_id] = (rate, decoder)
+
+        # drop values of simvars no longer subscribed
+        keys = {entry[1] for _, decoder in self._definitions.values() for entry in decoder.entries}
+        for key in [k for k in self._state if k not in keys]:
+            del self._state[key]
+
+        if not old_definitions:
+            # first subscription of the session, hold frames until all tiers have been received
+            self._pending_defs = set(self._definitions)
+            self._prime_deadline = time.perf_counter() + RATE_PRIME_TIMEOUT
+
+        logging.info(f"SC subscription updated, {len(requests)} of {len(self._definitions)} rate tiers changed")
+        for def_id in requests:
+            self._request(def_id)
+
+    def _request(self, def_id):
+        rate, _ = self._definitions[def_id]
+        period, interval = _RATE_PERIODS[rate]
+
+        if self.changed_only:
+            flags = DATA_REQUEST_FLAG_CHANGED | DATA_REQUEST_FLAG_TAGGED
+        else:
+            flags = 0 # untagged, the full record is decoded with a single struct
 
         self.sc.RequestDataOnSimObject(
-            self.req_id,  # request identifier for response packets
-            self.def_id,  # the data definition group
+            def_id,  # request identifier for response packets, one request per data definition
+            def_id,  # the data definition group
             OBJECT_ID_USER,
-            PERIOD_SIM_FRAME,
-            DATA_REQUEST_FLAG_TAGGED,# DATA_REQUEST_FLAG_CHANGED | DATA_REQUEST_FLAG_TAGGED,
+            period,
+            flags,
             0,  # number of periods before starting events
-            1,  # number of periods between events, e.g. with PERIOD_SIM_FRAME
+            interval,  # number of periods between events, e.g. with PERIOD_SIM_FRAME
             0,  # number of repeats, 0 is forever
         )
 
+    def _stop_request(self, def_id):
+        """Cancel the periodic data request of a definition before it is cleared or replaced"""
+        self.sc.RequestDataOnSimObject(def_id, def_id, OBJECT_ID_USER, PERIOD_NEVER, 0, 0, 0, 0)
+
+    def _request_aircraft_vars(self):
+        """Request the simvars only read once per aircraft load again, frames are held until they arrive
+        so a new aircraft is never reported with the previous one's category and engine type"""
+        for def_id, (rate, _) in self._definitions.items():
+            if rate == RATE_ONCE:
+                self._pending_defs.add(def_id)
+                self._request(def_id)
+        self._prime_deadline = time.perf_counter() + RATE_PRIME_TIMEOUT
+
     # blocks and reads telemetry
     def _resubscribe(self):
         self.resubscribe = True
 
     def set_simdatum_to_msfs(self, simvar, value, units=None):
-        self._simdatums_to_send.append((simvar, value, units))
+        self._simdatums_to_send.put((simvar, units), value)
+        self._waiter.wake()
 
-    def send_event_to_msfs(self, event, data: int = 0):
+    def send_event_to_msfs(self, event, data: int = 0, coalesce=False):
+        """Queue `event` to be sent to the sim
+
+        Every event is sent by default, so discrete sequences like ROTOR_TRIM_RESET 1 -> 0
+        arrive intact. Axis style events pass `coalesce=True`, an event queued again before it
+        was sent then only updates the pending data.
+        """
         if event == "DO_NOT_SEND": return
-        self._events_to_send.append((event, data))
+        if event.startswith('L:'):
+            self._simdatums_to_send.put((event, "number"), data, coalesce)
+        else:
+            self._events_to_send.put(event, data, coalesce)
+        self._waiter.wake()
 
     def tx_simdatums_to_msfs(self):
-        while self._simdatums_to_send:
-            simvar, value, units = self._simdatums_to_send.pop(0)
+        for (simvar, units), value, t_queued in self._simdatums_to_send.take():
             try:
                 self.sc.set_simdatum(simvar, value, units=units)
+                self._simdatums_to_send.done(t_queued)
             except Exception as e:
+                self._simdatums_to_send.done(t_queued, ok=False)
                 logging.error(f"Error sending {simvar} value {value} to MSFS: {e}")
                 # self.telem_data['error'] = 1
 
-
     def tx_events_to_msfs(self):
-        while self._events_to_send:
-            event, data = self._events_to_send.pop(0)
+        for event, data, t_queued in self._events_to_send.take():
             logging.debug(f"event {event}   data {data}")
-            if event.startswith('L:'):
-                self.set_simdatum_to_msfs(event, data, units="number")
-            else:
-                try:
-                    self.sc.send_event(event, data)
-                    # self.telem_data[event] = data
-                except Exception as e:
-                    logging.error(f"Error setting event:{event} value:{data} to MSFS: {e}")
-                    # self.telem_data['error'] = 1
+            try:
+                self.sc.send_event(event, data)
+                self._events_to_send.done(t_queued)
+                # self.telem_data[event] = data
+            except Exception as e:
+                self._events_to_send.done(t_queued, ok=False)
+                logging.error(f"Error setting event:{event} value:{data} to MSFS: {e}")
+                # self.telem_data['error'] = 1
+
+    def get_tx_stats(self) -> dict:
+        """Statistics of the outgoing event and simdatum queues"""
+        return {"events": self._events_to_send.get_stats(), "simdatums": self._simdatums_to_send.get_stats()}
 
-    def _read_telem(self) -> bool:
+    def _read_telem(self):
         pRecv = RECV_P()
         nSize = DWORD()
+        self._session_quit = False
 
-        while not self._quit:
+        while not self._quit and not self._session_quit:
             self.tx_events_to_msfs()  # tx any pending sim events that are queued
             self.tx_simdatums_to_msfs()  # tx any pending simdatum sets that are queued
 
-            try:
-                #print('Trying')
-                self.sc.GetNextDispatch(byref(pRecv), byref(nSize))
-            except OSError as e:
-                #print(e)
-                time.sleep(0.001)
-                continue
-
-            if self.resubscribe:
-                self._subscribe()
-                self.resubscribe = False
-                continue
-
-            recv = ReceiverInstance.cast_recv(pRecv)
-            #print(f"got {recv.__class__.__name__}")
-            if isinstance(recv, RECV_EXCEPTION):
-                logging.error(f"SimConnect exception {recv.dwException}, sendID {recv.dwSendID}, index {recv.dwIndex}")
-            elif isinstance(recv, RECV_QUIT):
-                logging.info("Quit received")
-                self.emit_event("Quit")
-                break
-            elif isinstance(recv, RECV_OPEN):
-                self.emit_event("Open")
-
-            elif isinstance(recv, RECV_EVENT):
-                if recv.uEventID == EV_PAUSED:
-                    logging.debug(f"EVENT PAUSED,  EVENT: {recv.uEventID}, DATA: {recv.dwData}")
-                    self._sim_paused = recv.dwData
-                    self.emit_event("Paused", recv.dwData)
-                elif recv.uEventID == EV_STARTED:
-                    logging.debug(f"EVENT STARTED,  EVENT: {recv.uEventID}, DATA: {recv.dwData}")
-                    self._sim_started = 1
-                    self.emit_event("SimStart")
-                    self._stop_state = False # clear stop state, this will cause a reload of current aircraft in telemFFB
-                elif recv.uEventID == EV_STOPPED:
-                    logging.debug(f"EVENT STOPPED, EVENT: {recv.uEventID}, DATA: {recv.dwData}")
-                    self._sim_started = 0
-                    self.emit_event("SimStop")
-                elif recv.uEventID == EV_SIMSTATE:
-                    logging.debug(f"EVENT SIMSTATE, EVENT: {recv.uEventID}, DATA: {recv.dwData}")
-                    self._sim_state = recv.dwData
-                    self.emit_event("SimState", recv.dwData)
-
-            elif isinstance(recv, RECV_SIMOBJECT_DATA):
-                logging.debug(f"Received SIMOBJECT_DATA with {recv.dwDefineCount} data elements, flags {recv.dwFlags}")
-                #print(f"Received SIMOBJECT_DATA with {recv.dwDefineCount} data elements, flags {recv.dwFlags}")
-                if recv.dwRequestID == self.req_id and recv.dwDefineID == self.def_id:
-                    #print(f"Matched request 0x{req_id:X}")
-                    data = {}
-                    data["SimPaused"] = self._sim_paused
-                    # data["FlightStarted"] = self._sim_state
-                    offset = RECV_SIMOBJECT_DATA.dwData.offset
-                    for _ in range(recv.dwDefineCount):
-                        idx = cast(byref(recv, offset), POINTER(DWORD))[0]
-                        offset += sizeof(DWORD)
-                        # DATATYPE_FLOAT64 => c_double
-                        try:
-                            var : SimVar = self.subscribed_vars[idx]
-                            c_type = var.c_type
-                            if var.datatype == DATATYPE_STRING128: #fixme: other string types
-                                val = str(cast(byref(recv, offset), POINTER(c_type))[0].value, "utf-8")
-                            else:
-                                val = cast(byref(recv, offset), POINTER(c_type))[0]
-                            offset += sizeof(c_type)
-                            val = var._calculate(val)
-
-                            if var.parent: # var is part of array
-                                var.parent.values[var.index-var.parent.min] = val
-                                data[var.parent.name] = var.parent.values
-                            else:
-                                data[var.name] = val
-                        except:
-                            # dbprint("red", "**DEBUG*** Exception parsing SC FRAME")
-                            continue
-
-                    # if not self._sim_paused and not data["Parked"] and not data["Slew"]:     # fixme: figure out why simstart/stop and sim events dont work right
-                    #     self.emit_packet(data)
-                    #     self._final_frame_sent = 0
-                    if self._sim_paused or data.get("Parked", 0) or data.get("Slew", 0):     # fixme: figure out why simstart/stop and sim events dont work right
-                        data["STOP"] = 1
-                        data['_num_simvars'] = len(data)
-                        
-                        if not self._stop_state:
-                            self.emit_event("STOP")
-                            self.emit_packet(data) # emit last packet
-                            self._stop_state = True
+            if not self._dispatch(pRecv, nSize):
+                # no messages queued, wait until SimConnect signals new data (or the poll interval passes)
+                self._waiter.wait(DISPATCH_WAIT_TIMEOUT)
+
+        logging.info(f"SimConnect session ended, outgoing queue statistics: {self.get_tx_stats()}")
+
+    def _dispatch(self, pRecv, nSize) -> bool:
+        """Handle one queued SimConnect message, returns False if there was none"""
+        try:
+            self.sc.GetNextDispatch(byref(pRecv), byref(nSize))
+            self._t_dispatch = time.perf_counter()
+        except OSError:
+            return False
+
+        if self.resubscribe:
+            self._subscribe()
+            self.resubscribe = False
+            return True
+
+        recv = ReceiverInstance.cast_recv(pRecv)
+        #print(f"got {recv.__class__.__name__}")
+        if isinstance(recv, RECV_EXCEPTION):
+            logging.error(f"SimConnect exception {recv.dwException}, sendID {recv.dwSendID}, index {recv.dwIndex}")
+        elif isinstance(recv, RECV_QUIT):
+            logging.info("Quit received")
+            self.emit_event("Quit")
+            self._session_quit = True
+        elif isinstance(recv, RECV_OPEN):
+            self.emit_event("Open")
+
+        elif isinstance(recv, RECV_EVENT):
+            if recv.uEventID == EV_PAUSED:
+                logging.debug(f"EVENT PAUSED,  EVENT: {recv.uEventID}, DATA: {recv.dwData}")
+                self._sim_paused = recv.dwData
+                self.emit_event("Paused", recv.dwData)
+            elif recv.uEventID == EV_STARTED:
+                logging.debug(f"EVENT STARTED,  EVENT: {recv.uEventID}, DATA: {recv.dwData}")
+                self._sim_started = 1
+                self.emit_event("SimStart")
+                self._stop_state = False # clear stop state, this will cause a reload of current aircraft in telemFFB
+                self._request_aircraft_vars()
+            elif recv.uEventID == EV_STOPPED:
+                logging.debug(f"EVENT STOPPED, EVENT: {recv.uEventID}, DATA: {recv.dwData}")
+                self._sim_started = 0
+                self.emit_event("SimStop")
+            elif recv.uEventID == EV_SIMSTATE:
+                logging.debug(f"EVENT SIMSTATE, EVENT: {recv.uEventID}, DATA: {recv.dwData}")
+                self._sim_state = recv.dwData
+                self.emit_event("SimState", recv.dwData)
+
+        elif isinstance(recv, RECV_SIMOBJECT_DATA):
+            logging.debug(f"Received SIMOBJECT_DATA with {recv.dwDefineCount} data elements, flags {recv.dwFlags}")
+            #print(f"Received SIMOBJECT_DATA with {recv.dwDefineCount} data elements, flags {recv.dwFlags}")
+            definition = self._definitions.get(recv.dwDefineID)
+            if definition is not None and recv.dwRequestID == recv.dwDefineID:
+                rate, decoder = definition
+                # records of all tiers are merged into the persistent state
+                state = self._state
+                title = state.get("N")
+                # view the whole message as a byte buffer, fields are unpacked from it directly
+                buf = (ctypes.c_ubyte * nSize.value).from_address(ctypes.addressof(recv))
+                offset = RECV_SIMOBJECT_DATA.dwData.offset
+                try:
+                    if recv.dwFlags & DATA_REQUEST_FLAG_TAGGED:
+                        decoder.decode_tagged(buf, offset, recv.dwDefineCount, state)
+                    elif nSize.value - offset >= decoder.record.size:
+                        decoder.decode_untagged(buf, offset, state)
                     else:
-                    # print(f"!#$!#$!#$!#$ EMITTING PACKET LEN: {len(data)}")
-                        self._stop_state = False
-                        self.emit_packet(data)
+                        return True # queued before simvars were appended to the definition
+                except struct.error:
+                    logging.exception("Error decoding SimConnect data")
+
+                if title is not None and state.get("N") != title:
+                    logging.debug(f"Aircraft changed to {state.get('N')}, requesting aircraft simvars")
+                    self._request_aircraft_vars()
+
+                self._pending_defs.discard(recv.dwDefineID)
+                if rate != RATE_FRAME:
+                    return True # slower tiers are sent with the next frame
+                if self._pending_defs:
+                    if self._t_dispatch < self._prime_deadline:
+                        return True # hold frames until the aircraft simvars have been received once
+                    logging.warning(f"No SimConnect data received for rate tiers {[self._definitions[d][0] for d in self._pending_defs]}")
+                    self._pending_defs.clear()
+
+                data = dict(state)
+                data["SimPaused"] = self._sim_paused
+                # data["FlightStarted"] = self._sim_state
+
+                # if not self._sim_paused and not data["Parked"] and not data["Slew"]:     # fixme: figure out why simstart/stop and sim events dont work right
+                #     self.emit_packet(data)
+                #     self._final_frame_sent = 0
+                if self._sim_paused or data.get("Parked", 0) or data.get("Slew", 0):     # fixme: figure out why simstart/stop and sim events dont work right
+                    data["STOP"] = 1
+                    data['_num_simvars'] = len(data)
+
+                    if not self._stop_state:
+                        self.emit_event("STOP")
+                        self.emit_packet(data) # emit last packet
+                        self._stop_state = True
                 else:
-                    # dbprint("green", f"**DEBUG*** got dispatch for OLD request: {recv.dwRequestID} defID: {recv.dwDefineID} | currrent defID: {self.def_id}")
-                    pass
+                # print(f"!#$!#$!#$!#$ EMITTING PACKET LEN: {len(data)}")
+                    self._stop_state = False
+                    self.emit_packet(data)
             else:
-                logging.warning(f"Received unknown simconnect message: {recv}")
+                # dbprint("green", f"**DEBUG*** got dispatch for OLD request: {recv.dwRequestID} defID: {recv.dwDefineID} | currrent defID: {self.def_id}")
+                pass
+        else:
+            logging.warning(f"Received unknown simconnect message: {recv}")
+
+        return True
 
     def emit_packet(self, data):
         pass
@@ -485,23 +825,57 @@ class SimConnectManager(threading.Thread):
 
     def quit(self):
         self._quit = True
+        self._waiter.wake()
+
+    def open_simconnect(self, name):
+        """Open a SimConnect session and set up how the dispatch loop waits for messages
+
+        On Windows the session is opened with a Win32 event handle (see EventSimConnect) and
+        the loop waits on it, otherwise GetNextDispatch is polled. Override to drive the loop
+        with a mock.
+        """
+        if sys.platform == "win32":
+            try:
+                waiter = Win32EventWaiter()
+            except OSError as e:
+                logging.warning(f"SimConnect event handle dispatch unavailable ({e}), polling")
+            else:
+                try:
+                    sc = EventSimConnect(name, waiter.handle)
+                except Exception as e:
+                    waiter.close()
+                    logging.warning(f"SimConnect open with event handle failed ({e}), polling")
+                else:
+                    self._waiter = waiter
+                    logging.info("SimConnect dispatch: event handle")
+                    return sc
+
+        self._waiter = PollingWaiter()
+        logging.info("SimConnect dispatch: polling")
+        return SimConnect(name)
 
     def run(self):
         while not self._quit:
             try:
                 logging.info("Trying SimConnect")
-                with SimConnect(f"TelemFFB-{G.device_type}") as self.sc:
+                with self.open_simconnect(f"TelemFFB-{G.device_type}") as self.sc:
                     self.sc.SubscribeToSystemEvent(EV_PAUSED, "Pause")
                     self.sc.SubscribeToSystemEvent(EV_STARTED, "SimStart")
                     self.sc.SubscribeToSystemEvent(EV_STOPPED, "SimStop")
                     self.sc.SubscribeToSystemEvent(EV_SIMSTATE, "Sim")
 
+                    # a new session starts without data definitions
+                    self._definitions = {}
+                    self._state = {}
+                    self.current_var_tracker = []
                     self._subscribe()
                     self._read_telem()
 
             except OSError:
                 time.sleep(10)
                 pass
+            finally:
+                self._waiter.close()
 
     def get_var_name(self,k):
         return self.sv_dict.get(k, None)
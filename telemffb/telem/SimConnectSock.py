@@ -7,21 +7,15 @@ from telemffb.telem.TelemManager import TelemManager
 
 class SimConnectSock(SimConnectManager):
     def __init__(self, telem: TelemManager):
-        super().__init__()
+        super().__init__(changed_only=G.args.msfs_changed_only)
         telem.set_simconnect(self)
         self._telem : TelemManager = telem
 
-
-    def fmt(self, val):
-        if isinstance(val, list):
-            return "~".join([str(x) for x in val])
-        return val
-    
     @overrides(SimConnectManager)
     def emit_packet(self, data):
         data["src"] = "MSFS"
-        packet = bytes(";".join([f"{k}={self.fmt(v)}" for k, v in data.items()]), "utf-8")
-        self._telem.submit_frame(packet)
+        # simvars are already typed, submit the dict as-is instead of formatting it to text
+        self._telem.submit_telem(data, self._t_dispatch)
     
     @overrides(SimConnectManager)
     def emit_event(self, event, *args):
@@ -34,5 +28,4 @@ class SimConnectSock(SimConnectManager):
             # Restart sim listeners on MSFS quit, TODO: Why?
             G.sim_listeners.restart_all()
 
-        args = [str(x) for x in args]
-        self._telem.submit_frame(f"Ev={event};" + ";".join(args))
\ No newline at end of file
+        self._telem.submit_event(event, *args)
\ No newline at end of file
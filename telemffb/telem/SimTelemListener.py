@@ -6,7 +6,8 @@ from PyQt5 import QtCore
 import telemffb.globals as G
 import telemffb.utils as utils
 from telemffb.sim.aircrafts_msfs_xp import Aircraft
-from telemffb.telem.IL2Manager import IL2Manager
+from telemffb.telem.IL2Manager import IL2Manager, focus_poller
+from telemffb.telem.ListenerHub import ListenerHub
 from telemffb.telem.NetworkThread import NetworkThread
 from telemffb.telem.SimConnectSock import SimConnectSock
 from telemffb.utils import overrides
@@ -19,8 +20,15 @@ class SimTelemListener(QtCore.QObject):
         super().__init__()
         self.name : str = name
         self.telem : NetworkThread = None
+        self.hub : ListenerHub = None
         self._started = False
 
+    def create_udp_listener(self, port, telem_parser=None):
+        """Create a UDP telemetry listener, serviced by the listener hub if one is in use"""
+        if self.hub:
+            return self.hub.listener(G.telem_manager, host="127.0.0.1", port=port, telem_parser=telem_parser)
+        return NetworkThread(G.telem_manager, host="127.0.0.1", port=port, telem_parser=telem_parser)
+
     def start(self):
         raise NotImplementedError
 
@@ -71,7 +79,7 @@ class SimIL2(SimTelemListener):
         if not self.is_enabled:
             return
 
-        self.telem = NetworkThread(G.telem_manager, host="127.0.0.1", port=self.port_udp, telem_parser=IL2Manager())
+        self.telem = self.create_udp_listener(self.port_udp, telem_parser=IL2Manager())
 
         if self.do_validate() is False:
             logging.warning(
@@ -92,6 +100,7 @@ class SimIL2(SimTelemListener):
         if self.telem:
             self.telem.quit()
             self.telem = None
+            focus_poller.stop()
             self.started = False
 
 class SimDCS(SimTelemListener):
@@ -104,7 +113,7 @@ class SimDCS(SimTelemListener):
         if not self.is_enabled:
             return
 
-        self.telem = NetworkThread(G.telem_manager, host="127.0.0.1", port=34380)
+        self.telem = self.create_udp_listener(34380)
 
         self.do_validate()
         logging.info("Starting DCS Telemetry Listener")
@@ -134,7 +143,7 @@ class SimXPLANE(SimTelemListener):
         if not self.is_enabled:
             return
 
-        self.telem = NetworkThread(G.telem_manager, host='127.0.0.1', port=34390)
+        self.telem = self.create_udp_listener(34390)
 
         self.do_validate()
         logging.info("Starting XPlane Telemetry Listener")
@@ -196,7 +205,14 @@ class SimListenerManager(QtCore.QObject):
             SimXPLANE()
         ]
 
+        # optionally service all UDP listeners from a single thread
+        self.hub : ListenerHub = None
+        if G.args.listener_hub:
+            self.hub = ListenerHub()
+            self.hub.start()
+
         for sim in self.sims:
+            sim.hub = self.hub
             sim.stateChanged.connect(self._on_state_changed)
 
     def _on_state_changed(self, state):
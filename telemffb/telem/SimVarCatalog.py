@@ -0,0 +1,167 @@
+"""
+Catalog of SimConnect variables, events and units
+
+The catalog is a SQLite database prebuilt from simconnect/scvars.json (see build_catalog)
+with name indexes for prefix lookup and a full text index over names and descriptions.
+It is opened on first use, so instances which never show the SimConnect overrides editor
+don't load it at all. If the prebuilt database is missing or older than the JSON source it
+is built in memory from the JSON instead.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from telemffb.utils import get_resource_path
+
+CATALOG_VERSION = "1"
+JSON_PATH = "simconnect/scvars.json"
+DB_PATH = "simconnect/scvars.db"
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+CREATE TABLE variables (name TEXT PRIMARY KEY, units TEXT, settable INTEGER, indexed INTEGER,
+                        section TEXT, description TEXT) WITHOUT ROWID;
+CREATE TABLE events (name TEXT PRIMARY KEY, section TEXT, description TEXT) WITHOUT ROWID;
+CREATE TABLE units (name TEXT PRIMARY KEY, name_std TEXT, dimensions TEXT) WITHOUT ROWID;
+"""
+_FTS_SCHEMA = "CREATE VIRTUAL TABLE search USING fts5(kind UNINDEXED, name, description)"
+
+
+def _source_stamp(json_path) -> str:
+    return f"{CATALOG_VERSION}:{os.path.getsize(json_path)}"
+
+
+def _text(value) -> str:
+    return " ".join(str(value or "").split())
+
+
+def build_catalog(json_path, db_path=":memory:") -> sqlite3.Connection:
+    """Build the catalog database from the scvars.json source, returns the open connection"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        src = json.load(f)
+
+    if db_path != ":memory:" and os.path.exists(db_path):
+        os.remove(db_path)
+    db = sqlite3.connect(db_path, check_same_thread=False)
+    db.executescript(_SCHEMA)
+    try:
+        db.execute(_FTS_SCHEMA)
+        fts = True
+    except sqlite3.OperationalError:
+        logging.warning("SQLite FTS5 unavailable, SimVar catalog search falls back to LIKE")
+        fts = False
+
+    variables = [(name.upper(), _text(v.get("units_std") or v.get("units")), int(bool(v.get("settable"))),
+                  int(bool(v.get("indexed"))), v.get("section"), _text(v.get("description")))
+                 for name, v in src.get("VARIABLES", {}).items()]
+    events = [(name.upper(), e.get("section"), _text(e.get("multiplayer") or e.get("description")))
+              for name, e in src.get("EVENTS", {}).items()]
+    units = [(name.upper(), u.get("name_std"), u.get("dimensions")) for name, u in src.get("UNITS", {}).items()]
+
+    with db:
+        db.executemany("INSERT OR REPLACE INTO variables VALUES (?, ?, ?, ?, ?, ?)", variables)
+        db.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?)", events)
+        db.executemany("INSERT OR REPLACE INTO units VALUES (?, ?, ?)", units)
+        if fts:
+            db.executemany("INSERT INTO search VALUES ('var', ?, ?)", [(v[0], v[5]) for v in variables])
+            db.executemany("INSERT INTO search VALUES ('event', ?, ?)", [(e[0], e[2]) for e in events])
+        db.execute("INSERT INTO meta VALUES ('source', ?)", (_source_stamp(json_path),))
+        db.execute("INSERT INTO meta VALUES ('fts', ?)", (str(int(fts)),))
+    if db_path != ":memory:":
+        db.execute("VACUUM")
+    return db
+
+
+class SimVarCatalog:
+    def __init__(self, db: sqlite3.Connection):
+        self._db = db
+        self._lock = threading.Lock()
+        self._fts = self._query("SELECT value FROM meta WHERE key = 'fts'") == [("1",)]
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    @staticmethod
+    def _prefix_range(prefix):
+        # names are stored upper case, the range scan uses the primary key index
+        prefix = prefix.upper()
+        return prefix, prefix + "\uffff"
+
+    def variables(self, prefix="", limit=50) -> list:
+        """Names of the variables starting with `prefix`, an index suffix (":1") is ignored"""
+        lo, hi = self._prefix_range(prefix.split(":", 1)[0])
+        return [r[0] for r in self._query("SELECT name FROM variables WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+                                          (lo, hi, limit))]
+
+    def events(self, prefix="", limit=50) -> list:
+        lo, hi = self._prefix_range(prefix)
+        return [r[0] for r in self._query("SELECT name FROM events WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+                                          (lo, hi, limit))]
+
+    def units(self) -> list:
+        return [r[0].lower() for r in self._query("SELECT name FROM units WHERE name != '' ORDER BY name")]
+
+    def get_variable(self, name):
+        """Variable info dict (name, units, settable, indexed, section, description) or None"""
+        rows = self._query("SELECT * FROM variables WHERE name = ?", (name.split(":", 1)[0].upper(),))
+        if not rows:
+            return None
+        return dict(zip(("name", "units", "settable", "indexed", "section", "description"), rows[0]))
+
+    def search(self, text, kind="var", limit=50) -> list:
+        """Names of variables (kind "var") or events ("event") whose name or description match `text`"""
+        words = [w for w in "".join(c if c.isalnum() else " " for c in text).split()]
+        if not words:
+            return []
+        if self._fts:
+            match = " ".join(f'"{w}"*' for w in words)
+            rows = self._query("SELECT name FROM search WHERE search MATCH ? AND kind = ? ORDER BY rank LIMIT ?",
+                               (match, kind, limit))
+        else:
+            table = "variables" if kind == "var" else "events"
+            where = " AND ".join("(name LIKE ? OR description LIKE ?)" for _ in words)
+            args = [arg for w in words for arg in (f"%{w}%", f"%{w}%")]
+            rows = self._query(f"SELECT name FROM {table} WHERE {where} ORDER BY name LIMIT ?", (*args, limit))
+        return [r[0] for r in rows]
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def _open_catalog() -> SimVarCatalog:
+    json_path = get_resource_path(JSON_PATH)
+    db_path = get_resource_path(DB_PATH)
+    try:
+        db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        stamp = db.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        if not os.path.exists(json_path) or stamp == (_source_stamp(json_path),):
+            return SimVarCatalog(db)
+        db.close()
+        logging.info(f"SimVar catalog {db_path} is outdated")
+    except sqlite3.Error as e:
+        logging.info(f"SimVar catalog {db_path} unavailable: {e}")
+
+    logging.info(f"Building SimVar catalog from {json_path}")
+    return SimVarCatalog(build_catalog(json_path))
+
+
+def get_catalog() -> SimVarCatalog:
+    """The shared catalog, opened on first use"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = _open_catalog()
+        return _catalog
+
+
+# rebuild the prebuilt catalog: python -m telemffb.telem.SimVarCatalog
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    db = build_catalog(get_resource_path(JSON_PATH), get_resource_path(DB_PATH, prefer_root=True, force=True))
+    db.close()
+    logging.info(f"Wrote {get_resource_path(DB_PATH)}")
@@ -0,0 +1,67 @@
+import logging
+
+import telemffb.utils as utils
+
+# keys which always carry text, these are never run through number conversion
+STRING_KEYS = ("N", "src", "MechInfo")
+
+
+def to_telem_number(v: str):
+    """Convert a telemetry value string to a number
+
+    Fast path for plain ints and floats as sent by the DCS export script and the
+    X-Plane plugin. Anything else (booleans, unit suffixes, text) falls back to
+    utils.to_number so results are identical to the config value parser.
+    """
+    try:
+        if "." in v:
+            return round(float(v), 4)
+        return int(v)
+    except ValueError:
+        return utils.to_number(v)
+
+
+class TelemDecoder:
+    """Decoder for the DCS/X-Plane ``k=v;k=v~v`` telemetry wire format
+
+    The value decoder for each key is selected the first time the key is seen
+    and cached, so steady state frames only pay for the split and number
+    conversion.
+    """
+
+    def __init__(self, string_keys=STRING_KEYS):
+        self.string_keys = set(string_keys)
+        self._decoders = {}
+
+    def _decode_text(self, conf: str):
+        return conf
+
+    def _decode_number(self, conf: str):
+        if "~" in conf:
+            return [to_telem_number(v) for v in conf.split("~")]
+        return to_telem_number(conf)
+
+    def _decoder_for(self, key: str):
+        fn = self._decoders.get(key)
+        if fn is None:
+            fn = self._decode_text if key in self.string_keys else self._decode_number
+            self._decoders[key] = fn
+        return fn
+
+    def decode(self, data: str) -> dict:
+        telem_data = {}
+        decoders = self._decoders
+        for i in data.split(";"):
+            if not i:
+                continue
+            key, sep, conf = i.partition("=")
+            if not sep:
+                logging.error("Error Parsing Parameter: %s", repr(i))
+                continue
+            fn = decoders.get(key) or self._decoder_for(key)
+            try:
+                telem_data[key] = fn(conf)
+            except Exception:
+                logging.exception("Error Parsing Parameter: %s", repr(i))
+        return telem_data
+
@@ -1,9 +1,11 @@
+import collections
 import json
 import logging
 import os
 import subprocess
 import threading
 import time
+from typing import NamedTuple, Tuple
 
 from PyQt5.QtCore import QObject, pyqtSignal
 
@@ -14,6 +16,8 @@ import telemffb.xmlutils as xmlutils
 from telemffb.hw.ffb_rhino import HapticEffect
 from telemffb.sim import aircrafts_dcs, aircrafts_il2, aircrafts_msfs_xp
 from telemffb.telem.SimConnectManager import SimConnectManager
+from telemffb.telem.TelemDecoder import TelemDecoder
+from telemffb.telem.TelemRecorder import TelemRecorder
 from telemffb.utils import set_vpconf_profile
 
 _config_mtime = 0
@@ -44,9 +48,59 @@ def config_has_changed(update=False) -> bool:
         return True
     return False
 
+# events where only the latest pending instance matters, a newer one replaces the queued one
+COALESCE_EVENTS = {"Paused", "SimState", "Open", "Quit", "SimStart", "SimStop"}
+MAX_PENDING_EVENTS = 256
+# delay before a failed aircraft config job is started again, doubled after each further failure
+AIRCRAFT_JOB_RETRY_DELAY = 2.0
+AIRCRAFT_JOB_MAX_RETRY_DELAY = 60.0
+
+
+class TelemEvent(NamedTuple):
+    name: str
+    args: Tuple[str, ...]
+    time: float
+
+    @classmethod
+    def parse(cls, data: str) -> "TelemEvent":
+        """Parse the ``name;arg;arg`` text of an ``Ev=`` frame"""
+        name, *args = data.split(";")
+        return cls(name, tuple(args), time.perf_counter())
+
+
+def frame_value(val):
+    """Normalize a typed telemetry value the same way the text wire format would shape it.
+
+    Single element arrays arrive as scalars, lists are copied so the producer
+    can keep updating its own instances.
+    """
+    if isinstance(val, (list, tuple)):
+        if len(val) == 1:
+            return val[0]
+        return list(val)
+    return val
+
+class AircraftSetup(NamedTuple):
+    """Result of an aircraft config job, applied on the telemetry thread"""
+    name: str
+    params: dict
+    cls_name: str
+    Class: type
+    sc_overrides: list
+    configurator_gains: dict # gain override state, None to restore the last vpconf gains
+    reload: bool
+
+
+class AircraftJob(NamedTuple):
+    thread: utils.ResultThread
+    name: str
+    prev_name: str # currentAircraftName when the job was started
+    reload: bool
+
+
 class TelemManager(QObject, threading.Thread):
     telemetryReceived = pyqtSignal(object)
-    eventReceived = pyqtSignal(tuple)
+    eventsReceived = pyqtSignal(list) # list of TelemEvent, emitted once per processed batch
 
     aircraftUpdated = pyqtSignal()
     telemetryTimeout = pyqtSignal(bool)
@@ -64,16 +118,31 @@ class TelemManager(QObject, threading.Thread):
         threading.Thread.__init__(self, daemon=True)
 
         self._run = True
+        # latest-value mailbox: producers replace the pending frame and never wait for
+        # frame processing, the lock is only held to swap the slot and queue events
         self._cond = threading.Condition()
         self._data = None
-        self._events = []
-        self._dropped_frames = 0
+        self._data_times = None  # (receive time, submit time) of self._data when latency stats are enabled
+        self._data_delta = False # self._data only holds changed keys, see submit_telem()
+        self._delta_state = None # accumulated state of delta frames
+        self._events = collections.deque()
+        self._busy = False
+        self._overwritten_frames = 0
+        self._merged_frames = 0
+        self._dropped_events = 0
+        self._coalesced_events = 0
         self.last_frame_time = time.perf_counter()
         self.frame_times = []
         self.max_frame_time = 0
         self.timeout_sec = 0.2
         self._ipc_telem_data = {}
         self._simconnect : SimConnectManager= None
+        self._decoder = TelemDecoder()
+        self._recorder : TelemRecorder = None
+        self._aircraft_job : AircraftJob = None
+        self._config_reload_pending = False
+        self._aircraft_job_retry_time = 0
+        self._aircraft_job_failures = 0
 
     def set_simconnect(self, sc : SimConnectManager):
         self._simconnect = sc
@@ -134,37 +203,305 @@ class TelemManager(QObject, threading.Thread):
         except Exception as e:
             logging.warning(f"Error getting settings from Settings Manager:{e}")
 
+    def _start_aircraft_job(self, aircraft_name, data_source, module, sc_aircraft_type=None, sc_engine_type=4, reload=False):
+        thread = self._resolve_aircraft(aircraft_name, data_source, module, sc_aircraft_type, sc_engine_type, reload)
+        self._aircraft_job = AircraftJob(thread, aircraft_name, self.currentAircraftName, reload)
+
+    @utils.threaded(daemon=True)
+    def _resolve_aircraft(self, aircraft_name, data_source, module, sc_aircraft_type, sc_engine_type, reload) -> AircraftSetup:
+        """
+        Background job resolving the config of an aircraft and applying its device side settings
+        (vpconf profile, command runner), the slow part of an aircraft change. Only one job runs
+        at a time, the handler and the configurator gains are applied by _poll_aircraft_job().
+        """
+        t_start = time.perf_counter()
+        params, cls_name = self.get_aircraft_config(aircraft_name, data_source)
+        if reload:
+            Class = getattr(module, cls_name, None)
+        else:
+            params, cls_name, Class = self._select_class(aircraft_name, data_source, module, params, cls_name,
+                                                         sc_aircraft_type, sc_engine_type)
+
+        self._apply_device_settings(params)
+        configurator_gains = self._configurator_gains(params)
+
+        sc_overrides = None
+        if data_source == "MSFS" and aircraft_name != '':
+            sc_overrides = xmlutils.read_sc_overrides(aircraft_name)
+
+        logging.debug(f"Resolved config for {aircraft_name} in {(time.perf_counter() - t_start) * 1000:.1f}ms")
+        return AircraftSetup(aircraft_name, params, cls_name, Class, sc_overrides, configurator_gains, reload)
+
+    def _select_class(self, aircraft_name, data_source, module, params, cls_name, sc_aircraft_type, sc_engine_type):
+        Class = getattr(module, cls_name, None)
+        logging.debug(f"CLASS={getattr(Class, '__name__', None)}")
+
+        if not Class or Class.__name__ == "Aircraft":
+            if data_source == "MSFS":
+                if sc_aircraft_type == "Helicopter":
+                    logging.warning("Aircraft definition not found, using SimConnect Data (Helicopter Type)")
+                    type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.Helicopter")
+                    params.update(type_cfg)
+                    Class = module.Helicopter
+                elif sc_aircraft_type == "Jet":
+                    logging.warning("Aircraft definition not found, using SimConnect Data (Jet Type)")
+                    type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.JetAircraft")
+                    params.update(type_cfg)
+                    Class = module.JetAircraft
+                elif sc_aircraft_type == "Airplane":
+                    if sc_engine_type == 0:     # Piston
+                        logging.warning("Aircraft definition not found, using SimConnect Data (Propeller Type)")
+                        type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.PropellerAircraft")
+                        params.update(type_cfg)
+                        Class = module.PropellerAircraft
+                    if sc_engine_type == 1:     # Jet
+                        logging.warning("Aircraft definition not found, using SimConnect Data (Jet Type)")
+                        type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.JetAircraft")
+                        params.update(type_cfg)
+                        Class = module.JetAircraft
+                    elif sc_engine_type == 2:   # None
+                        logging.warning("Aircraft definition not found, using SimConnect Data (Glider Type)")
+                        type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.GliderAircraft")
+                        params.update(type_cfg)
+                        Class = module.GliderAircraft
+                    elif sc_engine_type == 3:   # Heli
+                        logging.warning("Aircraft definition not found, using SimConnect Data (Helo Type)")
+                        type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.HelicopterAircraft")
+                        params.update(type_cfg)
+                        Class = module.Helicopter
+                    elif sc_engine_type == 5:   # Turboprop
+                        logging.warning("Aircraft definition not found, using SimConnect Data (Turboprop Type)")
+                        type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.TurbopropAircraft")
+                        params.update(type_cfg)
+                        Class = module.TurbopropAircraft
+                else:
+                    logging.warning(f"Aircraft definition not found, using default class for {aircraft_name}")
+                    Class = module.Aircraft
+            else:
+                logging.warning(f"Aircraft definition not found, using default class for {aircraft_name}")
+                Class = module.Aircraft
+
+        return params, cls_name, Class
+
+    def _apply_device_settings(self, params):
+        if "vpconf" in params:
+            if G.current_vpconf_profile != params.get('vpconf', None) or G.force_reload_aircraft_trigger:
+                # Load the vpconf configurator file specified for the model, only if it is not the current
+                # one loaded
+                set_vpconf_profile(params['vpconf'], HapticEffect.device.serial)
+                G.vpconf_configurator_gains = HapticEffect.device.get_gains()  # set here to keep track of gains set by last vpconf
+                G.force_reload_aircraft_trigger = False
+        else:
+            # If the current model does not have a vpconf specified, check whether the global default is
+            # configured and enabled.  If so, load that vpconf profile
+            load_global = G.system_settings.get("enableVPConfGlobalDefault", False)
+            global_path = G.system_settings.get("pathVPConfStartup", "")
+            if load_global and global_path != G.current_vpconf_profile:
+                logging.info("Aircraft changed, current loaded vpconf no longer applicable, reloading configured global default profile")
+                set_vpconf_profile(global_path, HapticEffect.device.serial)
+                G.vpconf_configurator_gains = HapticEffect.device.get_gains()  # set here to keep track of gains set by last vpconf
+            # utils.dbprint("red", f"Gains: {G.vpconf_configurator_gains}")
+
+        if params.get('command_runner_enabled', False):
+            if params.get('command_runner_command', '') != '' and 'Enter full path' not in params.get('command_runner_command', ''):
+                try:
+                    subprocess.Popen(params['command_runner_command'], shell=True)
+                except Exception as e:
+                    logging.error(f"Error running Command Executor for model: {e}")
+
+    def _configurator_gains(self, params):
+        if params.get('configurator_override_enabled', False):
+            state = params.get('configurator_gains', 'none')
+            if state != "none":
+                return json.loads(state)
+        # if the override is not enabled or the gain has not been set, the last vpconf gain data is sent
+        # to ensure previous aircraft override gains do not persist.  The last vpconf gain data will either
+        # be the gain at TelemFFB startup, or the last gain set by a pushed vpconf profile
+        return None
+
+    def _apply_configurator_gains(self, state):
+        if state is not None:
+            G.gain_override_dialog.set_gains_from_state(state)
+            G.current_configurator_gains = state
+            # dbprint("green", f"current_gain: {state}")
+            # dbprint("yellow", f"vpconf_gain: {G.vpconf_configurator_gains}")
+        else:
+            G.gain_override_dialog.set_gains_from_object(G.vpconf_configurator_gains)
+
+    def _poll_aircraft_job(self):
+        """Swap in the result of a finished aircraft config job, called from the telemetry thread"""
+        job = self._aircraft_job
+        if job is None or job.thread.is_alive():
+            return
+        self._aircraft_job = None
+        # a force reload (currentAircraftName reset) while the job ran starts another job on the next frame
+        resolved_name = job.name if self.currentAircraftName == job.prev_name else self.currentAircraftName
+
+        setup : AircraftSetup = job.thread.await_output()
+        error = job.thread.get_error()
+        if error is not None or setup is None:
+            delay = min(AIRCRAFT_JOB_RETRY_DELAY * 2 ** self._aircraft_job_failures, AIRCRAFT_JOB_MAX_RETRY_DELAY)
+            if not self._aircraft_job_failures:
+                logging.error(f"Error resolving config for {job.name}, retrying in {delay:.0f}s", exc_info=error)
+            else:
+                logging.warning(f"Resolving config for {job.name} failed again ({error!r}), retrying in {delay:.0f}s")
+            self._aircraft_job_failures += 1
+            # keep the previous handler, the job is started again from a later frame
+            self._aircraft_job_retry_time = time.perf_counter() + delay
+            if job.reload:
+                self._config_reload_pending = True
+            return
+        self._aircraft_job_failures = 0
+
+        self._apply_configurator_gains(setup.configurator_gains)
+
+        params = setup.params
+        if setup.reload:
+            updated_params = self.get_changed_params(params)
+            self.currentAircraft.apply_settings(updated_params)
+            if "type" in updated_params:
+                # if user changed type or if new aircraft dialog changed type, update aircraft class
+                self.currentAircraft = setup.Class(setup.name)
+                self.currentAircraft.apply_settings(params)
+                self.currentAircraftConfig = params
+        else:
+            logging.info(f"Creating handler for {setup.name}: {setup.Class.__module__}.{setup.Class.__name__}")
+            # instantiate the new aircraft handler and swap it in
+            aircraft = setup.Class(setup.name)
+            aircraft.apply_settings(params)
+            self.currentAircraft = aircraft
+            self.currentAircraftConfig = params
+            self.currentAircraftName = resolved_name
+
+        if setup.sc_overrides is not None and self._simconnect is not None:
+            # no SimConnect session when replaying a capture
+            for sv in setup.sc_overrides:
+                self._simconnect.add_simvar(name=sv['name'], var=sv['var'], sc_unit=sv['sc_unit'], scale=sv['scale'])
+            self._simconnect._resubscribe()
+
+        if not setup.reload and G.settings_mgr.isVisible():
+            G.settings_mgr.b_getcurrentmodel.click()
+
+        self.aircraftUpdated.emit()
+
     def quit(self):
         self._run = False
         self.join()
+        self.stop_recording()
+
+    def start_recording(self, path: str):
+        """Capture all submitted frames and events to a file, see TelemRecorder"""
+        self.stop_recording()
+        self._recorder = TelemRecorder(path)
 
-    def submit_frame(self, data: bytes):
+    def stop_recording(self):
+        if self._recorder:
+            self._recorder.close()
+            self._recorder = None
+
+    def submit_frame(self, data: bytes, t_recv: float = None):
         if isinstance(data, bytes):
             data = data.decode("utf-8")
 
+        recorder = self._recorder
+        if recorder:
+            recorder.record(data)
+
+        if data.startswith("Ev="):
+            self._put_event(TelemEvent.parse(data[3:]))
+        else:
+            with self._cond:
+                self._put_frame(data, t_recv)
+
+    def submit_event(self, name: str, *args):
+        """Submit a simulator event, equivalent to submit_frame("Ev=name;arg;...")"""
+        args = tuple(str(x) for x in args) or ("",)
+        recorder = self._recorder
+        if recorder:
+            recorder.record(f"Ev={name};" + ";".join(args))
+        self._put_event(TelemEvent(name, args, time.perf_counter()))
+
+    def _put_event(self, event: TelemEvent):
+        with self._cond:
+            events = self._events
+            if events:
+                last = events[-1]
+                if last.name == event.name and (last.args == event.args or event.name in COALESCE_EVENTS):
+                    # identical repeat or a newer state event, keep only the latest
+                    events[-1] = event
+                    self._coalesced_events += 1
+                    return
+            if len(events) >= MAX_PENDING_EVENTS:
+                events.popleft()
+                self._dropped_events += 1
+                logging.debug(f"Event queue full, dropped oldest event (total {self._dropped_events})")
+            events.append(event)
+            self._cond.notify_all()
+
+    def submit_telem(self, data: dict, t_recv: float = None, delta: bool = False):
+        """Submit an already decoded telemetry frame.
+
+        Used by telemetry parsers which produce typed values (IL-2), this skips the
+        text wire format and its per value parsing in process_data.
+
+        `t_recv` is the perf_counter() time the frame was received, used for latency statistics.
+        With `delta` the frame only carries the keys which changed, it is merged into
+        the state accumulated from the previous delta frames.
+        """
+        frame = {k: frame_value(v) for k, v in data.items()}
+
+        recorder = self._recorder
+        if recorder:
+            recorder.record(frame, delta)
         with self._cond:
-            if data.startswith("Ev="):
-                self._events.append(data.lstrip("Ev="))
-                self._cond.notify()
-            elif self._data is None:
-                self._data = data
-                self._cond.notify()  # notify waiting thread of new data
+            if delta and self._data_delta and self._data is not None:
+                # merge into the pending delta frame so no changes are lost
+                self._data.update(frame)
+                self._merged_frames += 1
+                self._cond.notify_all()
             else:
-                self._dropped_frames += 1
-                # log dropped frames, this is not necessarily a bad thing
-                # USB interrupt transfers (1ms) might take longer than one video frame
-                # we drop frames to keep latency to a minimum
-                logging.debug(f"Droppped frame (total {self._dropped_frames})")
+                self._put_frame(frame, t_recv)
+                self._data_delta = delta
+
+    def _put_frame(self, data, t_recv=None):
+        # must be called with self._cond held
+        if self._data is not None:
+            # the previous frame was not picked up yet, replace it with the newer one.
+            # this is not necessarily a bad thing, USB interrupt transfers (1ms) might take
+            # longer than one video frame, we only process the latest data to keep latency to a minimum
+            self._overwritten_frames += 1
+            logging.debug(f"Overwritten frame (total {self._overwritten_frames})")
+        self._data = data
+        if utils.latency.enabled:
+            t_submit = time.perf_counter()
+            self._data_times = (t_recv or t_submit, t_submit)
+        self._cond.notify_all()  # notify waiting thread of new data
+
+    def get_stats(self) -> dict:
+        return {
+            "frames": self.numFrames,
+            "overwritten_frames": self._overwritten_frames,
+            "merged_frames": self._merged_frames,
+            "pending_events": len(self._events),
+            "dropped_events": self._dropped_events,
+            "coalesced_events": self._coalesced_events,
+        }
 
     def process_events(self):
-        while self._events:
-            ev = self._events.pop(0)
-            ev = ev.split(";")
+        with self._cond:
+            batch = list(self._events)
+            self._events.clear()
 
+        for ev in batch:
             if self.currentAircraft:
-                self.currentAircraft.on_event(*ev)
-            self.eventReceived.emit(tuple(ev))
-            continue
+                try:
+                    self.currentAircraft.on_event(ev.name, *ev.args)
+                except Exception:
+                    logging.exception(".on_event Exception")
+
+        try:  # sometime Qt object is destroyed first on exit and this may cause a runtime exception
+            self.eventsReceived.emit(batch)
+        except: pass
 
     def get_changed_params(self, params):
         diff_dict = {}
@@ -177,9 +514,26 @@ class TelemManager(QObject, threading.Thread):
         self.currentAircraftConfig.update(diff_dict)
         return diff_dict
     
-    def process_data(self, data):
-
-        data = data.split(";")
+    def process_data(self, data, times=None, delta=False):
+        latency = utils.latency
+        t_start = time.perf_counter()
+        if latency.enabled and times:
+            t_recv, t_submit = times
+            latency.add("network", t_submit - t_recv)
+            latency.add("queue", t_start - t_submit)
+
+        if isinstance(data, str):
+            data = self._decoder.decode(data)
+            if latency.enabled:
+                latency.add("parse", time.perf_counter() - t_start)
+
+        if delta:
+            if self._delta_state is None:
+                self._delta_state = {}
+            self._delta_state.update(data)
+            data = self._delta_state
+        else:
+            self._delta_state = None
 
         telem_data = {}
         telem_data["FFBType"] = G.device_type
@@ -202,15 +556,7 @@ class TelemManager(QObject, threading.Thread):
 
         self.last_frame_time = time.perf_counter()
 
-        for i in data:
-            try:
-                if len(i):
-                    section, conf = i.split("=")
-                    values = conf.split("~")
-                    telem_data[section] = [utils.to_number(v) for v in values] if len(values) > 1 else utils.to_number(conf)
-
-            except Exception:
-                logging.exception("Error Parsing Parameter: %s", repr(i))
+        telem_data.update(data)
 
         # Read telemetry sent via IPC channel from child instances and update local telemetry stream
         if G.master_instance and G.launched_instances:
@@ -221,6 +567,8 @@ class TelemManager(QObject, threading.Thread):
 
         aircraft_name = telem_data.get("N")
         data_source = telem_data.get("src", None)
+        sc_aircraft_type = None
+        sc_engine_type = 4
         if data_source == "MSFS":
             module = aircrafts_msfs_xp
             sc_aircraft_type = telem_data.get("SimconnectCategory", None)
@@ -238,201 +586,32 @@ class TelemManager(QObject, threading.Thread):
         else:
             module = aircrafts_dcs
 
-        if aircraft_name and aircraft_name != self.currentAircraftName:
-
-            if self.currentAircraft is None or aircraft_name != self.currentAircraftName:
-                logging.info(f"New aircraft loaded: resetting current aircraft config")
-                self.currentAircraftConfig = {}
-
-                params, cls_name = self.get_aircraft_config(aircraft_name, data_source)
-
-                # self.settings_manager.update_current_aircraft(send_source, aircraft_name, cls_name)
-                Class = getattr(module, cls_name, None)
-                logging.debug(f"CLASS={Class.__name__}")
-
-                if not Class or Class.__name__ == "Aircraft":
-                    if data_source == "MSFS":
-                        if sc_aircraft_type == "Helicopter":
-                            logging.warning("Aircraft definition not found, using SimConnect Data (Helicopter Type)")
-                            type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.Helicopter")
-                            params.update(type_cfg)
-                            Class = module.Helicopter
-                        elif sc_aircraft_type == "Jet":
-                            logging.warning("Aircraft definition not found, using SimConnect Data (Jet Type)")
-                            type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.JetAircraft")
-                            params.update(type_cfg)
-                            Class = module.JetAircraft
-                        elif sc_aircraft_type == "Airplane":
-                            if sc_engine_type == 0:     # Piston
-                                logging.warning("Aircraft definition not found, using SimConnect Data (Propeller Type)")
-                                type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.PropellerAircraft")
-                                params.update(type_cfg)
-                                Class = module.PropellerAircraft
-                            if sc_engine_type == 1:     # Jet
-                                logging.warning("Aircraft definition not found, using SimConnect Data (Jet Type)")
-                                type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.JetAircraft")
-                                params.update(type_cfg)
-                                Class = module.JetAircraft
-                            elif sc_engine_type == 2:   # None
-                                logging.warning("Aircraft definition not found, using SimConnect Data (Glider Type)")
-                                type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.GliderAircraft")
-                                params.update(type_cfg)
-                                Class = module.GliderAircraft
-                            elif sc_engine_type == 3:   # Heli
-                                logging.warning("Aircraft definition not found, using SimConnect Data (Helo Type)")
-                                type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.HelicopterAircraft")
-                                params.update(type_cfg)
-                                Class = module.Helicopter
-                            elif sc_engine_type == 5:   # Turboprop
-                                logging.warning("Aircraft definition not found, using SimConnect Data (Turboprop Type)")
-                                type_cfg, cls_name = self.get_aircraft_config(aircraft_name, "MSFS.TurbopropAircraft")
-                                params.update(type_cfg)
-                                Class = module.TurbopropAircraft
-                        else:
-                            logging.warning(f"Aircraft definition not found, using default class for {aircraft_name}")
-                            Class = module.Aircraft
-                    else:
-                        logging.warning(f"Aircraft definition not found, using default class for {aircraft_name}")
-                        Class = module.Aircraft
-
-                if "vpconf" in params:
-                    if G.current_vpconf_profile != params.get('vpconf', None) or G.force_reload_aircraft_trigger:
-                        # Load the vpconf configurator file specified for the model, only if it is not the current
-                        # one loaded
-                        set_vpconf_profile(params['vpconf'], HapticEffect.device.serial)
-                        G.vpconf_configurator_gains = HapticEffect.device.get_gains()
-                        G.force_reload_aircraft_trigger = False
-                else:
-                    # If the current model does not have a vpconf specified, check whether the global default is
-                    # configured and enabled.  If so, load that vpconf profile
-                    load_global = G.system_settings.get("enableVPConfGlobalDefault", False)
-                    global_path = G.system_settings.get("pathVPConfStartup", "")
-                    if load_global and global_path != G.current_vpconf_profile:
-                        logging.info("Aircraft changed, current loaded vpconf no longer applicable, reloading configured global default profile")
-                        set_vpconf_profile(global_path, HapticEffect.device.serial)
-                        G.vpconf_configurator_gains = HapticEffect.device.get_gains()  # set here to keep track of gains set by last vpconf
-                    # utils.dbprint("red", f"Gains: {G.vpconf_configurator_gains}")
-
-                if params.get('command_runner_enabled', False):
-                    if params.get('command_runner_command', '') != '':
-                        try:
-                            subprocess.Popen(params['command_runner_command'], shell=True)
-                        except Exception as e:
-                            logging.error(f"Error running Command Executor for model: {e}")
-
-                if params.get('configurator_override_enabled', False):
-                    state = params.get('configurator_gains', 'none')
-                    if state != "none":
-                        state = json.loads(params.get('configurator_gains', '{}'))
-                        G.gain_override_dialog.set_gains_from_state(state)
-                        G.current_configurator_gains = state
-                        # dbprint("green", f"current_gain: {state}")
-                        # dbprint("yellow", f"vpconf_gain: {G.vpconf_configurator_gains}")
-                    else:
-                        # if the override is enabled but gain has not been set, send the last vpconf gain data to ensure
-                        # previous aircraft override gains do not persist.  The last vpconf gain data will either be
-                        # the gain at TelemFFB startup, or the last gain set by a pushed vpconf profile
-                        G.gain_override_dialog.set_gains_from_object(G.vpconf_configurator_gains)
-                else:
-                    # if the override is NOT enabled. send the last vpconf gain data to ensure
-                    # previous aircraft override gains do not persist.  The last vpconf gain data will either be
-                    # the gain at TelemFFB startup, or the last gain set by a pushed vpconf profile
-                    G.gain_override_dialog.set_gains_from_object(G.vpconf_configurator_gains)
-
-
-                logging.info(f"Creating handler for {aircraft_name}: {Class.__module__}.{Class.__name__}")
+        self._poll_aircraft_job()
 
-                # instantiate new aircraft handler
-                self.currentAircraft = Class(aircraft_name)
-
-                self.currentAircraft.apply_settings(params)
-                self.currentAircraftConfig = params
-                if data_source == "MSFS" and aircraft_name != '':
-                    d1 = xmlutils.read_sc_overrides(aircraft_name)
-                    for sv in d1:
-                        self._simconnect.add_simvar(name=sv['name'], var=sv['var'], sc_unit=sv['sc_unit'], scale=sv['scale'])
-                    self._simconnect._resubscribe()
-
-                if G.settings_mgr.isVisible():
-                    G.settings_mgr.b_getcurrentmodel.click()
-
-                self.aircraftUpdated.emit()
-                # dbprint("red", "Aircraft Updated Emit : #1")
-
-            self.currentAircraftName = aircraft_name
+        if self._aircraft_job is None and time.perf_counter() >= self._aircraft_job_retry_time:
+            if aircraft_name and aircraft_name != self.currentAircraftName:
+                # resolve the new aircraft in the background, the previous handler keeps running until it is ready
+                logging.info(f"New aircraft loaded: resolving config for {aircraft_name}")
+                self._start_aircraft_job(aircraft_name, data_source, module, sc_aircraft_type, sc_engine_type)
+            elif self.currentAircraft and self._config_reload_pending:
+                logging.info("Configuration has changed, reloading")
+                self._config_reload_pending = False
+                self._start_aircraft_job(self.currentAircraftName, data_source, module, reload=True)
 
         if self.currentAircraft:
             if config_has_changed():
-                logging.info("Configuration has changed, reloading")
-                params, cls_name = self.get_aircraft_config(aircraft_name, data_source)
-                updated_params = self.get_changed_params(params)
-                self.currentAircraft.apply_settings(updated_params)
-
-                if "vpconf" in params:
-                    if G.current_vpconf_profile != params.get('vpconf', None) or G.force_reload_aircraft_trigger:
-                        # Load the vpconf configurator file specified for the model, only if it is not the current
-                        # one loaded
-                        set_vpconf_profile(params['vpconf'], HapticEffect.device.serial)
-                        G.vpconf_configurator_gains = HapticEffect.device.get_gains()  # set here to keep track of gains set by last vpconf
-                        G.force_reload_aircraft_trigger = False
-
-                else:
-                    # If the current model does not have a vpconf specified, check whether the global default is
-                    # configured and enabled.  If so, load that vpconf profile
-                    load_global = G.system_settings.get("enableVPConfGlobalDefault", False)
-                    global_path = G.system_settings.get("pathVPConfStartup", "")
-                    if load_global and global_path != G.current_vpconf_profile:
-                        logging.info("Aircraft changed, current loaded vpconf no longer applicable, reloading configured global default profile")
-                        set_vpconf_profile(global_path, HapticEffect.device.serial)
-                        G.vpconf_configurator_gains = HapticEffect.device.get_gains()  # set here to keep track of gains set by last vpconf
-                    # utils.dbprint("blue", f"Gains: {G.vpconf_configurator_gains}")
-                if params.get('command_runner_enabled', False):
-                    if params.get('command_runner_command', '') != '' and 'Enter full path' not in params.get('command_runner_command', ''):
-                        try:
-                            subprocess.Popen(params['command_runner_command'], shell=True)
-                        except Exception as e:
-                            logging.error(f"Error running Command Executor for model: {e}")
-
-                if params.get('configurator_override_enabled', False):
-                    state = params.get('configurator_gains', 'none')
-                    if state != "none":
-                        state = json.loads(params.get('configurator_gains', '{}'))
-                        G.gain_override_dialog.set_gains_from_state(state)
-                        G.current_configurator_gains = state
-                        # dbprint("red", f"current_gain: {state}")
-                    else:
-                        # if the override is enabled but gain has not been set, send the last vpconf gain data to ensure
-                        # previous aircraft override gains do not persist.  The last vpconf gain data will either be
-                        # the gain at TelemFFB startup, or the last gain set by a pushed vpconf profile
-                        G.gain_override_dialog.set_gains_from_object(G.vpconf_configurator_gains)
-                else:
-                    # if the override is NOT enabled. send the last vpconf gain data to ensure
-                    # previous aircraft override gains do not persist.  The last vpconf gain data will either be
-                    # the gain at TelemFFB startup, or the last gain set by a pushed vpconf profile
-                    G.gain_override_dialog.set_gains_from_object(G.vpconf_configurator_gains)
-
-                if "type" in updated_params:
-                    # if user changed type or if new aircraft dialog changed type, update aircraft class
-                    Class = getattr(module, cls_name, None)
-                    self.currentAircraft = Class(aircraft_name)
-                    self.currentAircraft.apply_settings(params)
-                    self.currentAircraftConfig = params
-
-                if data_source == "MSFS" and aircraft_name != '':
-                    d1 = xmlutils.read_sc_overrides(aircraft_name)
-                    for sv in d1:
-                        self._simconnect.add_simvar(name=sv['name'], var=sv['var'], sc_unit=sv['sc_unit'], scale=sv['scale'])
-                    self._simconnect._resubscribe()
-
-                self.aircraftUpdated.emit()
-                # dbprint("red", "Aircraft Updated Emit : #2")
+                self._config_reload_pending = True
+                self._aircraft_job_retry_time = 0 # an edited config may fix a failing job, don't wait out the backoff
 
             try:
                 _tm = time.perf_counter()
                 self.currentAircraft._last_telem_data = self.currentAircraft._telem_data.copy() # Keep copy of last data for frame-to-frame comparison
                 self.currentAircraft._telem_data = telem_data
                 self.currentAircraft.on_telemetry(telem_data)
-                telem_data["perf"] = f"{(time.perf_counter() - _tm) * 1000:.3f}ms"
+                _dt = time.perf_counter() - _tm
+                telem_data["perf"] = f"{_dt * 1000:.3f}ms"
+                if latency.enabled:
+                    latency.add("effects", _dt)
 
             except Exception:
                 logging.exception(".on_telemetry Exception")
@@ -451,6 +630,9 @@ class TelemManager(QObject, threading.Thread):
                     else:
                         utils.teleplot.sendTelemetry(item, telem_data[item])
 
+        if latency.enabled and times:
+            latency.add("total", time.perf_counter() - t_recv)
+
         try:  # sometime Qt object is destroyed first on exit and this may cause a runtime exception
             self.telemetryReceived.emit(telem_data)
         except: pass
@@ -466,26 +648,47 @@ class TelemManager(QObject, threading.Thread):
             self.timed_out = True
             G.settings_mgr.timed_out = True
 
+    def wait_idle(self, timeout=None) -> bool:
+        """Block until all submitted frames and events have been processed"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._data is None and not self._events and not self._busy, timeout)
+
     def run(self):
         self.timeout_sec = int(G.system_settings.get('telemTimeout', 200))/1000.0
         logging.info(f"Telemetry timeout: {self.timeout_sec}")
         self._run = True
         while self._run:
             with self._cond:
-                if not self._events and not self._data:
-                    if not self._cond.wait(self.timeout_sec):
-                        self.on_timeout()
-                        continue
+                if not self._events and self._data is None:
+                    self._cond.wait(self.timeout_sec)
+                # take the pending frame, processing happens without the lock held
+                data = self._data
+                times = self._data_times
+                delta = self._data_delta
+                self._data = None
+                self._data_times = None
+                self._busy = data is not None or bool(self._events)
+
+            if not self._busy:
+                self.on_timeout()
+                continue
 
-                if self._data:
+            try:
+                if data is not None:
                     if self.timed_out:
                         self.telemetryTimeout.emit(False)
                         self.timed_out = False
 
                     G.settings_mgr.timed_out = False
-                    data = self._data
-                    self._data = None
-                    self.process_data(data)
-                
+                    self.numFrames += 1
+                    self.process_data(data, times, delta)
+
                 if self._events:
-                    self.process_events()
\ No newline at end of file
+                    self.process_events()
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()  # wake up wait_idle() callers
+
+            if utils.latency.log_interval:
+                utils.latency.log_periodic()
@@ -0,0 +1,144 @@
+"""
+Telemetry capture and replay
+
+Captures everything submitted to TelemManager (text frames, events and typed
+frames from IL-2/MSFS) with timestamps into a gzip compressed file, one JSON
+record per line: [time, kind, payload], where kind is "t" for text frames and
+events, "d" for typed (dict) frames and "D" for typed frames carrying only the
+changed keys (see TelemManager.submit_telem).
+
+A capture can be replayed into a running TelemManager in real time, at N times
+speed or as fast as the pipeline can process it, which gives a repeatable
+benchmark of the process_data -> on_telemetry -> HID write path.
+"""
+
+import gzip
+import json
+import logging
+import threading
+import time
+from typing import Iterator, Tuple
+
+KIND_TEXT = "t"
+KIND_DICT = "d"
+KIND_DELTA = "D"
+
+
+class TelemRecorder:
+    def __init__(self, path: str):
+        self.path = path
+        self.num_records = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._tbase = time.perf_counter()
+        logging.info(f"Recording telemetry to {path}")
+
+    def record(self, data, delta=False):
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        if isinstance(data, str):
+            kind = KIND_TEXT
+        else:
+            kind = KIND_DELTA if delta else KIND_DICT
+        t = round(time.perf_counter() - self._tbase, 6)
+        line = json.dumps([t, kind, data], separators=(",", ":"))
+        with self._lock:
+            if self._file:
+                self._file.write(line + "\n")
+                self.num_records += 1
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+                logging.info(f"Telemetry recording stopped, {self.num_records} records written to {self.path}")
+
+
+def read_capture(path: str) -> Iterator[Tuple[float, str, object]]:
+    """Yield (time, kind, payload) records from a capture file"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                t, kind, data = json.loads(line)
+                yield t, kind, data
+
+
+def _submit(telem, kind, data):
+    if kind == KIND_DICT:
+        telem.submit_telem(data)
+    elif kind == KIND_DELTA:
+        telem.submit_telem(data, delta=True)
+    else:
+        telem.submit_frame(data)
+
+
+def replay(path: str, telem, speed: float = 1.0) -> dict:
+    """Feed a capture file into TelemManager
+
+    :param telem: running TelemManager instance
+    :param speed: playback speed multiplier, 1.0 is real time. 0 replays as fast
+        as possible, waiting for each record to be processed before submitting the next
+    :return: replay statistics
+    """
+    latencies = []
+    num_records = 0
+    tstart = time.perf_counter()
+    tbase = None
+
+    for t, kind, data in read_capture(path):
+        if tbase is None:
+            tbase = t
+
+        if speed > 0:
+            delay = (t - tbase) / speed - (time.perf_counter() - tstart)
+            if delay > 0:
+                time.sleep(delay)
+            _submit(telem, kind, data)
+        else:
+            ts = time.perf_counter()
+            _submit(telem, kind, data)
+            telem.wait_idle()
+            latencies.append(time.perf_counter() - ts)
+
+        num_records += 1
+
+    duration = time.perf_counter() - tstart
+    stats = {
+        "records": num_records,
+        "duration_s": round(duration, 3),
+        "records_per_s": round(num_records / duration, 1) if duration else 0,
+    }
+    if latencies:
+        latencies.sort()
+        pct = lambda p: round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+        stats.update({
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(latencies[-1] * 1000, 3),
+        })
+    return stats
+
+
+def start_replay(path: str, telem, speed: float = 1.0, device=None) -> threading.Thread:
+    """Replay a capture file in the background and log the statistics when finished
+
+    If `device` is a simulated device (ffb_sim.FFBRhinoSim) its HID write statistics
+    are logged as well.
+    """
+    def run():
+        logging.info(f"Replaying telemetry from {path} at speed {speed or 'max'}")
+        try:
+            if hasattr(device, "reset_stats"):
+                device.reset_stats()
+            stats = replay(path, telem, speed)
+            logging.info(f"Telemetry replay finished: {stats}")
+            if hasattr(device, "get_stats"):
+                logging.info(f"Device statistics: {device.get_stats()}")
+        except Exception:
+            logging.exception("Telemetry replay failed")
+
+    th = threading.Thread(target=run, daemon=True)
+    th.start()
+    return th
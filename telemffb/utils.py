@@ -30,7 +30,11 @@ import select
 import logging
 import sys
 
-import winreg
+if sys.platform == "win32":
+    import winreg
+else:
+    winreg = None  # the registry is only read on Windows, headless runs elsewhere don't touch it
+
 import socket
 import time
 import zlib
@@ -48,7 +52,6 @@ from PyQt5.QtWidgets import QFileDialog, QMessageBox
 import stransi
 
 import telemffb.globals as G
-import telemffb.winpaths as winpaths
 import telemffb.xmlutils as xmlutils
 
 def dbprint(color, msg):
@@ -1052,6 +1055,77 @@ class PerformanceTracker:
     def clear_trackers(self):
         self.trackers.clear()
 
+class LatencyStats:
+    """Collects per stage timing samples of the telemetry pipeline.
+
+    Stages are free form names (eg. "network", "queue", "parse", "effects",
+    "hid_write"), the last `window` samples of each are kept and summarized as
+    percentiles. Collection is disabled by default and costs a single attribute
+    check per stage when off.
+    """
+    def __init__(self, window=2000):
+        self.enabled = False
+        self.log_interval = 0
+        self.window = window
+        self._samples : typing.Dict[str, deque] = {}
+        self._last_log = time.perf_counter()
+
+    def enable(self, log_interval=0):
+        """Enable collection, log a summary every `log_interval` seconds if non-zero"""
+        self.enabled = True
+        self.log_interval = log_interval
+
+    def add(self, stage: str, seconds: float):
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples.setdefault(stage, deque(maxlen=self.window))
+        samples.append(seconds)
+
+    def timed(self, stage: str, fn):
+        """Wrap callable `fn` so each call is recorded under `stage`"""
+        def wrapper(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - t)
+        return wrapper
+
+    def instrument(self, obj, prefix: str, stage_prefix: str = ""):
+        """Replace methods of `obj` whose name starts with `prefix` with timed versions"""
+        for name in dir(type(obj)):
+            if name.startswith(prefix):
+                method = getattr(obj, name)
+                if callable(method):
+                    setattr(obj, name, self.timed(f"{stage_prefix}{name}", method))
+
+    def get_stats(self) -> dict:
+        """Return {stage: {count, p50, p95, p99, max}} with times in milliseconds"""
+        out = {}
+        for stage, samples in list(self._samples.items()):
+            values = sorted(samples)
+            if not values:
+                continue
+            n = len(values)
+            pct = lambda p: round(values[min(n - 1, int(n * p))] * 1000, 3)
+            out[stage] = {"count": n, "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+                          "max": round(values[-1] * 1000, 3)}
+        return out
+
+    def reset(self):
+        self._samples.clear()
+
+    def log_periodic(self):
+        if not self.log_interval:
+            return
+        now = time.perf_counter()
+        if now - self._last_log < self.log_interval:
+            return
+        self._last_log = now
+        lines = [f"  {stage:32s} n={s['count']:5d} p50={s['p50']:8.3f} p95={s['p95']:8.3f} "
+                 f"p99={s['p99']:8.3f} max={s['max']:8.3f} ms" for stage, s in self.get_stats().items()]
+        logging.info("Latency statistics:\n" + "\n".join(lines))
+
 class Dispenser:
     def __init__(self, cls) -> None:
         self.cls = cls
@@ -1134,6 +1208,7 @@ class Teleplot:
 
 
 teleplot = Teleplot()
+latency = LatencyStats()
 
 
 def analyze_il2_config(path, port=34385, window=None):
@@ -1371,6 +1446,7 @@ def install_xplane_plugin(path, window):
 
 
 def install_export_lua(window):
+    import telemffb.winpaths as winpaths
     saved_games = winpaths.get_path(winpaths.FOLDERID.SavedGames)
     logging.info(f"Found Saved Games directory: {saved_games}")
 
@@ -2003,6 +2079,10 @@ def check_launch_instance(dev_type :str, master_port : int) -> subprocess.Popen:
             args.append('--minimize')
         if G.system_settings.get(f'startHeadless{dev_type_cap}', False):
             args.append('--headless')
+        if G.args.listener_hub:
+            args.append('--listener-hub')
+        if G.args.msfs_changed_only:
+            args.append('--msfs-changed-only')
 
         logging.info("Auto-Launch: starting instance: %s", args)
         proc = ChildPopen(args)
@@ -2,8 +2,10 @@
 import logging
 import time
 import xml.etree.ElementTree as ET
+import functools
 import os
 import re
+import threading
 import xml.dom.minidom
 
 
@@ -14,6 +16,15 @@ device = ''
 userconfig_path = ''
 defaults_path = ''
 
+# resolved sc_overrides per aircraft name, valid while the config files are unchanged
+_sc_overrides_cache = {}
+
+# resolved settings of read_single_model(), valid for one config generation while the files they
+# were read from are unchanged
+_settings_cache = {}
+_settings_cache_lock = threading.Lock()
+_config_generation = 0
+
 
 def dbprint(color, msg):
     reset = '\033[0m'
@@ -55,6 +66,201 @@ def try_parse(file_path, max_attempts=3, delay=0.1):
 def write_userconfig_xml(tree : ET.ElementTree):
     ET.indent(tree, " ")
     tree.write(userconfig_path, "utf-8")
+    _sc_overrides_cache.clear()
+    config_file(userconfig_path).invalidate()
+    bump_config_generation()
+
+
+def bump_config_generation():
+    """Drop all resolved settings, called whenever the user config is written"""
+    global _config_generation
+    with _settings_cache_lock:
+        _config_generation += 1
+        _settings_cache.clear()
+
+
+def _file_stamp(file_path):
+    """(path, mtime, size) of a file, changes whenever the file is rewritten"""
+    try:
+        st = os.stat(file_path)
+        return file_path, st.st_mtime_ns, st.st_size
+    except OSError:
+        return file_path, None, None
+
+
+@functools.lru_cache(maxsize=2048)
+def compile_pattern(pattern):
+    """Compiled model/class pattern from the config, None if it is not a valid regex"""
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        logging.warning(f"Invalid pattern '{pattern}' in config, matching it literally: {e}")
+        return None
+
+
+def pattern_matches(pattern, name) -> bool:
+    """re.match() of a config pattern, which also matches when equal to the name"""
+    regex = compile_pattern(pattern)
+    return pattern == name or (regex is not None and regex.match(name) is not None)
+
+
+_REGEX_SPECIAL = set(".^$*+?{}[]()|\\")
+_PREFIX_INDEX_LEN = 3
+
+
+def _literal_prefix(pattern) -> str:
+    """Text every name matched by `pattern` starts with, "" if there is none to rely on"""
+    if "|" in pattern:
+        return ""  # an alternation may match names with any start
+    for i, c in enumerate(pattern):
+        if c in _REGEX_SPECIAL:
+            # a quantifier makes the character before it optional
+            return pattern[:i - 1] if c in "*?{" else pattern[:i]
+    return pattern
+
+
+class PatternMatcher:
+    """
+    Matches aircraft names against all model patterns of a config file at once.
+
+    Patterns are compiled once and indexed by their literal prefix (up to the first
+    3 characters), so only patterns whose prefix fits the name are tested with the regex.
+    Patterns without a literal prefix are always tested. Results are cached per name.
+    """
+    def __init__(self, patterns):
+        self._index = {}  # prefix length -> {name prefix: [(literal prefix, pattern)]}
+        self._unindexed = []
+        for pattern in dict.fromkeys(p for p in patterns if p is not None):
+            prefix = _literal_prefix(pattern)
+            if prefix:
+                n = min(len(prefix), _PREFIX_INDEX_LEN)
+                self._index.setdefault(n, {}).setdefault(prefix[:n], []).append((prefix, pattern))
+            else:
+                self._unindexed.append(pattern)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def matches(self, name) -> frozenset:
+        """Set of the patterns matching `name`"""
+        result = self._cache.get(name)
+        if result is not None:
+            return result
+        matched = [p for p in self._unindexed if pattern_matches(p, name)]
+        for n, index in self._index.items():
+            for prefix, pattern in index.get(name[:n], ()):
+                if name.startswith(prefix) and pattern_matches(pattern, name):
+                    matched.append(pattern)
+        result = frozenset(matched)
+        with self._lock:
+            if len(self._cache) >= 512:
+                self._cache.clear()
+            self._cache[name] = result
+        return result
+
+
+class XmlConfigFile:
+    """
+    In-memory model of an XML config file (defaults.xml, the user config or a .tffbprofile).
+
+    Each top level element (defaults, classdefaults, models, sc_overrides, simSettings,
+    classSettings) is kept as a record, a dict of child tag -> text, grouped by element tag.
+    The file is parsed on first use and again only when its mtime or size changes.
+    Lookups by child texts (sim, device, type, ...) go through dictionary indexes built
+    once per load. Records and returned lists are shared and must not be modified.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.stamp = None
+        self.elements = {}
+        self._indexes = {}  # (tag, child tags) -> {child texts: [records]}
+        self._fallbacks = {}  # (tag, criteria) -> select_any() result
+        self._matchers = {}  # tag -> PatternMatcher of the 'model' patterns
+        self._lock = threading.Lock()
+
+    def _load(self, stamp):
+        tree = try_parse(self.file_path)
+        if tree is None:
+            raise ET.ParseError(f"Could not parse {self.file_path}")
+        elements = {}
+        for elem in tree.getroot():
+            elements.setdefault(elem.tag, []).append({child.tag: child.text for child in elem})
+        self.elements = elements
+        self._indexes = {}
+        self._fallbacks = {}
+        self._matchers = {}
+        self.stamp = stamp
+        logging.debug(f"Loaded {self.file_path}: { {tag: len(recs) for tag, recs in elements.items()} }")
+
+    def _check(self):
+        stamp = _file_stamp(self.file_path)
+        if stamp != self.stamp:
+            self._load(stamp)
+
+    def get(self, tag) -> list:
+        """Records of all `tag` elements, in document order"""
+        with self._lock:
+            self._check()
+            return self.elements.get(tag, [])
+
+    def _select(self, tag, criteria):
+        keys = tuple(criteria)
+        index = self._indexes.get((tag, keys))
+        if index is None:
+            index = {}
+            for rec in self.elements.get(tag, []):
+                if all(k in rec for k in keys):
+                    index.setdefault(tuple(rec[k] or "" for k in keys), []).append(rec)
+            self._indexes[(tag, keys)] = index
+        return index.get(tuple(criteria.values()), [])
+
+    def select(self, tag, criteria : dict) -> list:
+        """Records of `tag` elements having child elements with the given texts, in document
+        order, like findall('tag[k="v"][...]')"""
+        with self._lock:
+            self._check()
+            return self._select(tag, criteria)
+
+    def select_any(self, tag, criteria : dict) -> list:
+        """select() with the 'sim' and 'device' criteria falling back to "any", most specific
+        first: (sim, device), (any, device), (sim, any), (any, any)"""
+        key = (tag, tuple(criteria.items()))
+        with self._lock:
+            self._check()
+            result = self._fallbacks.get(key)
+            if result is None:
+                result = []
+                for the_device in (criteria['device'], 'any'):
+                    for the_sim in (criteria['sim'], 'any'):
+                        result += self._select(tag, {**criteria, 'sim': the_sim, 'device': the_device})
+                self._fallbacks[key] = result
+            return result
+
+    def matching_models(self, tag, name) -> frozenset:
+        """The 'model' patterns of `tag` elements which match aircraft `name`"""
+        with self._lock:
+            self._check()
+            matcher = self._matchers.get(tag)
+            if matcher is None:
+                matcher = self._matchers[tag] = PatternMatcher(rec.get('model') for rec in self.elements.get(tag, []))
+        return matcher.matches(name)
+
+    def invalidate(self):
+        """Force a reload on next access, for writes within the file system's mtime resolution"""
+        with self._lock:
+            self.stamp = None
+
+
+_config_files = {}
+_config_files_lock = threading.Lock()
+
+
+def config_file(file_path) -> XmlConfigFile:
+    """Shared XmlConfigFile of `file_path`"""
+    with _config_files_lock:
+        cfg = _config_files.get(file_path)
+        if cfg is None:
+            cfg = _config_files[file_path] = XmlConfigFile(file_path)
+        return cfg
 
 
 def update_vars(_device, _userconfig_path, _defaults_path):
@@ -66,8 +272,7 @@ def update_vars(_device, _userconfig_path, _defaults_path):
 
 def read_xml_file(the_sim, instance_device=''):
     mprint(f"read_xml_file  {the_sim}")
-    tree = try_parse(defaults_path)
-    root = tree.getroot()
+    cfg = config_file(defaults_path)
 
     if instance_device == '':
         the_device = device
@@ -76,28 +281,21 @@ def read_xml_file(the_sim, instance_device=''):
 
     # Collect data in a list of dictionaries
     data_list = []
-    for defaults_elem in root.findall(f'.//defaults[{the_sim}="true"][{the_device}="true"]'):
-
-        grouping = defaults_elem.find('Grouping').text
-        order = defaults_elem.find('order').text
-        name = defaults_elem.find('name').text
-        displayname = defaults_elem.find('displayname').text
-        datatype = defaults_elem.find('datatype').text
-        unit_elem = defaults_elem.find('unit')
-        unit = unit_elem.text if unit_elem is not None else ""
-        value_elem = defaults_elem.find('value')
-        value = value_elem.text if value_elem is not None else ""
+    for defaults_elem in cfg.select('defaults', {the_sim: "true", the_device: "true"}):
+
+        grouping = defaults_elem['Grouping']
+        order = defaults_elem['order']
+        name = defaults_elem['name']
+        displayname = defaults_elem['displayname']
+        datatype = defaults_elem['datatype']
+        unit = defaults_elem.get('unit', "")
+        value = defaults_elem.get('value', "")
         if value is None: value = ""
-        valid_elem = defaults_elem.find('validvalues')
-        validvalues = valid_elem.text if valid_elem is not None else ""
-        info_elem = defaults_elem.find('info')
-        info = (f"{info_elem.text}") if info_elem is not None else ""
-        prereq_elem = defaults_elem.find('prereq')
-        prereq = (f"{prereq_elem.text}") if prereq_elem is not None else ""
-        sliderfactor_elem = defaults_elem.find('sliderfactor')
-        sliderfactor = (f"{sliderfactor_elem.text}") if sliderfactor_elem is not None else "1"
-        device_elem = defaults_elem.find('any')
-        device_text = 'any' if device_elem is not None else device
+        validvalues = defaults_elem.get('validvalues', "")
+        info = (f"{defaults_elem['info']}") if 'info' in defaults_elem else ""
+        prereq = (f"{defaults_elem['prereq']}") if 'prereq' in defaults_elem else ""
+        sliderfactor = (f"{defaults_elem['sliderfactor']}") if 'sliderfactor' in defaults_elem else "1"
+        device_text = 'any' if 'any' in defaults_elem else device
         replaced = 'Sim Default'
 
         # Store data in a dictionary
@@ -130,16 +328,14 @@ def read_xml_file(the_sim, instance_device=''):
 
 def read_anydevice_settings(the_sim):
 
-    tree = try_parse(defaults_path)
-    root = tree.getroot()
+    cfg = config_file(defaults_path)
 
     # Collect data in a list of dictionaries
     data_list = []
-    for defaults_elem in root.findall(f'.//defaults[{the_sim}="true"][any="true"]'):
+    for defaults_elem in cfg.select('defaults', {the_sim: "true", "any": "true"}):
 
-        name_elem = defaults_elem.find('name')
-        if name_elem is not None:
-            name = name_elem.text
+        if 'name' in defaults_elem:
+            name = defaults_elem['name']
             data_list.append(name)
 
     return data_list
@@ -147,39 +343,29 @@ def read_anydevice_settings(the_sim):
 
 def read_models(the_sim, the_class=''):
     all_models = ['']
-    tree = try_parse(defaults_path)
-    root = tree.getroot()
+    cfg = config_file(defaults_path)
     if the_class == '':
-        def_models =  root.findall(f'.//models[sim="{the_sim}"][device="{device}"]') + \
-                      root.findall(f'.//models[sim="any"][device="{device}"]') + \
-                      root.findall(f'.//models[sim="{the_sim}"][device="any"]') + \
-                      root.findall(f'.//models[sim="any"][device="any"]')
+        def_models = cfg.select_any('models', {'sim': the_sim, 'device': device})
     else:
-        def_models = root.findall(f'.//models[sim="{the_sim}"][value="{the_class}"]')
+        def_models = cfg.select('models', {'sim': the_sim, 'value': the_class})
 
     for model_elem in def_models:
-        pattern = model_elem.find('model')
         # lprint (pattern.text)
-        if pattern is not None:
-            if pattern.text not in all_models:
-                all_models.append(pattern.text)
+        if 'model' in model_elem:
+            if model_elem['model'] not in all_models:
+                all_models.append(model_elem['model'])
 
     # create_empty_userxml_file() - handled by TelemFFB on startup via utils.py
-    tree = try_parse(userconfig_path)
-    root = tree.getroot()
+    cfg = config_file(userconfig_path)
     if the_class == '':
-        usr_models =  root.findall(f'.//models[sim="{the_sim}"][device="{device}"]') + \
-                      root.findall(f'.//models[sim="any"][device="{device}"]') + \
-                      root.findall(f'.//models[sim="{the_sim}"][device="any"]') + \
-                      root.findall(f'.//models[sim="any"][device="any"]')
+        usr_models = cfg.select_any('models', {'sim': the_sim, 'device': device})
     else:
-        usr_models = root.findall(f'.//models[sim="{the_sim}"][value="{the_class}"]')
+        usr_models = cfg.select('models', {'sim': the_sim, 'value': the_class})
     for model_elem in usr_models:
-        pattern = model_elem.find('model')
         # lprint (pattern.text)
-        if pattern is not None:
-            if pattern.text not in all_models:
-                all_models.append(pattern.text)
+        if 'model' in model_elem:
+            if model_elem['model'] not in all_models:
+                all_models.append(model_elem['model'])
 
     return sorted(all_models)
 
@@ -187,8 +373,7 @@ def read_models(the_sim, the_class=''):
 def read_models_data(file_path, sim, full_model_name, alldevices=False, instance_device = ''):
     mprint(f"read_models_data  {file_path}, {sim}, {full_model_name}")
     # runs on both defaults and userconfig xml files
-    tree = try_parse(file_path)
-    root = tree.getroot()
+    cfg = config_file(file_path)
 
     model_data = []
     found_pattern = ''
@@ -201,47 +386,47 @@ def read_models_data(file_path, sim, full_model_name, alldevices=False, instance
     if alldevices:
         # Iterate through models elements
         #for model_elem in root.findall(f'.//models[sim="{self.sim}"][device="{device}"]'):
-        any_models = root.findall(f'.//models[sim="any"]')
+        any_models = cfg.select('models', {'sim': 'any'})
 
-        all_models = root.findall(f'.//models[sim="{sim}"]') 
+        all_models = cfg.select('models', {'sim': sim})
 
     else:
         # Collect models with 'device' set to 'any' or both 'sim' and 'device' set to 'any'
-        any_models = root.findall(f'.//models[sim="{sim}"][device="any"]') + \
-                     root.findall(f'.//models[sim="any"][device="any"]')
+        any_models = cfg.select('models', {'sim': sim, 'device': 'any'}) + \
+                     cfg.select('models', {'sim': 'any', 'device': 'any'})
 
         # Collect models with specific devices
-        all_models = root.findall(f'.//models[sim="{sim}"][device="{the_device}"]') + \
-                     root.findall(f'.//models[sim="any"][device="{the_device}"]')
+        all_models = cfg.select('models', {'sim': sim, 'device': the_device}) + \
+                     cfg.select('models', {'sim': 'any', 'device': the_device})
 
         # Create a dictionary to store models based on unique keys
     model_dict = {}
 
     # Process any_models
     for model_elem in any_models:
-        model_key = (model_elem.find('model').text, model_elem.find('name').text)
+        model_key = (model_elem['model'], model_elem['name'])
         model_dict[model_key] = model_elem
 
     # Process all_models, overwriting any existing models with the same key
     for model_elem in all_models:
-        model_key = (model_elem.find('model').text, model_elem.find('name').text)
+        model_key = (model_elem['model'], model_elem['name'])
         model_dict[model_key] = model_elem
 
+    matched = cfg.matching_models('models', full_model_name)
+
     # Process the models
     for model_elem in model_dict.values():
         # Assuming 'model' is the element containing the wildcard pattern
 
-        unit_pattern = model_elem.find('model')
-        if unit_pattern is not None:
-            pattern = unit_pattern.text
+        if 'model' in model_elem:
+            pattern = model_elem['model']
             if pattern is not None:
                 # Check if the full_model_name matches the pattern using re.match
-                if re.match(pattern, full_model_name) or pattern == full_model_name:
-                    name = model_elem.find('name').text
-                    value = model_elem.find('value').text
-                    unit_elem = model_elem.find('unit')
-                    unit = unit_elem.text if unit_elem is not None else ""
-                    saved_device = model_elem.find('device').text
+                if pattern in matched:
+                    name = model_elem['name']
+                    value = model_elem['value']
+                    unit = model_elem.get('unit', "")
+                    saved_device = model_elem['device']
                     model_dict = {
                         'name': name,
                         'value': value,
@@ -255,19 +440,17 @@ def read_models_data(file_path, sim, full_model_name, alldevices=False, instance
 
     return model_data, found_pattern
 
+def _profile_path(profilename):
+    profileRootPath = os.path.join(os.environ['LOCALAPPDATA'], "VPForce-TelemFFB")
+    return os.path.join(profileRootPath, profilename + '.tffbprofile')
+
+
 def read_models_from_tffbprofile(the_sim, profilename, pattern):
     all_models = ['']
     model_data = []
-    profileRootPath = os.path.join(os.environ['LOCALAPPDATA'], "VPForce-TelemFFB")
-    profile_path = os.path.join(profileRootPath, profilename + '.tffbprofile')
+    profile_path = _profile_path(profilename)
     try:
-        tree = try_parse(profile_path)
-        root = tree.getroot()
-
-        usr_models =  root.findall(f'.//models[sim="{the_sim}"][device="{device}"]') + \
-                      root.findall(f'.//models[sim="any"][device="{device}"]') + \
-                      root.findall(f'.//models[sim="{the_sim}"][device="any"]') + \
-                      root.findall(f'.//models[sim="any"][device="any"]')
+        usr_models = config_file(profile_path).select_any('models', {'sim': the_sim, 'device': device})
 
 
         # Create a dictionary to store models based on unique keys
@@ -275,18 +458,17 @@ def read_models_from_tffbprofile(the_sim, profilename, pattern):
 
         # Process any_models
         for model_elem in usr_models:
-            model_key = (model_elem.find('model').text, model_elem.find('name').text)
+            model_key = (model_elem['model'], model_elem['name'])
             model_dict[model_key] = model_elem
 
         # Process the models
         for model_elem in model_dict.values():
             # Assuming 'model' is the element containing the wildcard pattern
 
-            name = model_elem.find('name').text
-            value = model_elem.find('value').text
-            unit_elem = model_elem.find('unit')
-            unit = unit_elem.text if unit_elem is not None else ""
-            saved_device = model_elem.find('device').text
+            name = model_elem['name']
+            value = model_elem['value']
+            unit = model_elem.get('unit', "")
+            saved_device = model_elem['device']
             model_dict = {
                 'model': pattern,
                 'name': name,
@@ -303,39 +485,42 @@ def read_models_from_tffbprofile(the_sim, profilename, pattern):
     return model_data
 
 def read_sc_overrides(aircraft_name):
-    def_model_overrides = read_models_sc_overrides(defaults_path, aircraft_name, 'defaults')
-    user_model_overrides = read_models_sc_overrides(userconfig_path, aircraft_name, 'user')
-    result = update_sc_overrides_with_user(def_model_overrides,user_model_overrides)
-    return result
+    key = (aircraft_name, _file_stamp(defaults_path), _file_stamp(userconfig_path))
+    result = _sc_overrides_cache.get(key)
+    if result is None:
+        def_model_overrides = read_models_sc_overrides(defaults_path, aircraft_name, 'defaults')
+        user_model_overrides = read_models_sc_overrides(userconfig_path, aircraft_name, 'user')
+        result = update_sc_overrides_with_user(def_model_overrides,user_model_overrides)
+        if len(_sc_overrides_cache) >= 64:
+            _sc_overrides_cache.clear() # drop entries of outdated file versions
+        _sc_overrides_cache[key] = result
+    # callers may modify the returned overrides, hand out copies of the cached ones
+    return [dict(ovr) for ovr in result]
 
 
 def read_models_sc_overrides(file_path, full_model_name, source):
     mprint(f"read_models_overrides  {file_path}, {full_model_name}")
     # runs on both defaults and userconfig xml files
     #pass 'all' to get all of them
-    tree = try_parse(file_path)
-    root = tree.getroot()
+    cfg = config_file(file_path)
+    all_models = cfg.get('sc_overrides')
+    matched = cfg.matching_models('sc_overrides', full_model_name)
 
     model_overrides = []
 
-    all_models = root.findall(f'.//sc_overrides')
-
     # Iterate through models elements
     for model_elem in all_models:
         # Assuming 'model' is the element containing the wildcard pattern
 
-        unit_pattern = model_elem.find('model')
-        if unit_pattern is not None:
-            pattern = unit_pattern.text
+        if 'model' in model_elem:
+            pattern = model_elem['model']
             if pattern is not None:
                 # Check if the full_model_name matches the pattern using re.match
-                if re.match(pattern, full_model_name) or pattern == full_model_name:
-                    name = model_elem.find('name').text
-                    var = model_elem.find('var').text
-                    sc_unit_elem = model_elem.find('sc_unit')
-                    sc_unit = sc_unit_elem.text if sc_unit_elem is not None else ""
-                    scale_elem = model_elem.find('scale')
-                    scale = float(scale_elem.text) if scale_elem is not None else None
+                if pattern in matched:
+                    name = model_elem['name']
+                    var = model_elem['var']
+                    sc_unit = model_elem.get('sc_unit', "")
+                    scale = float(model_elem['scale']) if 'scale' in model_elem else None
 
                     model_dict = {
                         'name': name,
@@ -475,8 +660,6 @@ def write_sc_override_to_xml(the_model, the_var, setting_name, sc_unit='', scale
 
 def read_default_class_data(the_sim, the_class, instance_device=''):
     mprint(f"read_default_class_data  sim {the_sim}, class {the_class}")
-    tree = try_parse(defaults_path)
-    root = tree.getroot()
 
     class_data = []
     if instance_device == '':
@@ -486,17 +669,13 @@ def read_default_class_data(the_sim, the_class, instance_device=''):
     # Iterate through models elements
     #for model_elem in root.findall(f'.//classdefaults[sim="{the_sim}"][type="{the_class}"][device="{device}"]'):
     #for model_elem in root.findall(f'.//classdefaults[sim="{the_sim}"][type="{the_class}"][device="{device}"]'):
-    for model_elem in root.findall(f'.//classdefaults[sim="{the_sim}"][type="{the_class}"][device="{the_device}"]') + \
-                      root.findall(f'.//classdefaults[sim="any"][type="{the_class}"][device="{the_device}"]') + \
-                      root.findall(f'.//classdefaults[sim="{the_sim}"][type="{the_class}"][device="any"]') + \
-                      root.findall(f'.//classdefaults[sim="any"][type="{the_class}"][device="any"]'):
+    for model_elem in config_file(defaults_path).select_any('classdefaults', {'sim': the_sim, 'type': the_class, 'device': the_device}):
 
-        if model_elem.find('name') is not None:
+        if 'name' in model_elem:
 
-            name = model_elem.find('name').text
-            value = model_elem.find('value').text
-            unit_elem = model_elem.find('unit')
-            unit = unit_elem.text if unit_elem is not None else ""
+            name = model_elem['name']
+            value = model_elem['value']
+            unit = model_elem.get('unit', "")
 
             model_dict = {
                 'name': name,
@@ -510,7 +689,45 @@ def read_default_class_data(the_sim, the_class, instance_device=''):
     return class_data
 
 
+def _settings_stamps(result):
+    """Stamps of the files the resolved settings were read from, a profile is referenced by the result"""
+    stamps = [_file_stamp(defaults_path), _file_stamp(userconfig_path)]
+    for item in result:
+        if item['name'] == 'telemffb_profile':
+            stamps.append(_file_stamp(_profile_path(item['value'])))
+    return stamps
+
+
 def read_single_model( the_sim, aircraft_name, input_modeltype = '', instance_device = ''):
+    """
+    Resolved settings of an aircraft: sim, class, user, model and profile layers merged.
+    Returns (model_class, model_pattern, settings list). Results are cached per sim, aircraft,
+    class and device until the config is written or one of its files changes on disk.
+    """
+    key = (the_sim, aircraft_name, input_modeltype, instance_device or device)
+    with _settings_cache_lock:
+        generation = _config_generation
+        entry = _settings_cache.get(key)
+    if entry is not None:
+        stamps, (model_class, model_pattern, sorted_data) = entry
+        if stamps == _settings_stamps(sorted_data):
+            logging.debug(f"Cached settings:  Sim: {the_sim}, Aircraft name: {aircraft_name}, Class: {input_modeltype}")
+            return model_class, model_pattern, [dict(item) for item in sorted_data]
+
+    stamps = [_file_stamp(defaults_path), _file_stamp(userconfig_path)]
+    result = _resolve_single_model(the_sim, aircraft_name, input_modeltype, instance_device)
+    stamps += _settings_stamps(result[2])[2:]
+    with _settings_cache_lock:
+        # a write while resolving may have been missed, don't keep the result then
+        if generation == _config_generation:
+            if len(_settings_cache) >= 64:
+                _settings_cache.clear()
+            _settings_cache[key] = (stamps, result)
+    model_class, model_pattern, sorted_data = result
+    return model_class, model_pattern, [dict(item) for item in sorted_data]
+
+
+def _resolve_single_model(the_sim, aircraft_name, input_modeltype = '', instance_device = ''):
     logging.info (f"Reading from XML:  Sim: {the_sim}, Aircraft name: {aircraft_name}, Class: {input_modeltype}")
 
     time.sleep(0.1)
@@ -642,8 +859,6 @@ def read_single_model( the_sim, aircraft_name, input_modeltype = '', instance_de
 
 def read_user_sim_data(the_sim, instance_device=''):
     mprint(f"read_user_sim_data {the_sim}")
-    tree = try_parse(userconfig_path)
-    root = tree.getroot()
 
     sim_data = []
     if instance_device == '':
@@ -652,17 +867,13 @@ def read_user_sim_data(the_sim, instance_device=''):
         the_device = instance_device
     # Iterate through models elements
     # for model_elem in root.findall(f'.//simSettings[sim="{the_sim}" or sim="any"][device="{device}" or device="any"]'):
-    for model_elem in root.findall(f'.//simSettings[sim="{the_sim}"][device="{the_device}"]') + \
-                       root.findall(f'.//simSettings[sim="any"][device="{the_device}"]') + \
-                       root.findall(f'.//simSettings[sim="{the_sim}"][device="any"]')  + \
-                       root.findall(f'.//simSettings[sim="any"][device="any"]'):
+    for model_elem in config_file(userconfig_path).select_any('simSettings', {'sim': the_sim, 'device': the_device}):
 
-        if model_elem.find('name') is not None:
+        if 'name' in model_elem:
 
-            name = model_elem.find('name').text
-            value = model_elem.find('value').text
-            unit_elem = model_elem.find('unit')
-            unit = unit_elem.text if unit_elem is not None else ""
+            name = model_elem['name']
+            value = model_elem['value']
+            unit = model_elem.get('unit', "")
             replaced = 'Sim (user)'
             model_dict = {
                 'name': name,
@@ -677,8 +888,6 @@ def read_user_sim_data(the_sim, instance_device=''):
 
 def read_user_class_data(the_sim, crafttype, instance_device=''):
     mprint(f"read_user_class_data  {the_sim}, {crafttype}")
-    tree = try_parse(userconfig_path)
-    root = tree.getroot()
 
     model_data = []
     if instance_device == '':
@@ -687,21 +896,21 @@ def read_user_class_data(the_sim, crafttype, instance_device=''):
         the_device = instance_device
     # Iterate through models elements
     #for model_elem in root.findall(f'.//models[sim="{the_sim}"][device="{device}"]'):
-    for model_elem in root.findall(f'.//classSettings[sim="{the_sim}"][device="{the_device}"]'):     # + \
+    for model_elem in config_file(userconfig_path).select('classSettings', {'sim': the_sim, 'device': the_device}):     # + \
                       # root.findall(f'.//classSettings[sim="any"][device="{device}"]') + \
                       # root.findall(f'.//classSettings[sim="{the_sim}"][device="any"]') + \
                       # root.findall(f'.//classSettings[sim="any"][device="any"]'):
-        if model_elem.find('type') is not None:
+        if 'type' in model_elem:
             # Assuming 'model' is the element containing the wildcard pattern
-            pattern = model_elem.find('type').text
+            pattern = model_elem['type']
 
             if pattern is not None:
                 # Check if the craft type matches the pattern using re match
-                if re.match(pattern, crafttype):
-                    name = model_elem.find('name').text
-                    value = model_elem.find('value').text
-                    unit_elem = model_elem.find('unit')
-                    unit = unit_elem.text if unit_elem is not None else ""
+                regex = compile_pattern(pattern)
+                if regex is not None and regex.match(crafttype):
+                    name = model_elem['name']
+                    value = model_elem['value']
+                    unit = model_elem.get('unit', "")
                     model_dict = {
                         'name': name,
                         'value': value,
@@ -717,12 +926,17 @@ def read_user_class_data(the_sim, crafttype, instance_device=''):
 def update_default_data_with_craft_result(defaultdata, craftresult):
     updated_defaultdata = defaultdata.copy()  # Create a copy to avoid modifying the original data
 
+    # index of the first item of each setting name
+    by_name = {}
+    for item in updated_defaultdata:
+        by_name.setdefault(item['name'], item)
+
     # Iterate through craftresult
     for craft_item in craftresult:
         name = craft_item['name']
 
         # Check if the item with the same name exists in defaultdata
-        matching_item = next((item for item in updated_defaultdata if item['name'] == name), None)
+        matching_item = by_name.get(name)
 
         if matching_item:
             # If the item exists, update 'value' and 'unit'
@@ -1091,29 +1305,24 @@ def sort_elements(tree):    #  unused for now.
 
 
 def read_prereqs():
-    tree = try_parse(defaults_path)
-    root = tree.getroot()
-
     # Collect data in a list of dictionaries
     data_list = []
-    for defaults_elem in root.findall(f'.//defaults'):
+    by_prereq = {}
+    for defaults_elem in config_file(defaults_path).get('defaults'):
 
-        name = defaults_elem.find('name').text
-        prereq_elem = defaults_elem.find('prereq')
-        prereq = (f"{prereq_elem.text}") if prereq_elem is not None else ""
+        name = defaults_elem['name']
+        prereq = (f"{defaults_elem['prereq']}") if 'prereq' in defaults_elem else ""
 
 
         # Check if 'prereq' is already in the list
-        found = False
-        for data_dict in data_list:
-            if data_dict['prereq'] == prereq:
-                data_dict['count'] += 1
-                found = True
-                break
+        data_dict = by_prereq.get(prereq)
+        if data_dict is not None:
+            data_dict['count'] += 1
 
         # If 'prereq' is not in the list, add a new entry
-        if not found and prereq != '':
-            data_list.append({'prereq': prereq, 'value': 'False', 'count': 1})
+        elif prereq != '':
+            data_dict = by_prereq[prereq] = {'prereq': prereq, 'value': 'False', 'count': 1}
+            data_list.append(data_dict)
 
 
         # lprint(data_list)
@@ -1123,22 +1332,22 @@ def read_prereqs():
     return data_list
 
 def check_prereq_value(prereq_list,datalist):
+    by_prereq = {}
+    for prereq in prereq_list:
+        by_prereq.setdefault(prereq['prereq'], []).append(prereq)
     for item in datalist:
-        for prereq in prereq_list:
-            if prereq['prereq'] == item['name']:
-                prereq['value'] = item['value']
+        for prereq in by_prereq.get(item['name'], ()):
+            prereq['value'] = item['value']
     return datalist
 
 def eliminate_no_prereq(datalist):
+    # names of the settings enabled in datalist
+    enabled = {p_item['name'] for p_item in datalist if str(p_item['value']).lower() == 'true'}
     newlist = []
     for d_item in datalist:
         add_item = True
         if d_item['prereq'] != '':
-            add_item = False
-            for p_item in datalist:
-                if d_item['prereq'] == p_item['name'] and p_item['value'].lower() == 'true':
-                    add_item = True
-                    break
+            add_item = d_item['prereq'] in enabled
 
         if add_item:
             newlist.append(d_item)
@@ -0,0 +1,80 @@
+"""
+Fixtures for running the telemetry pipeline headless: a simulated Rhino device
+(telemffb/hw/ffb_sim.py), the stock defaults.xml with an empty user config and a
+running TelemManager. No simulator, hardware or Windows APIs are needed.
+"""
+
+import os
+import types
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+import telemffb.globals as G
+import telemffb.xmlutils as xmlutils
+from telemffb.hw.ffb_rhino import HapticEffect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SettingsManagerStub:
+    """Stands in for settingsmanager.SettingsWindow, TelemManager only reports the current aircraft to it"""
+    timed_out = True
+
+    @classmethod
+    def update_state_vars(cls, **kwargs):
+        for key, value in kwargs.items():
+            setattr(cls, key, value)
+
+    def isVisible(self):
+        return False
+
+
+class GainDialogStub:
+    def set_gains_from_state(self, state):
+        pass
+
+    def set_gains_from_object(self, gains):
+        pass
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def sim_device(qapp):
+    device = HapticEffect.open_simulated()
+    # normally picked up by the device's Qt timer, there is no event loop running here
+    device.read_reports()
+    yield device
+    HapticEffect.device = None
+
+
+@pytest.fixture
+def headless_config(tmp_path, monkeypatch, sim_device):
+    userconfig = tmp_path / "userconfig.xml"
+    userconfig.write_text("<TelemFFB></TelemFFB>")
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+
+    monkeypatch.setattr(G, "device_type", "joystick")
+    monkeypatch.setattr(G, "userconfig_path", str(userconfig))
+    monkeypatch.setattr(G, "defaults_path", os.path.join(ROOT, "defaults.xml"))
+    monkeypatch.setattr(G, "settings_mgr", SettingsManagerStub())
+    monkeypatch.setattr(G, "gain_override_dialog", GainDialogStub())
+    monkeypatch.setattr(G, "system_settings", {})
+    monkeypatch.setattr(G, "args", types.SimpleNamespace(plot=None))
+    monkeypatch.setattr(G, "vpconf_configurator_gains", sim_device.get_gains())
+    xmlutils.update_vars(G.device_type, G.userconfig_path, G.defaults_path)
+    return tmp_path
+
+
+@pytest.fixture
+def telem_manager(headless_config):
+    from telemffb.telem.TelemManager import TelemManager
+
+    telem = TelemManager()
+    telem.start()
+    yield telem
+    telem.quit()
@@ -0,0 +1,35 @@
+import time
+
+from telemffb.telem.SimConnectManager import SimConnectManager, SimVarArray
+from telemffb.telem.TelemRecorder import KIND_DICT, replay
+
+from test_simdevice import write_capture
+
+
+def msfs_frame(t, **values):
+    """Build a telemetry dict the way SimConnectManager emits it, every simvar zeroed"""
+    frame = {sv.name: list(sv.values) if isinstance(sv, SimVarArray) else 0 for sv in SimConnectManager.sim_vars}
+    frame.update(src="MSFS", T=t, N="Generic Piston", SimconnectCategory="Airplane", EngineType=0, SimPaused=False)
+    frame.update(values)
+    return frame
+
+
+def test_replay_msfs_capture(tmp_path, telem_manager, sim_device, caplog):
+    frames = [msfs_frame(i * 0.02, TAS=60.0, IAS=60.0, AirDensity=1.225, AmbientPressure=29.92, AmbientTemperature=15.0,
+                         DesignSpeed=[70.0, 25.0, 28.0])
+              for i in range(50)]
+    capture = tmp_path / "msfs.telem.gz"
+    write_capture(capture, [(frame["T"], KIND_DICT, frame) for frame in frames])
+
+    # no SimConnect session exists during replay, the aircraft must not try to send events or resubscribe
+    assert telem_manager._simconnect is None
+
+    deadline = time.perf_counter() + 10
+    while telem_manager.currentAircraftName != "Generic Piston" and time.perf_counter() < deadline:
+        stats = replay(str(capture), telem_manager, speed=0)
+    assert stats["records"] == len(frames)
+
+    assert telem_manager.is_alive()
+    assert telem_manager.currentAircraftName == "Generic Piston"
+    assert type(telem_manager.currentAircraft).__module__ == "telemffb.sim.aircrafts_msfs_xp"
+    assert "Traceback" not in caplog.text
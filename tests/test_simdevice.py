@@ -0,0 +1,45 @@
+import gzip
+import json
+import time
+
+from telemffb.hw.ffb_rhino import HapticEffect
+from telemffb.hw.ffb_sim import FFBRhinoSim
+from telemffb.telem.TelemRecorder import KIND_TEXT, replay
+
+
+def write_capture(path, records):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for t, kind, data in records:
+            f.write(json.dumps([t, kind, data]) + "\n")
+
+
+def test_simulated_device_effects(sim_device):
+    assert isinstance(sim_device, FFBRhinoSim)
+    assert sim_device.get_firmware_version() == "v1.0.99-sim"
+
+    effect = HapticEffect().constant(0.5, 90)
+    effect.start()
+    stats = sim_device.get_stats()
+    assert stats["effects_created"] == {"Constant": 1}
+    assert stats["active_effects"] == 1
+
+    effect.destroy()
+    assert sim_device.get_stats()["active_effects"] == 0
+
+
+def test_replay_dcs_capture(tmp_path, telem_manager, sim_device):
+    frames = [f"src=DCS;N=F-16C_50;T={i * 0.02:.2f};TAS=150.5;AoA=2.1;ACCs=0.1~0.2~1.0;MechInfo={{}}"
+              for i in range(50)]
+    capture = tmp_path / "dcs.telem.gz"
+    write_capture(capture, [(i * 0.02, KIND_TEXT, frame) for i, frame in enumerate(frames)])
+
+    sim_device.reset_stats()
+    deadline = time.perf_counter() + 10
+    while telem_manager.currentAircraftName != "F-16C_50" and time.perf_counter() < deadline:
+        stats = replay(str(capture), telem_manager, speed=0)
+    assert stats["records"] == len(frames)
+
+    assert telem_manager.currentAircraftName == "F-16C_50"
+    assert type(telem_manager.currentAircraft).__module__ == "telemffb.sim.aircrafts_dcs"
+    assert telem_manager.numFrames >= len(frames)
+    assert sim_device.get_stats()["writes"] > 0
@@ -0,0 +1,497 @@
+"""Decoder benchmarks, the current telemetry decoders against their original implementations
+
+The original decoders are kept here as the timing and output parity baseline, they
+are not used by TelemFFB itself. Run from the repository root:
+
+    python -m tools.benchmark_decoders il2 [il2_test_data.gz]
+    python -m tools.benchmark_decoders telem <capture.telem.gz>
+"""
+
+import argparse
+import logging
+import struct
+import time
+
+import telemffb.utils as utils
+from telemffb.telem.IL2Manager import (MOTION_PACKET, PACKET_HEADER_STRUCT, TELEM_PACKET, EventType, IL2Manager,
+                                       StateType, dbg, focus_poller, hexdump, mpss2gs, read_il2_trace)
+from telemffb.telem.TelemDecoder import TelemDecoder
+from telemffb.telem.TelemRecorder import KIND_TEXT, read_capture
+
+
+def best_of(fn, items, repeat=5) -> float:
+    """Best wall time in seconds of calling `fn` for each of `items`, over `repeat` runs"""
+    best = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for item in items:
+            fn(item)
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+class BinaryDataReader:
+    def __init__(self, data, endian='little'):
+        self.buffer = data
+        self.pointer = 0
+        self.endian = endian
+
+    def advance(self, offset):
+        self.pointer += offset
+   
+    def remaining(self):
+        return len(self.buffer) - self.pointer
+
+    def _read(self, format_str, size, peek=False):
+        if self.pointer + size > len(self.buffer):
+            raise ValueError("Not enough data to read")
+        endian = "<" if self.endian == "little" else ">"
+        value = struct.unpack_from(endian + format_str, self.buffer, self.pointer)[0]
+        if peek:
+            # don't advance pointer, just return data for analysis
+            return value
+        else:
+            self.pointer += size
+            return value
+    
+    # return slice of remaining data
+    def get_data(self, length, peek=False):
+        data = bytes(self.buffer[self.pointer:self.pointer+length])  # buffer may be a memoryview
+        if peek:
+            # don't advance pointer, just return data for analysis
+            return data
+        else:
+            self.pointer += length
+            return data
+
+
+    def get_uint32(self):
+        return self._read('I', 4)
+
+    def get_uint16(self):
+        return self._read('H', 2)
+
+    def get_float(self):
+        return self._read('f', 4)
+
+    def get_double(self):
+        return self._read('d', 8)
+
+    def get_int32(self):
+        return self._read('i', 4)
+
+    def get_int16(self):
+        return self._read('h', 2)
+    
+    def get_uint8(self):
+        return self._read('B', 1)
+    
+    def get_int8(self):
+        return self._read('b', 1)
+    
+    def get_char(self):
+        return self._read('c', 1)
+    
+    def get_vector3f(self):
+        return [self.get_float(), self.get_float(), self.get_float()]
+
+
+class IL2ManagerLegacy(IL2Manager):
+    """Original BinaryDataReader based decoder, kept as the benchmark and parity baseline"""
+
+    def __init__(self):
+        super().__init__(emit_unknown_fields=True)
+        self.last_paused_data: list = []
+
+    @utils.overrides(IL2Manager)
+    def process_packet(self, packet: bytes) -> dict:
+        packet_header, = PACKET_HEADER_STRUCT.unpack_from(packet)
+        ##
+        ## Run Decoders
+        ##
+
+        if packet_header == TELEM_PACKET:
+            ## Telemetry/Event Packet
+            self.decode_telem(packet, PACKET_HEADER_STRUCT.size)
+
+        elif packet_header == MOTION_PACKET:
+            ## Motion telemetry (aircraft orientation, rotational vectors, etc) have a different header signature
+            self.decode_motion(packet, PACKET_HEADER_STRUCT.size)
+
+        else:
+            logging.error(f'Unknown packet type:  Header=0x{packet_header:X}')
+
+        self.telem_data["src"] = "IL2"
+        if self.ac_name != "":
+            self.telem_data["N"] = self.ac_name
+        self.telem_data['TAS'] = self.state.indicated_air_speed_metres_second
+        self.telem_data['IAS'] = self.state.indicated_air_speed_metres_second
+        self.telem_data['AGL'] = self.state.above_ground_level_metres
+        self.telem_data['RPM'] = self.state.rpm
+        self.telem_data["MaxRPM"] = self.engine_maxrpm
+        try:
+            self.rpm_pcts = [(a / b) * 100 for a, b in zip(self.state.rpm, self.engine_maxrpm)]
+        except: pass
+        self.telem_data["EngRPM"] = self.rpm_pcts
+
+        # self.telem_data['Manifold'] = list(self.state.intake_manifold_pressure_pa)
+        self.telem_data['GearPos'] = list(self.state.landing_gear_position)
+
+        try:
+            ## Reorder gear to match DCS for function re-use
+            update_gear_indices = [0, 2, 1]
+            self.state.landing_gear_pressure = [self.state.landing_gear_pressure[i] for i in update_gear_indices]
+        except: pass
+
+        self.telem_data['T'] = self.state.tick
+        self.telem_data['WeightOnWheels'] = list(self.state.landing_gear_pressure)
+        self.telem_data['ACCs'] = self.state.acceleration_Gs
+        self.telem_data['BuffetFrequency'] = self.state.stall_buffet_frequency
+        self.telem_data['BuffetAmplitude'] = self.state.stall_buffet_amplitude * 10  # multiply by factor of 10 to make usable in 0-1.0 range
+        self.telem_data['Flaps'] = self.state.flaps_position
+        self.telem_data['Speedbrakes'] = self.state.air_brake_position
+        self.telem_data["GunData"] = self.gun_data
+        self.telem_data["Gun"] = self.guns_fired
+        self.telem_data["Bombs"] = self.bombs_released
+        self.telem_data["Rockets"] = self.rockets_fired
+        self.telem_data["Hits"] = self.hit_events
+        self.telem_data["Damage"] = self.damage_events
+        self.telem_data["SeatData"] = self.seat_data
+        self.telem_data['unknown_data_2'] = list(self.state.val2)
+        self.telem_data['unknown_data_3'] = self.state.val3
+        self.telem_data['unknown_evt_6'] = self.ev6_data
+        self.telem_data['unknown_data_7'] = self.state.val7
+        self.telem_data['unknown_evt_13'] = self.ev13_data
+        self.telem_data['unknown_evt_14'] = self.ev14_data
+        self.telem_data['acc_vectors'] = self.acc_vectors
+        self.telem_data['rot_velocity'] = self.rot_velocity
+        self.telem_data['rot_accel'] = self.rot_accel
+
+        # create structure of the most real-time data to determine if updated telemetry is flowing.  If not, consider
+        # the sim paused.  This avoids effects continuing to play when in multiplayer map or after crash since IL-2 never stops sending
+        # stale frames.
+        paused_data = [self.state.acceleration_Gs, self.state.above_ground_level_metres,self.state.rpm, self.rot_accel, self.rot_velocity]
+        if paused_data == self.last_paused_data:
+            self.telem_data['SimPaused'] = True
+        else:
+            self.telem_data['SimPaused'] = False
+        self.last_paused_data = paused_data
+
+        return self.telem_data
+
+    @utils.overrides(IL2Manager)
+    def decode_motion(self, buf, offset: int):
+        data = BinaryDataReader(buf)
+        data.pointer = offset
+
+        tick = data.get_uint32()
+        self.state.tick = tick
+
+        self.acc_vectors = data.get_vector3f()
+        self.rot_velocity = data.get_vector3f()
+        self.rot_accel = data.get_vector3f()
+
+        dbg(1,"acc", self.acc_vectors)
+
+    @utils.overrides(IL2Manager)
+    def decode_telem(self, buf, offset: int):
+        data = BinaryDataReader(buf)
+        data.pointer = offset
+
+        packet_size = data.get_uint16()
+        tick = data.get_uint32()
+
+
+
+        if packet_size == 12:
+            self.telem_data["SimPaused"] = 1
+        else:
+            self.telem_data["SimPaused"] = 0
+
+        if focus_poller.focused:
+            self.telem_data["Focus"] = 1
+            self.telem_data["SimPaused"] = 0
+        else:
+            self.telem_data["Focus"] = 0
+            self.telem_data["SimPaused"] = 1
+
+        dbg(1,f"telem tick {tick} size {packet_size}")
+
+        self.state.tick = tick
+
+        length = data.get_uint8()
+        dbg(1,"len", length)
+
+        ##
+        ## Decode fixed structure telemetry data
+        ##
+        for _ in range(length):
+            
+            state_type = data.get_uint16()
+            state_length = data.get_uint8()
+
+            dbg(1,StateType(state_type), "len",  state_length)
+            
+            get_state_floats = lambda: [data.get_float() for i in range(0, state_length)]
+
+            if state_type == StateType.RPM:
+                self.state.engine_count = state_length
+                self.state.rpm = get_state_floats()
+
+            elif state_type == StateType.ManifoldPressure:
+                self.state.intake_manifold_pressure_pa = get_state_floats()
+
+            elif state_type == StateType.Val2:
+                self.state.val2 = get_state_floats()
+
+            elif state_type == StateType.Val3:
+                self.state.val3 = get_state_floats()
+
+            elif state_type == StateType.LandingGearPosition:
+                self.state.landing_gear_count = state_length
+                self.state.landing_gear_position = get_state_floats()
+
+            elif state_type == StateType.LandingGearPressure:
+                self.state.landing_gear_count = state_length
+                self.state.landing_gear_pressure = get_state_floats()
+
+            elif state_type == StateType.IndicatedAirspeed:
+                self.state.indicated_air_speed_metres_second = data.get_float()
+
+            elif state_type == StateType.Val7:
+                self.state.val7 = data.get_float()
+
+            elif state_type == StateType.Acceleration:
+                self.state.acceleration = get_state_floats()
+                self.state.acceleration_Gs = [x * mpss2gs for x in self.state.acceleration]
+
+            elif state_type == StateType.StallBuffet:
+                self.state.stall_buffet_frequency = data.get_float()
+                self.state.stall_buffet_amplitude = data.get_float()
+
+            elif state_type == StateType.AGL:
+                self.state.above_ground_level_metres = data.get_float()
+
+            elif state_type == StateType.FlapsPosition:
+                self.state.flaps_position = data.get_float()
+
+            elif state_type == StateType.AirBrakePosition:
+                self.state.air_brake_position = data.get_float()
+
+            else:
+                logging.error(f"Unknown state type: {state_type}")
+
+        b = data.get_uint8()
+        dbg(1,"last byte", b)
+
+        self.decode_events(data)
+
+    @utils.overrides(IL2Manager)
+    def decode_events(self, data : BinaryDataReader) -> int:
+        dbg(1,"decode_events remaining_data:", data.remaining())
+        if data.remaining() < 2: return
+        # self.engine_maxrpm = []
+        dbg(1, "event packet")
+        while data.remaining():
+            eventType = data.get_uint16()
+            eventBytes = data.get_uint8()
+            try:
+                event = EventType(eventType)
+            except:
+                logging.warning(f"Unknown Event Type: {eventType}")
+                event = 'Unknown'
+            dbg(0,"-- event, type", event, "eventBytes", eventBytes)
+            dbg(0,hexdump(data.buffer[data.pointer:data.pointer+eventBytes]))
+            if eventType == EventType.MPServerInfo:
+                logging.debug("MP Server info received")
+                return
+            if eventType == EventType.VehicleName:
+                name_length = data.get_uint8()
+                name_data = data.get_data(name_length)
+                # print(f"NAMEDATA={name_data}")
+                name_hex = name_data.hex().upper()
+                aircraft_name = name_data.decode('ascii').rstrip('\x00')
+                # print(f"ACNAME={aircraft_name}")
+                # aircraft_name = ''.join(c for c in aircraft_name if ord(c) <= 127)
+                if aircraft_name != self.ac_name:
+                    logging.info(f"aircraft_name={aircraft_name} | self.ac_name={self.ac_name}")
+                    self.__init__()
+                    
+                self.ac_name = aircraft_name
+
+            elif eventType == EventType.EngineData:
+                index = data.get_uint16()
+                index2 = data.get_uint16()
+                engine_data = data.get_vector3f()
+                max_rpm = data.get_float()
+                if len(self.engine_maxrpm) <= index:
+                    self.engine_maxrpm.append(max_rpm)
+                else:
+                    self.engine_maxrpm[index] = max_rpm
+                dbg(1,"EngineData", f"{index=} {index2=} {engine_data=} {max_rpm=}")
+
+
+            elif eventType == EventType.GunData:
+                index = data.get_uint16()
+                offset = data.get_vector3f()
+                mass = data.get_float()
+                velocity = data.get_float()
+                dbg(1,"GunData", f"{index=} {offset=} {mass=} {velocity=}")
+
+                if len(self.gun_data) <= index:
+                    self.gun_data.append([round(mass,4), velocity])
+                else:
+                    self.gun_data[index] = ([round(mass, 4), velocity])
+
+
+            elif eventType == EventType.GunFired:
+                gun_index = data.get_uint8()
+                dbg(1,"GunFired", gun_index)
+                if len(self.guns_fired) < gun_index + 1:
+                    self.guns_fired.append(0)
+                else:
+                    self.guns_fired[gun_index] += 1
+
+            elif eventType == EventType.WheelData:
+                index = data.get_uint16()
+                index2 = data.get_uint16()
+                offset = data.get_vector3f() # wheel positions in 3d space
+                dbg(1,f"{index=} {index2=} {offset=}")
+
+
+            elif eventType == EventType.BombRelease:
+                index = data.get_vector3f()
+                print(f"BOMB-{index}")
+                mass = data.get_float()
+                type = data.get_uint16()
+
+                dbg(1,f"{index=} {mass=} {type=}")
+
+                # self.bombs_data = []
+                self.bombs_released[0] = mass
+                self.bombs_released[1] += 1
+
+            elif eventType == EventType.RocketLaunch:
+                offset = data.get_vector3f()
+                mass = data.get_float()
+                type = data.get_uint16()
+                dbg(1,f"{offset=} {mass=} {type=}")
+
+                self.rockets_fired[0] = mass
+                self.rockets_fired[1] += 1
+
+            elif eventType == EventType.Event6:
+                vec0 = data.get_vector3f()
+                vec1 = data.get_vector3f()
+                self.ev6_data = (vec0, vec1)
+
+            elif eventType == EventType.Hit:
+                offset = data.get_vector3f()
+                force = data.get_vector3f()
+                dbg(1, "HIT EVENT", f"{offset=} {force=}")
+
+                self.hit_data = (offset, force)
+                self.hit_events += 1
+
+            elif eventType == EventType.Damage:
+                offset = data.get_vector3f()
+                float0 = data.get_float()
+                dbg(1, "DAMAGE", f"{offset=} {float0=}")
+
+                self.ev_damage_data = (offset, float0)
+                self.damage_events += 1
+
+            elif eventType == EventType.CurrentSeat:
+                # Triggers on seat change     
+                # Seems to be all 1s (4294967295) if pilot or co-pilot, and 1023 if any gunner
+                # Not sure what the ushort value represents, but seems to be 1 or 2
+                seat = data.get_uint32()
+                ushort0 = data.get_uint16()
+
+                self.seat_data = [seat, ushort0]
+                dbg(1, "SEAT", f"{seat=} {ushort0=}")
+
+            elif eventType == EventType.Event13:
+                # ev13_length = data.get_uint8()
+                ev13_data = data.get_data(eventBytes)
+                ev13_hex = ev13_data.hex().upper()
+                # ev13_name = ev13_data.decode('ascii').strip()
+                # self.ev13_data = data.get_vector3f()
+                # b = data.get_uint8() #get last byte
+            elif eventType == EventType.Event14:
+                data1 = data.get_int32()
+                data2 = data.get_int16()
+                dbg(1,"EVENT-14", f"{data1=} {data2=}")
+                self.ev14_data = [data1, data2]
+            else:
+                logging.error(f"Unknown event type: {eventType}")
+
+
+def benchmark_il2_trace(path='il2_test_data.gz', repeat=5):
+    """Decode a recorded trace with the legacy and the precompiled struct decoder, print packets/second"""
+    packets = read_il2_trace(path)
+    if not packets:
+        print("No packets found")
+        return
+
+    results = {}
+    for name, cls in (("legacy", IL2ManagerLegacy), ("struct", IL2Manager)):
+        # a fresh decoder per run, the first packets carry the aircraft name and engine data
+        best = min(best_of(cls().process_packet, packets, repeat=1) for _ in range(repeat))
+        results[name] = len(packets) / best
+        print(f"{name:8s}: {results[name]:10.0f} packets/s ({len(packets)} packets, best of {repeat})")
+
+    print(f"speedup : {results['struct'] / results['legacy']:.2f}x")
+
+
+def decode_legacy(data: str) -> dict:
+    """Original TelemManager frame parser"""
+    telem_data = {}
+    for i in data.split(";"):
+        try:
+            if len(i):
+                section, conf = i.split("=")
+                values = conf.split("~")
+                telem_data[section] = [utils.to_number(v) for v in values] if len(values) > 1 else utils.to_number(conf)
+        except Exception:
+            logging.exception("Error Parsing Parameter: %s", repr(i))
+    return telem_data
+
+
+def benchmark_telem_capture(path, repeat=5):
+    """Time per frame parse of recorded telemetry, legacy parser vs TelemDecoder
+
+    `path` is a capture file written by TelemRecorder (DCS or X-Plane session).
+    """
+    frames = [data for _, kind, data in read_capture(path) if kind == KIND_TEXT and not data.startswith("Ev=")]
+    if not frames:
+        print("No frames found")
+        return
+
+    results = {}
+    for name, fn in (("legacy", decode_legacy), ("decoder", TelemDecoder().decode)):
+        results[name] = best_of(fn, frames, repeat) / len(frames) * 1e6
+        print(f"{name:8s}: {results[name]:8.2f} us/frame ({len(frames)} frames, best of {repeat})")
+
+    print(f"speedup : {results['legacy'] / results['decoder']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    sub = parser.add_subparsers(dest="decoder", required=True)
+    il2 = sub.add_parser("il2", help="IL-2 binary telemetry, trace written by IL2Manager.log_il2_trace()")
+    il2.add_argument("path", nargs="?", default="il2_test_data.gz")
+    telem = sub.add_parser("telem", help="DCS/X-Plane text telemetry, capture written by TelemRecorder")
+    telem.add_argument("path")
+    args = parser.parse_args()
+
+    if args.decoder == "il2":
+        benchmark_il2_trace(args.path, args.repeat)
+    elif args.decoder == "telem":
+        benchmark_telem_capture(args.path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()